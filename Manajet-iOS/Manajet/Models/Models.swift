@@ -209,6 +209,81 @@ struct FlightDurationResponse: Codable {
     }
 }
 
+// MARK: - Paged Listings
+/// One page of a listing fetched with a limit or cursor (pass nextCursor back for the next page)
+struct Page<Item: Codable>: Codable {
+    let items: [Item]
+    let nextCursor: String?
+    let asOf: String
+
+    enum CodingKeys: String, CodingKey {
+        case items
+        case nextCursor = "next_cursor"
+        case asOf = "as_of"
+    }
+}
+
+// MARK: - Incremental Sync
+struct SyncResponse: Decodable {
+    let seq: Int
+    let reset: Bool
+    let changes: [SyncChange]
+}
+
+enum SyncRecord {
+    case flight(Flight)
+    case jet(Jet)
+    case passenger(Passenger)
+    case crew(CrewMember)
+}
+
+struct SyncChange: Decodable {
+    let collection: String
+    let id: String
+    let seq: Int
+    /// nil when the record was deleted or is no longer visible to the user
+    let record: SyncRecord?
+
+    enum CodingKeys: String, CodingKey {
+        case collection, id, seq, deleted, record
+    }
+
+    init(from decoder: Decoder) throws {
+        let container = try decoder.container(keyedBy: CodingKeys.self)
+        collection = try container.decode(String.self, forKey: .collection)
+        id = try container.decode(String.self, forKey: .id)
+        seq = try container.decode(Int.self, forKey: .seq)
+        if try container.decodeIfPresent(Bool.self, forKey: .deleted) == true {
+            record = nil
+            return
+        }
+        switch collection {
+        case "flights": record = .flight(try container.decode(Flight.self, forKey: .record))
+        case "jets": record = .jet(try container.decode(Jet.self, forKey: .record))
+        case "passengers": record = .passenger(try container.decode(Passenger.self, forKey: .record))
+        case "crew": record = .crew(try container.decode(CrewMember.self, forKey: .record))
+        default: record = nil
+        }
+    }
+}
+
+// MARK: - Live Change Events
+struct ChangeEvent: Decodable {
+    let seq: Int
+    let collection: String
+    let id: String
+    let status: String?
+    let approvalStatus: String?
+    let jetId: String?
+    let deleted: Bool?
+
+    enum CodingKeys: String, CodingKey {
+        case seq, collection, id, status, deleted
+        case approvalStatus = "approval_status"
+        case jetId = "jet_id"
+    }
+}
+
 // MARK: - Dashboard Stats
 struct DashboardStats: Codable {
     let totalPassengers: Int
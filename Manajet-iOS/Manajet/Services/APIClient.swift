@@ -88,6 +88,70 @@ class APIClient: ObservableObject {
         return try JSONDecoder().decode([Flight].self, from: data)
     }
 
+    /// One page of flights by departure time; pass the previous page's asOf as updatedSince
+    /// to fetch only flights changed since then
+    func getFlightsPage(cursor: String? = nil, limit: Int = 50, updatedSince: String? = nil) async throws -> Page<Flight> {
+        var components = URLComponents(string: "\(baseURL)/api/flights")!
+        components.queryItems = [URLQueryItem(name: "limit", value: String(limit))]
+        if let cursor = cursor {
+            components.queryItems?.append(URLQueryItem(name: "cursor", value: cursor))
+        }
+        if let updatedSince = updatedSince {
+            components.queryItems?.append(URLQueryItem(name: "updated_since", value: updatedSince))
+        }
+        let (data, _) = try await session.data(from: components.url!)
+        return try JSONDecoder().decode(Page<Flight>.self, from: data)
+    }
+
+    /// Records changed since the seq of an earlier sync (nil on first launch). When the response
+    /// has reset set, refetch the collections and sync from its seq next time
+    func sync(since: Int? = nil) async throws -> SyncResponse {
+        var components = URLComponents(string: "\(baseURL)/api/sync")!
+        if let since = since {
+            components.queryItems = [URLQueryItem(name: "since", value: String(since))]
+        }
+        let (data, _) = try await session.data(from: components.url!)
+        return try JSONDecoder().decode(SyncResponse.self, from: data)
+    }
+
+    /// Flight, jet and maintenance changes pushed by the server; reconnect with the seq of the last
+    /// event when the stream ends. A nil event means the missed changes are unknown - refetch everything.
+    /// Fails with requestFailed when the server does not stream events (204) - poll sync(since:) instead
+    func changeEvents(since: Int? = nil) -> AsyncThrowingStream<ChangeEvent?, Error> {
+        AsyncThrowingStream { continuation in
+            let task = Task {
+                var request = URLRequest(url: URL(string: "\(baseURL)/api/events")!)
+                request.timeoutInterval = 60
+                if let since = since {
+                    request.setValue(String(since), forHTTPHeaderField: "Last-Event-ID")
+                }
+                do {
+                    let (bytes, response) = try await session.bytes(for: request)
+                    guard (response as? HTTPURLResponse)?.statusCode == 200 else {
+                        throw APIError.requestFailed
+                    }
+                    var eventType = "message"
+                    for try await line in bytes.lines {
+                        if line.hasPrefix("event: ") {
+                            eventType = String(line.dropFirst(7))
+                        } else if line.hasPrefix("data: ") {
+                            if eventType == "reset" {
+                                continuation.yield(nil)
+                            } else if eventType == "change", let data = line.dropFirst(6).data(using: .utf8) {
+                                continuation.yield(try JSONDecoder().decode(ChangeEvent.self, from: data))
+                            }
+                            eventType = "message"
+                        }
+                    }
+                    continuation.finish()
+                } catch {
+                    continuation.finish(throwing: error)
+                }
+            }
+            continuation.onTermination = { _ in task.cancel() }
+        }
+    }
+
     func scheduleFlight(
         jetId: String,
         departure: String,
@@ -0,0 +1,60 @@
+"""
+Aircraft Performance Profiles for Manajet
+Cruise speed and climb/descent allowance per aircraft model, for flight duration estimates
+
+Profiles are matched against PrivateJet.model by keyword (case-insensitive),
+so "Gulfstream G650ER" and "G650" both get the G650 profile. Models no
+keyword matches get DEFAULT_PROFILE - the 450 mph and 30 minutes every
+estimate used before profiles existed.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+
+class AircraftProfile:
+    """Performance figures used to turn a route distance into a flight duration"""
+
+    __slots__ = ('name', 'cruise_speed_mph', 'climb_descent_minutes')
+
+    def __init__(self, name: str, cruise_speed_mph: int, climb_descent_minutes: int):
+        self.name = name
+        self.cruise_speed_mph = cruise_speed_mph
+        # Taxi, takeoff, climb, descent and landing time on top of the distance at cruise speed
+        self.climb_descent_minutes = climb_descent_minutes
+
+    def __repr__(self):
+        return f"AircraftProfile({self.name!r}, {self.cruise_speed_mph}, {self.climb_descent_minutes})"
+
+
+DEFAULT_PROFILE = AircraftProfile("Private jet", 450, 30)
+
+# (keyword in the lowercased model, profile), most specific keywords first
+PROFILES = [
+    ("citation x", AircraftProfile("Cessna Citation X", 590, 25)),
+    ("citation cj", AircraftProfile("Cessna Citation CJ", 470, 25)),
+    ("citation", AircraftProfile("Cessna Citation", 460, 25)),
+    ("challenger", AircraftProfile("Bombardier Challenger", 530, 30)),
+    ("global", AircraftProfile("Bombardier Global", 560, 35)),
+    ("learjet", AircraftProfile("Learjet", 520, 25)),
+    ("g650", AircraftProfile("Gulfstream G650", 560, 35)),
+    ("g550", AircraftProfile("Gulfstream G550", 550, 35)),
+    ("gulfstream", AircraftProfile("Gulfstream", 540, 35)),
+    ("falcon", AircraftProfile("Dassault Falcon", 540, 30)),
+    ("phenom", AircraftProfile("Embraer Phenom", 500, 25)),
+    ("praetor", AircraftProfile("Embraer Praetor", 520, 30)),
+    ("hondajet", AircraftProfile("HondaJet", 480, 20)),
+    ("king air", AircraftProfile("Beechcraft King Air", 350, 20)),
+    ("pc-12", AircraftProfile("Pilatus PC-12", 320, 20)),
+    ("pc-24", AircraftProfile("Pilatus PC-24", 500, 25)),
+]
+
+
+@lru_cache(maxsize=256)
+def profile_for_model(model: Optional[str]) -> AircraftProfile:
+    """The profile for an aircraft model name (DEFAULT_PROFILE if unknown or None)"""
+    model_lower = (model or "").lower()
+    for keyword, profile in PROFILES:
+        if keyword in model_lower:
+            return profile
+    return DEFAULT_PROFILE
@@ -0,0 +1,206 @@
+"""
+Compiled Airport Data for Manajet
+Compiles airports_data.json into a columnar binary file that is memory-mapped instead of parsed
+
+The file holds one fixed-width column per field: airport codes (CODE_WIDTH
+bytes, NUL-padded), latitudes and longitudes (doubles), the rows ordered by
+code for lookups, and for name, city, state and country the number of a
+string in a deduplicated string table at the end. Opening it reads only the
+header; pages are faulted in as lookups touch them and, being file-backed,
+are shared through the page cache by every worker on the machine.
+
+Build it with `python airport_binary.py [airports_data.json [airports_data.bin]]`
+(the Docker image does this). If the file is missing or older than the JSON,
+the first process to need airports compiles it and writes it next to the JSON.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+MAGIC = b'MJAP'
+VERSION = 1
+
+# magic, version, airport count, string count, string table bytes - native byte order,
+# so a file written on a machine of the other byte order reads as stale and is rebuilt
+HEADER = struct.Struct('=4sIIII')
+
+# Bytes per airport code (IATA codes use 3, ICAO and FAA identifiers 4)
+CODE_WIDTH = 8
+
+# Text fields kept in the string table, in column order
+TEXT_FIELDS = ('name', 'city', 'state', 'country')
+
+
+def binary_path(json_path: str) -> str:
+    """Default compiled file for a JSON airport file (airports_data.json -> airports_data.bin)"""
+    return f"{os.path.splitext(json_path)[0]}.bin"
+
+
+def compile_airports(airports: List[Dict]) -> bytes:
+    """The compiled file contents for a list of airport dicts"""
+    codes = bytearray()
+    for airport in airports:
+        code = airport['code'].encode('utf-8')
+        if len(code) > CODE_WIDTH:
+            raise ValueError(f"Airport code {airport['code']!r} is longer than {CODE_WIDTH} bytes")
+        codes += code.ljust(CODE_WIDTH, b'\0')
+    by_code = sorted(range(len(airports)), key=lambda row: (codes[row * CODE_WIDTH:(row + 1) * CODE_WIDTH], row))
+
+    strings: Dict[str, int] = {}
+    columns = []
+    for field in TEXT_FIELDS:
+        columns.append(array('I', (strings.setdefault(airport[field], len(strings)) for airport in airports)))
+    table = bytearray()
+    offsets = array('I', [0])
+    for text in strings:
+        table += text.encode('utf-8')
+        offsets.append(len(table))
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, len(airports), len(strings), len(table)),
+        bytes(codes),
+        array('d', (airport['lat'] for airport in airports)).tobytes(),
+        array('d', (airport['lon'] for airport in airports)).tobytes(),
+        array('I', by_code).tobytes(),
+        *(column.tobytes() for column in columns),
+        offsets.tobytes(),
+        bytes(table),
+    ]
+    return b''.join(parts)
+
+
+def build_airport_file(json_path: str, path: Optional[str] = None) -> str:
+    """Compile a JSON airport file into path (default binary_path(json_path)); returns the path"""
+    path = path or binary_path(json_path)
+    with open(json_path, 'r') as f:
+        airports = json.load(f).get('airports', [])
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(compile_airports(airports))
+    os.replace(tmp_file, path)  # Other processes see the old file or the new one, never half of one
+    return path
+
+
+class AirportFile:
+    """
+    Read-only sequence of the airports in a compiled buffer
+
+    Indexing builds the airport's dict (code, name, city, state, country,
+    lat, lon) on demand; lats and lons are the coordinate columns as
+    memoryviews of doubles, and find() looks a code up by bisection.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError("Airport file is truncated")
+        magic, version, count, string_count, table_bytes = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compiled airport file of this version")
+
+        sizes = [count * CODE_WIDTH, count * 8, count * 8, count * 4, *[count * 4] * len(TEXT_FIELDS),
+                 (string_count + 1) * 4, table_bytes]
+        if len(view) != HEADER.size + sum(sizes):
+            raise ValueError("Airport file is truncated")
+        sections = []
+        start = HEADER.size
+        for size in sizes:
+            sections.append(view[start:start + size])
+            start += size
+
+        self.count = count
+        self.codes = sections[0]
+        self.lats = sections[1].cast('d')
+        self.lons = sections[2].cast('d')
+        self.by_code = sections[3].cast('I')
+        self.text_columns = [section.cast('I') for section in sections[4:4 + len(TEXT_FIELDS)]]
+        self.string_offsets = sections[-2].cast('I')
+        self.strings = sections[-1]
+
+    @classmethod
+    def open(cls, path: str) -> 'AirportFile':
+        """Memory-map a compiled airport file"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> Dict:
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError("airport row out of range")
+        airport = {'code': self.code(row)}
+        for field, column in zip(TEXT_FIELDS, self.text_columns):
+            airport[field] = self.string(column[row])
+        airport['lat'] = self.lats[row]
+        airport['lon'] = self.lons[row]
+        return airport
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(self.count):
+            yield self[row]
+
+    def code(self, row: int) -> str:
+        return bytes(self.codes[row * CODE_WIDTH:(row + 1) * CODE_WIDTH]).rstrip(b'\0').decode('utf-8')
+
+    def string(self, number: int) -> str:
+        return bytes(self.strings[self.string_offsets[number]:self.string_offsets[number + 1]]).decode('utf-8')
+
+    def find(self, code: str) -> Optional[int]:
+        """Row of the first airport listed with code, or None"""
+        key = code.encode('utf-8').ljust(CODE_WIDTH, b'\0')
+        if len(key) > CODE_WIDTH:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            row = self.by_code[middle]
+            if bytes(self.codes[row * CODE_WIDTH:(row + 1) * CODE_WIDTH]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            row = self.by_code[low]
+            if bytes(self.codes[row * CODE_WIDTH:(row + 1) * CODE_WIDTH]) == key:
+                return row
+        return None
+
+
+def open_airports(json_path: str, path: Optional[str] = None) -> AirportFile:
+    """
+    The compiled airports for a JSON airport file
+
+    Maps the compiled file when it is at least as new as the JSON; otherwise
+    compiles the JSON and writes the file first. If it cannot be written the
+    compiled data is kept in memory; without either file there are no airports.
+    """
+    path = path or binary_path(json_path)
+    try:
+        if not os.path.exists(json_path) or os.path.getmtime(path) >= os.path.getmtime(json_path):
+            return AirportFile.open(path)
+    except (OSError, ValueError):
+        pass  # Missing or stale - compile it below
+
+    if not os.path.exists(json_path):
+        print(f"Warning: Airport data file {json_path} not found")
+        return AirportFile(compile_airports([]))
+    try:
+        return AirportFile.open(build_airport_file(json_path, path))
+    except OSError as e:
+        print(f"Warning: Could not write compiled airport file {path}: {e}")
+    with open(json_path, 'r') as f:
+        return AirportFile(compile_airports(json.load(f).get('airports', [])))
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "airports_data.json"
+    target = build_airport_file(source, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Compiled {len(AirportFile.open(target))} airports from {source} into {target}")
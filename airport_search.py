@@ -0,0 +1,113 @@
+"""
+Airport Search Index for Manajet
+Answers AirportDatabase.search_airports from prebuilt indexes instead of a scan
+
+Matches fall into relevance tiers, checked from the best down: exact code,
+code prefix, exact city, city prefix, exact state, name substring and city
+substring. Each airport counts once, in its best tier, and ties keep file
+order. Exact matches come from dicts, prefixes from bisecting sorted
+(value, position) arrays, and substrings from a bigram index (queries are at
+least two characters) whose rarest bigram gives the candidates to check.
+Tiers are filled in order and a heap picks the first positions of each, so
+a search stops once it has enough results instead of scoring every airport.
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Relevance of each match tier, best first (the values search results carry)
+CODE_EXACT = 1000
+CODE_PREFIX = 500
+CITY_EXACT = 400
+CITY_PREFIX = 300
+STATE_EXACT = 200
+NAME_CONTAINS = 100
+CITY_CONTAINS = 50
+
+# Length of the substrings indexed for substring matches
+GRAM_SIZE = 2
+
+
+def _grams(text: str) -> Iterable[str]:
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class AirportSearchIndex:
+    """Lowercased fields and lookup structures over a fixed sequence of airport dicts"""
+
+    def __init__(self, airports: Sequence[Dict]):
+        self.airports = airports
+        fields = [(airport['code'].lower(), airport['city'].lower(), airport['name'].lower(), airport['state'].lower())
+                  for airport in airports]
+        self.codes = [code for code, _, _, _ in fields]
+        self.cities = [city for _, city, _, _ in fields]
+        self.names = [name for _, _, name, _ in fields]
+        states = [state for _, _, _, state in fields]
+
+        self.code_positions = self._positions(self.codes)
+        self.city_positions = self._positions(self.cities)
+        self.state_positions = self._positions(states)
+        self.sorted_codes = sorted((code, position) for position, code in enumerate(self.codes))
+        self.sorted_cities = sorted((city, position) for position, city in enumerate(self.cities))
+
+        # Bigram -> positions (ascending) of airports whose name or city contains it
+        self.grams: Dict[str, List[int]] = {}
+        for position, (name, city) in enumerate(zip(self.names, self.cities)):
+            for gram in _grams(name) | _grams(city):
+                self.grams.setdefault(gram, []).append(position)
+
+    @staticmethod
+    def _positions(values: List[str]) -> Dict[str, List[int]]:
+        positions: Dict[str, List[int]] = {}
+        for position, value in enumerate(values):
+            positions.setdefault(value, []).append(position)
+        return positions
+
+    @staticmethod
+    def _prefixed(pairs: List[Tuple[str, int]], prefix: str) -> Iterable[int]:
+        """Positions whose value starts with prefix, from a sorted (value, position) array"""
+        for i in range(bisect_left(pairs, (prefix,)), len(pairs)):
+            value, position = pairs[i]
+            if not value.startswith(prefix):
+                return
+            yield position
+
+    def _substring_candidates(self, query: str) -> Iterable[int]:
+        """Positions whose name or city may contain query (all of them for queries shorter than a bigram)"""
+        if len(query) < GRAM_SIZE:
+            return range(len(self.airports))
+        lists = [self.grams.get(gram) for gram in _grams(query)]
+        if any(positions is None for positions in lists):
+            return ()
+        return min(lists, key=len)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """The best limit airports for a lowercased, stripped query, with their relevance"""
+        # (relevance, candidate positions, check each candidate must pass)
+        tiers = [
+            (CODE_EXACT, lambda: self.code_positions.get(query, ()), None),
+            (CODE_PREFIX, lambda: self._prefixed(self.sorted_codes, query), None),
+            (CITY_EXACT, lambda: self.city_positions.get(query, ()), None),
+            (CITY_PREFIX, lambda: self._prefixed(self.sorted_cities, query), None),
+            (STATE_EXACT, lambda: self.state_positions.get(query, ()), None),
+            (NAME_CONTAINS, lambda: self._substring_candidates(query), lambda p: query in self.names[p]),
+            (CITY_CONTAINS, lambda: self._substring_candidates(query), lambda p: query in self.cities[p]),
+        ]
+
+        # Every match of a better tier was taken before a tier is reached, so skipping taken positions is enough
+        taken: Dict[int, int] = {}
+        for relevance, candidates, matches in tiers:
+            if len(taken) >= limit:
+                break
+            found = (position for position in candidates()
+                     if position not in taken and (matches is None or matches(position)))
+            for position in heapq.nsmallest(limit - len(taken), found):
+                taken[position] = relevance
+
+        results = []
+        for position, relevance in taken.items():
+            match = self.airports[position].copy()
+            match['relevance'] = relevance
+            results.append(match)
+        return results
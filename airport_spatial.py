@@ -0,0 +1,122 @@
+"""
+Airport Spatial Index for Manajet
+Answers nearest-airport and radius queries without measuring every airport
+
+Airports are placed on the unit sphere as (x, y, z) points, where the
+straight-line (chord) distance between two points grows with their
+great-circle distance, so the nearest airports by chord are the nearest by
+air too. A k-d tree over the points splits them in half along their widest
+axis until leaves hold a handful each; a query descends to the leaf around
+its point, then only visits the other side of a split while that split is
+closer than the worst result so far. Distances come out in miles, equal to
+AirportDatabase.haversine_distance.
+"""
+
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+# Radius of Earth in miles
+EARTH_RADIUS_MILES = 3959
+
+# Most points a leaf of the tree holds
+LEAF_SIZE = 16
+
+
+def _point(lat: float, lon: float) -> Tuple[float, float, float]:
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _miles(chord_squared: float) -> float:
+    """Great-circle distance of a squared chord length"""
+    return 2 * math.asin(min(1.0, math.sqrt(chord_squared) / 2)) * EARTH_RADIUS_MILES
+
+
+class AirportSpatialIndex:
+    """k-d tree over the coordinates of a fixed list of airports (positions index lats and lons)"""
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float]):
+        order = list(range(len(lats)))
+        points = [_point(lat, lon) for lat, lon in zip(lats, lons)]
+
+        # Nodes as (start, end, axis, split, left, right) over order[start:end]; leaves have left == -1
+        self.nodes: List[Tuple[int, int, int, float, int, int]] = []
+        if points:
+            self._build(order, points)
+        # Points (x, y, z, position) in tree order, so each leaf is one slice
+        self.points = [(*points[position], position) for position in order]
+
+    def _build(self, order: List[int], points: List[Tuple[float, float, float]]):
+        self.nodes.append((0, len(order), 0, 0.0, -1, -1))
+        pending = [0]
+        while pending:
+            node = pending.pop()
+            start, end = self.nodes[node][:2]
+            if end - start <= LEAF_SIZE:
+                continue
+            members = order[start:end]
+            spreads = [max(points[p][axis] for p in members) - min(points[p][axis] for p in members)
+                       for axis in range(3)]
+            axis = spreads.index(max(spreads))
+            members.sort(key=lambda p: points[p][axis])
+            order[start:end] = members
+            middle = (start + end) // 2
+            left, right = len(self.nodes), len(self.nodes) + 1
+            self.nodes.append((start, middle, 0, 0.0, -1, -1))
+            self.nodes.append((middle, end, 0, 0.0, -1, -1))
+            self.nodes[node] = (start, end, axis, points[order[middle]][axis], left, right)
+            pending.extend((left, right))
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> List[Tuple[float, int]]:
+        """(miles, position) of the k airports closest to a coordinate, closest first"""
+        if k <= 0 or not self.nodes:
+            return []
+        query = _point(lat, lon)
+        # Max-heap of (-chord squared, -position): the worst result so far is on top
+        best: List[Tuple[float, int]] = []
+
+        def visit(node):
+            start, end, axis, split, left, right = self.nodes[node]
+            if left < 0:
+                for x, y, z, position in self.points[start:end]:
+                    entry = (-((x - query[0]) ** 2 + (y - query[1]) ** 2 + (z - query[2]) ** 2), -position)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+                return
+            offset = query[axis] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < k or offset * offset <= -best[0][0]:
+                visit(far)
+
+        visit(0)
+        return [(_miles(-chord_squared), -position) for chord_squared, position in sorted(best, reverse=True)]
+
+    def within(self, lat: float, lon: float, miles: float) -> List[Tuple[float, int]]:
+        """(miles, position) of every airport within miles of a coordinate, closest first"""
+        if miles < 0 or not self.nodes:
+            return []
+        query = _point(lat, lon)
+        angle = miles / EARTH_RADIUS_MILES
+        limit = 4.0 if angle >= math.pi else (2 * math.sin(angle / 2)) ** 2
+        limit *= 1 + 1e-12  # Keep airports exactly at the radius despite rounding
+        found = []
+        pending = [0]
+        while pending:
+            start, end, axis, split, left, right = self.nodes[pending.pop()]
+            if left < 0:
+                for x, y, z, position in self.points[start:end]:
+                    chord_squared = (x - query[0]) ** 2 + (y - query[1]) ** 2 + (z - query[2]) ** 2
+                    if chord_squared <= limit:
+                        found.append((chord_squared, position))
+                continue
+            offset = query[axis] - split
+            if offset < 0 or offset * offset <= limit:
+                pending.append(left)
+            if offset >= 0 or offset * offset <= limit:
+                pending.append(right)
+        found.sort()
+        return [(_miles(chord_squared), position) for chord_squared, position in found]
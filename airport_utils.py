@@ -1,85 +1,104 @@
 """
 Airport utilities for location-based search and flight duration calculations
+
+Airports are read from the compiled, memory-mapped form of the JSON file
+(see airport_binary), opened on first use rather than at import; the search
+and spatial indexes are built the first time they are needed.
+distance_matrix() computes many leg distances in one vectorized call over
+the coordinate columns with NumPy, and one haversine per pair without it.
+Route distances are kept in an LRU shared by both directions of a route, and
+durations use the performance profile of the aircraft model flying it.
 """
 
-import json
 import math
-from typing import List, Dict, Optional, Tuple
+import os
+import threading
+from functools import lru_cache
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
+from aircraft_profiles import profile_for_model
+from airport_binary import AirportFile, binary_path, open_airports
+from airport_search import AirportSearchIndex
+from airport_spatial import EARTH_RADIUS_MILES, AirportSpatialIndex
+
+try:
+    import numpy as np
+except ImportError:  # distance_matrix() computes pair by pair instead
+    np = None
+
+# Routes whose distance is kept by route_distance (0 disables caching)
+ROUTE_CACHE_SIZE = int(os.environ.get('ROUTE_CACHE_SIZE', 4096))
 
 
 class AirportDatabase:
     """Manages airport data and provides search/calculation utilities"""
 
-    def __init__(self, data_file: str = "airports_data.json"):
+    def __init__(self, data_file: str = "airports_data.json", compiled_file: Optional[str] = None,
+                 route_cache_size: int = ROUTE_CACHE_SIZE):
         self.data_file = data_file
-        self.airports: List[Dict] = []
-        self.load_airports()
+        self.compiled_file = compiled_file or binary_path(data_file)
+        self._airports: Optional[AirportFile] = None
+        self._search_index: Optional[AirportSearchIndex] = None
+        self._spatial_index: Optional[AirportSpatialIndex] = None
+        self._lock = threading.Lock()
+        self._route_distance = self._measure_route
+        if route_cache_size > 0:
+            self._route_distance = lru_cache(maxsize=route_cache_size)(self._measure_route)
 
     def load_airports(self):
-        """Load airport data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.airports = data.get('airports', [])
-            print(f"Loaded {len(self.airports)} airports from {self.data_file}")
-        except FileNotFoundError:
-            print(f"Warning: Airport data file {self.data_file} not found")
-            self.airports = []
+        """(Re)open the airport data, compiling the JSON file first if it changed"""
+        reloading = self._airports is not None
+        airports = open_airports(self.data_file, self.compiled_file)
+        print(f"Loaded {len(airports)} airports from {self.data_file}")
+        self._airports = airports
+        self._search_index = None
+        self._spatial_index = None
+        if reloading and hasattr(self._route_distance, 'cache_clear'):
+            self._route_distance.cache_clear()
+
+    @property
+    def airports(self) -> AirportFile:
+        """Every airport, in file order (see airport_binary.AirportFile)"""
+        if self._airports is None:
+            with self._lock:
+                if self._airports is None:
+                    self.load_airports()
+        return self._airports
+
+    @property
+    def search_index(self) -> AirportSearchIndex:
+        if self._search_index is None:
+            airports = self.airports
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = AirportSearchIndex(airports)
+        return self._search_index
+
+    @property
+    def spatial_index(self) -> AirportSpatialIndex:
+        if self._spatial_index is None:
+            airports = self.airports
+            with self._lock:
+                if self._spatial_index is None:
+                    self._spatial_index = AirportSpatialIndex(airports.lats, airports.lons)
+        return self._spatial_index
+
+    def _row(self, code: str) -> Optional[int]:
+        return self.airports.find(code.upper().strip())
 
     def search_airports(self, query: str, limit: int = 10) -> List[Dict]:
         """
         Search airports by location (city, state, airport name, or code)
-        Returns a list of matching airports
+        Returns a list of matching airports, best match first (see airport_search)
         """
         if not query or len(query) < 2:
             return []
 
-        query_lower = query.lower().strip()
-        matches = []
-
-        for airport in self.airports:
-            # Calculate relevance score
-            score = 0
-
-            # Exact code match (highest priority)
-            if airport['code'].lower() == query_lower:
-                score = 1000
-            # Code starts with query
-            elif airport['code'].lower().startswith(query_lower):
-                score = 500
-            # City exact match
-            elif airport['city'].lower() == query_lower:
-                score = 400
-            # City starts with query
-            elif airport['city'].lower().startswith(query_lower):
-                score = 300
-            # State match
-            elif airport['state'].lower() == query_lower:
-                score = 200
-            # Name contains query
-            elif query_lower in airport['name'].lower():
-                score = 100
-            # City contains query
-            elif query_lower in airport['city'].lower():
-                score = 50
-
-            if score > 0:
-                match = airport.copy()
-                match['relevance'] = score
-                matches.append(match)
-
-        # Sort by relevance (highest first)
-        matches.sort(key=lambda x: x['relevance'], reverse=True)
-
-        return matches[:limit]
+        return self.search_index.search(query.lower().strip(), limit)
 
     def get_airport_by_code(self, code: str) -> Optional[Dict]:
         """Get airport details by IATA code"""
-        code_upper = code.upper().strip()
-        for airport in self.airports:
-            if airport['code'] == code_upper:
-                return airport
-        return None
+        row = self._row(code)
+        return self.airports[row] if row is not None else None
 
     @staticmethod
     def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -100,29 +119,61 @@ class AirportDatabase:
         a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
         c = 2 * math.asin(math.sqrt(a))
 
-        # Radius of Earth in miles
-        r = 3959
+        return c * EARTH_RADIUS_MILES
+
+    def distance_matrix(self, codes_a: Sequence[str], codes_b: Sequence[str]):
+        """
+        Distances in miles from every airport in codes_a to every airport in codes_b
 
-        return c * r
+        Returns a len(codes_a) x len(codes_b) NumPy array (a list of lists
+        without NumPy); pairs involving an unknown code are NaN.
+        """
+        lats, lons = self.airports.lats, self.airports.lons
+        rows_a = [self._row(code) for code in codes_a]
+        rows_b = [self._row(code) for code in codes_b]
+        if np is None:
+            return [[self.haversine_distance(lats[a], lons[a], lats[b], lons[b])
+                     if a is not None and b is not None else math.nan for b in rows_b] for a in rows_a]
+
+        rows_a = np.array([-1 if row is None else row for row in rows_a], dtype=int)
+        rows_b = np.array([-1 if row is None else row for row in rows_b], dtype=int)
+        if not len(lats):
+            return np.full((len(rows_a), len(rows_b)), np.nan)
+        # Views of the mapped columns - only the chosen rows are copied
+        lats, lons = np.frombuffer(lats, dtype=float), np.frombuffer(lons, dtype=float)
+        lat_a, lon_a = np.radians(lats[rows_a])[:, None], np.radians(lons[rows_a])[:, None]
+        lat_b, lon_b = np.radians(lats[rows_b])[None, :], np.radians(lons[rows_b])[None, :]
+        a = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+        distances = 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_MILES
+        distances[rows_a < 0, :] = np.nan
+        distances[:, rows_b < 0] = np.nan
+        return distances
+
+    def _measure_route(self, route: Tuple[str, str]) -> Optional[float]:
+        rows = [self._row(code) for code in route]
+        if None in rows:
+            return None
+        lats, lons = self.airports.lats, self.airports.lons
+        return self.haversine_distance(lats[rows[0]], lons[rows[0]], lats[rows[1]], lons[rows[1]])
+
+    def route_distance(self, departure_code: str, destination_code: str) -> Optional[float]:
+        """
+        Distance in miles between two airports, from the route cache when it was asked before
+        A route and its reverse share one entry; returns None if either airport is not found
+        """
+        route = tuple(sorted((departure_code.upper().strip(), destination_code.upper().strip())))
+        return self._route_distance(route)
 
     def calculate_distance(self, departure_code: str, destination_code: str) -> Optional[float]:
         """
         Calculate distance between two airports in miles
         Returns None if either airport is not found
         """
-        dep_airport = self.get_airport_by_code(departure_code)
-        dest_airport = self.get_airport_by_code(destination_code)
-
-        if not dep_airport or not dest_airport:
-            return None
-
-        return self.haversine_distance(
-            dep_airport['lat'], dep_airport['lon'],
-            dest_airport['lat'], dest_airport['lon']
-        )
+        return self.route_distance(departure_code, destination_code)
 
     def estimate_flight_duration(self, departure_code: str, destination_code: str,
-                                 average_speed_mph: int = 450) -> Optional[Tuple[int, int]]:
+                                 average_speed_mph: Optional[int] = None,
+                                 aircraft_model: Optional[str] = None) -> Optional[Tuple[int, int]]:
         """
         Estimate flight duration between two airports
         Returns (hours, minutes) tuple or None if airports not found
@@ -130,25 +181,61 @@ class AirportDatabase:
         Args:
             departure_code: IATA code of departure airport
             destination_code: IATA code of destination airport
-            average_speed_mph: Average cruising speed (default 450 mph for typical private jets)
+            average_speed_mph: Cruising speed overriding the aircraft's profile
+            aircraft_model: PrivateJet.model flying the route, for its cruise speed and
+                climb/descent allowance (450 mph and 30 minutes if unknown - see aircraft_profiles)
         """
-        distance = self.calculate_distance(departure_code, destination_code)
+        distance = self.route_distance(departure_code, destination_code)
 
         if distance is None:
             return None
 
-        # Add time for taxi, takeoff, climb, descent, landing (approximately 30 minutes)
-        ground_time_hours = 0.5
+        profile = profile_for_model(aircraft_model)
+        speed = average_speed_mph or profile.cruise_speed_mph
 
-        # Calculate flight time
-        flight_time_hours = distance / average_speed_mph
-        total_hours = flight_time_hours + ground_time_hours
+        # Cruise time plus taxi, takeoff, climb, descent and landing
+        total_hours = distance / speed + profile.climb_descent_minutes / 60
 
         hours = int(total_hours)
         minutes = int((total_hours - hours) * 60)
 
         return (hours, minutes)
 
+    def estimate_flight_durations(self, legs: Iterable[Tuple[str, str]],
+                                  aircraft_model: Optional[str] = None) -> List[Optional[Tuple[int, int]]]:
+        """
+        estimate_flight_duration for each (departure, destination) leg, for planning many routes
+        Repeated routes (in either direction) are measured once through the route cache
+        """
+        return [self.estimate_flight_duration(departure, destination, aircraft_model=aircraft_model)
+                for departure, destination in legs]
+
+    def _with_distances(self, found: List[Tuple[float, int]]) -> List[Dict]:
+        results = []
+        for miles, row in found:
+            airport = self.airports[row]
+            airport['distance_miles'] = miles
+            results.append(airport)
+        return results
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> List[Dict]:
+        """
+        The k airports closest to a coordinate, closest first
+        Each result carries its distance_miles (see airport_spatial)
+        """
+        return self._with_distances(self.spatial_index.nearest(lat, lon, k))
+
+    def within_radius(self, code: str, miles: float) -> Optional[List[Dict]]:
+        """
+        Other airports within miles of an airport, closest first, with their distance_miles
+        Returns None if the airport is not found
+        """
+        row = self._row(code)
+        if row is None:
+            return None
+        found = self.spatial_index.within(self.airports.lats[row], self.airports.lons[row], miles)
+        return self._with_distances([(distance, other) for distance, other in found if other != row])
+
     def get_airports_near_location(self, city: str, state: str = None, limit: int = 5) -> List[Dict]:
         """
         Find airports near a given city/location
@@ -0,0 +1,320 @@
+"""
+Dashboard Summary for Manajet
+Keeps the dashboard's counts and activity lists up to date as records change
+
+Records are bucketed per scope: None holds everything (admin, crew and
+mechanic dashboards) and each customer ID holds what that customer's users
+see (their jets plus those jets' flights and maintenance, and their
+passengers). Buckets keep counters, insertion-ordered sets of active
+flights/maintenance and date-sorted lists, so rendering the dashboard is a
+few bisections and slices rather than passes over every record.
+
+The same counters back /api/stats: version() moves whenever any bucket
+changes, so each scope's serialized stats are rebuilt at most once per change
+and pollers can revalidate against a content-derived ETag.
+"""
+
+import hashlib
+import json
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Items shown per dashboard list (recent completed flights show fewer)
+LIST_LIMIT = 10
+RECENT_LIMIT = 5
+
+# Collections that feed the dashboard
+SUMMARY_COLLECTIONS = ('passengers', 'crew', 'jets', 'flights', 'maintenance')
+
+
+class ScopeBuckets:
+    """Precomputed dashboard data for one scope (all records, or one customer's)"""
+
+    __slots__ = ('counts', 'active_flights', 'active_maintenance', 'departures', 'arrivals', 'maintenance_dates')
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.active_flights: Dict[str, None] = {}  # In Progress flight IDs, in insertion order
+        self.active_maintenance: Dict[str, None] = {}
+        self.departures: List[Tuple[datetime, str]] = []  # (departure_at, flight_id), sorted
+        self.arrivals: List[Tuple[datetime, str]] = []  # (arrival_at, flight_id), sorted
+        self.maintenance_dates: List[Tuple[datetime, str]] = []  # (scheduled_at, maintenance_id), sorted
+
+    def add(self, bucket: str, key, bulk: bool = False):
+        """Add key to a bucket ('count' increments counts[key]); bulk appends to sorted lists unsorted"""
+        if bucket == 'count':
+            self.counts[key] += 1
+            return
+        target = getattr(self, bucket)
+        if isinstance(target, dict):
+            target[key] = None
+        elif bulk:
+            target.append(key)
+        else:
+            insort(target, key)
+
+    def remove(self, bucket: str, key):
+        if bucket == 'count':
+            self.counts[key] -= 1
+            return
+        target = getattr(self, bucket)
+        if isinstance(target, dict):
+            target.pop(key, None)
+        else:
+            position = bisect_left(target, key)
+            if position < len(target) and target[position] == key:
+                del target[position]
+
+    def sort(self):
+        """Restore order after bulk adds"""
+        self.departures.sort()
+        self.arrivals.sort()
+        self.maintenance_dates.sort()
+
+
+def _owner_scopes(customer_ids: List[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(customer_id for customer_id in customer_ids if customer_id))
+
+
+def date_range(entries: List[Tuple[datetime, str]], start: datetime, end: datetime) -> List[Tuple[datetime, str]]:
+    """Entries of a sorted (datetime, id) list with start <= datetime < end"""
+    return entries[bisect_left(entries, (start,)):bisect_left(entries, (end,))]
+
+
+class DashboardSummary:
+    """
+    Dashboard counts and activity lists per scope, maintained from the manager's change events
+
+    Changes are only noted when they happen (the record may still be edited);
+    affected records are re-bucketed on the next snapshot(). A change to a jet
+    re-buckets its flights and maintenance too, since jet owners decide which
+    customer scopes those belong to.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._scopes: Dict[Optional[str], ScopeBuckets] = {}
+        # What each record contributed: (collection, record_id) -> (scopes, ((bucket, key), ...))
+        self._contributions: Dict[Tuple[str, str], Tuple[Tuple, Tuple]] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._needs_rebuild = True
+        self._version = 0
+        # Serialized /api/stats: (scope, with breakdown) -> (version, body, etag)
+        self._stats_cache: Dict[Tuple[Optional[str], bool], Tuple[int, str, str]] = {}
+        manager.add_change_listener(self._on_change)
+
+    def _on_change(self, collection: Optional[str], record_id: Optional[str]):
+        if collection == 'customers':
+            # customer_breakdown lists every customer, including those without records
+            for key in [key for key in self._stats_cache if key[1]]:
+                del self._stats_cache[key]
+        if collection is None or record_id is None:
+            # Full reload or a replaced collection
+            if collection is None or collection in SUMMARY_COLLECTIONS:
+                self._needs_rebuild = True
+        elif collection in SUMMARY_COLLECTIONS:
+            self._dirty.add((collection, record_id))
+
+    # Contributions
+    def _jet_owners(self, jet_id: str) -> Tuple[str, ...]:
+        jet = self.manager.jets.get(jet_id)
+        return _owner_scopes(jet.customer_ids) if jet else ()
+
+    def _contribution(self, collection: str, record) -> Tuple[Tuple, Tuple]:
+        """Scopes a record belongs to and the (bucket, key) items it adds to each"""
+        if collection == 'passengers':
+            scopes = (None, record.customer_id) if record.customer_id else (None,)
+            return scopes, (('count', 'passengers'),)
+        if collection == 'crew':
+            return (None,), (('count', 'crew'),)
+        if collection == 'jets':
+            return (None,) + _owner_scopes(record.customer_ids), (('count', 'jets'), ('count', f"jets:{record.status}"))
+
+        items = [('count', collection)]
+        if collection == 'flights':
+            record_id = record.flight_id
+            if record.status == 'In Progress':
+                items.append(('active_flights', record_id))
+            if record.departure_at:
+                items.append(('departures', (record.departure_at, record_id)))
+            if record.arrival_at:
+                items.append(('arrivals', (record.arrival_at, record_id)))
+        else:
+            record_id = record.maintenance_id
+            if record.status == 'In Progress':
+                items.append(('active_maintenance', record_id))
+            if record.scheduled_at:
+                items.append(('maintenance_dates', (record.scheduled_at, record_id)))
+        return (None,) + self._jet_owners(record.jet_id), tuple(items)
+
+    def _scope(self, scope: Optional[str]) -> ScopeBuckets:
+        buckets = self._scopes.get(scope)
+        if buckets is None:
+            buckets = self._scopes[scope] = ScopeBuckets()
+        return buckets
+
+    def _apply(self, key: Tuple[str, str], contribution: Optional[Tuple[Tuple, Tuple]], bulk: bool = False):
+        """Replace a record's previous contribution with a new one (None removes it)"""
+        previous = self._contributions.pop(key, None)
+        if previous == contribution:
+            if contribution is not None:
+                self._contributions[key] = contribution
+            return
+        self._version += 1
+        if previous is not None:
+            scopes, items = previous
+            for scope in scopes:
+                buckets = self._scopes[scope]
+                for bucket, item in items:
+                    buckets.remove(bucket, item)
+        if contribution is not None:
+            scopes, items = contribution
+            for scope in scopes:
+                buckets = self._scope(scope)
+                for bucket, item in items:
+                    buckets.add(bucket, item, bulk)
+            self._contributions[key] = contribution
+
+    def _rebuild(self):
+        self._version += 1
+        self._scopes = {}
+        self._contributions = {}
+        self._dirty = set()
+        self._needs_rebuild = False
+        for collection in SUMMARY_COLLECTIONS:
+            for record_id, record in getattr(self.manager, collection).items():
+                self._apply((collection, record_id), self._contribution(collection, record), bulk=True)
+        for buckets in self._scopes.values():
+            buckets.sort()
+
+    def _refresh(self):
+        """Bring the buckets up to date with changes noted since the last snapshot"""
+        if self._needs_rebuild:
+            self._rebuild()
+            return
+        dirty, self._dirty = self._dirty, set()
+        for collection, record_id in list(dirty):
+            if collection == 'jets':
+                dirty.update(('flights', f.flight_id) for f in self.manager.get_jet_flights(record_id))
+                dirty.update(('maintenance', m.maintenance_id) for m in self.manager.get_jet_maintenance(record_id))
+        # Jets first, so flights and maintenance see their current owners
+        for collection, record_id in sorted(dirty, key=lambda key: key[0] != 'jets'):
+            record = getattr(self.manager, collection).get(record_id)
+            contribution = self._contribution(collection, record) if record is not None else None
+            self._apply((collection, record_id), contribution)
+
+    def version(self) -> int:
+        """Counter that moves whenever any scope's buckets change"""
+        if self._needs_rebuild or self._dirty:
+            self._refresh()
+        return self._version
+
+    # Rendering
+    def stats(self, customer_id: Optional[str] = None) -> Dict[str, int]:
+        """Dashboard counters of one customer's scope, or of everything when customer_id is None"""
+        if self._needs_rebuild or self._dirty:
+            self._refresh()
+        buckets = self._scopes.get(customer_id) or ScopeBuckets()
+        everything = self._scopes.get(None) or ScopeBuckets()
+        counts = buckets.counts
+        return {
+            'total_passengers': counts['passengers'],
+            'total_crew': everything.counts['crew'],  # Crew visible to all
+            'total_jets': counts['jets'],
+            'total_flights': counts['flights'],
+            'total_maintenance': counts['maintenance'],
+            'active_flights': len(buckets.active_flights),
+            'available_jets': counts['jets:Available'],
+            'in_flight_jets': counts['jets:In Flight'],
+            'maintenance_jets': counts['jets:Maintenance'],
+        }
+
+    def customer_breakdown(self) -> Dict[str, Dict[str, int]]:
+        """Counters of every customer (crew are shared, so left out)"""
+        customer_ids = dict.fromkeys(self.manager.customers)
+        customer_ids.update((scope, None) for scope in self._scopes if scope is not None)
+        breakdown = {}
+        for customer_id in customer_ids:
+            stats = self.stats(customer_id)
+            del stats['total_crew']
+            breakdown[customer_id] = stats
+        return breakdown
+
+    def stats_json(self, customer_id: Optional[str] = None, breakdown: bool = False) -> Tuple[str, str]:
+        """
+        (body, etag) for /api/stats, serialized at most once per version and scope
+
+        The ETag hashes the body, so every worker hands out the same tag for
+        the same numbers whatever its own version counter says.
+        """
+        version = self.version()
+        key = (customer_id, breakdown)
+        cached = self._stats_cache.get(key)
+        if cached is None or cached[0] != version:
+            payload = self.stats(customer_id)
+            if breakdown:
+                payload['customers'] = self.customer_breakdown()
+            body = json.dumps(payload, sort_keys=True)
+            cached = self._stats_cache[key] = (version, body, hashlib.sha1(body.encode()).hexdigest())
+        return cached[1], cached[2]
+
+    def snapshot(self, customer_id: Optional[str] = None, now: Optional[datetime] = None) -> Tuple[Dict, Dict]:
+        """(stats, activity) for the dashboard of one customer's users, or of everyone when customer_id is None"""
+        stats = self.stats(customer_id)
+        buckets = self._scopes.get(customer_id) or ScopeBuckets()
+        manager = self.manager
+
+        # Calculate date ranges (whole days, so ranges end at the following midnight)
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today - timedelta(days=today.weekday())
+        week_end = week_start + timedelta(days=6)
+        one_day = timedelta(days=1)
+
+        flights_this_week = [manager.flights[flight_id] for _, flight_id
+                             in date_range(buckets.departures, week_start, week_end + one_day)[:LIST_LIMIT]]
+        upcoming_flights = self._first(
+            (manager.flights[flight_id] for _, flight_id
+             in date_range(buckets.departures, today, today + timedelta(days=7) + one_day)),
+            lambda f: f.status == 'Scheduled', LIST_LIMIT)
+        maintenance_this_week = self._first(
+            (manager.maintenance[maintenance_id] for _, maintenance_id
+             in date_range(buckets.maintenance_dates, week_start, week_end + one_day)),
+            lambda m: m.status in ('Scheduled', 'In Progress'), LIST_LIMIT)
+        recent_completed = self._first(
+            (manager.flights[flight_id] for _, flight_id
+             in reversed(date_range(buckets.arrivals, today - timedelta(days=7), today + one_day))),
+            lambda f: f.status == 'Completed', RECENT_LIMIT)
+
+        activity = {
+            'active_flights': [manager.flights[i] for i in self._first_keys(buckets.active_flights, LIST_LIMIT)],
+            'flights_this_week': flights_this_week,
+            'upcoming_flights': upcoming_flights,
+            'active_maintenance': [manager.maintenance[i]
+                                   for i in self._first_keys(buckets.active_maintenance, LIST_LIMIT)],
+            'maintenance_this_week': maintenance_this_week,
+            'recent_completed': recent_completed,
+            'week_start': week_start.strftime('%Y-%m-%d'),
+            'week_end': week_end.strftime('%Y-%m-%d'),
+        }
+        return stats, activity
+
+    @staticmethod
+    def _first(records, predicate, limit: int) -> List[Any]:
+        matches = []
+        for record in records:
+            if predicate(record):
+                matches.append(record)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    @staticmethod
+    def _first_keys(ordered: Dict[str, None], limit: int) -> List[str]:
+        keys = []
+        for key in ordered:
+            keys.append(key)
+            if len(keys) == limit:
+                break
+        return keys
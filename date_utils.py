@@ -4,11 +4,27 @@ Centralized date parsing and formatting to avoid duplication
 """
 
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Formats accepted by parse_datetime, in the order they are tried
+DATETIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+]
+
+# Entries kept by parse_datetime_cached (0 disables caching)
+DATE_CACHE_SIZE = int(os.environ.get('DATE_CACHE_SIZE', 4096))
+
 
 def parse_datetime(date_string: str) -> Optional[datetime]:
     """
@@ -19,10 +35,16 @@ def parse_datetime(date_string: str) -> Optional[datetime]:
     - YYYY-MM-DD HH:MM:SS
     - YYYY-MM-DD HH:MM
     - YYYY-MM-DD
+    - YYYY-MM-DDTHH:MM[:SS] (datetime-local form values)
     - MM/DD/YYYY HH:MM
     - MM/DD/YYYY
     - DD/MM/YYYY HH:MM
     - DD/MM/YYYY
+
+    ISO strings take a fast path through datetime.fromisoformat, and slash
+    dates go straight to the one format their fields fit (day-first only
+    when the first field cannot be a month). Anything else falls back to
+    trying every format in turn.
     """
     if not date_string:
         return None
@@ -30,17 +52,24 @@ def parse_datetime(date_string: str) -> Optional[datetime]:
     # Strip whitespace
     date_string = date_string.strip()
 
-    formats = [
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d %H:%M',
-        '%Y-%m-%d',
-        '%m/%d/%Y %H:%M',
-        '%m/%d/%Y',
-        '%d/%m/%Y %H:%M',
-        '%d/%m/%Y',
-    ]
-
-    for fmt in formats:
+    length = len(date_string)
+    # The time part must be digits and colons - fromisoformat would also accept UTC offsets
+    # ("09:30+01") and return aware datetimes, which cannot be compared with the naive ones stored
+    if length in (10, 16, 19) and date_string[4] == '-' and date_string[7] == '-' \
+            and (length == 10 or (date_string[10] in ' T' and _is_clock(date_string[11:]))):
+        try:
+            return datetime.fromisoformat(date_string)
+        except ValueError:
+            pass
+    elif '/' in date_string:
+        fmt = _slash_format(date_string)
+        if fmt:
+            try:
+                return datetime.strptime(date_string, fmt)
+            except ValueError:
+                pass
+
+    for fmt in DATETIME_FORMATS:
         try:
             return datetime.strptime(date_string, fmt)
         except ValueError:
@@ -51,6 +80,28 @@ def parse_datetime(date_string: str) -> Optional[datetime]:
     return None
 
 
+def _is_clock(text: str) -> bool:
+    return all(char.isdigit() or char == ':' for char in text)
+
+
+def _slash_format(date_string: str) -> Optional[str]:
+    """The MM/DD/YYYY or DD/MM/YYYY format (with or without time) a slash date should match"""
+    date_part, _, time_part = date_string.partition(' ')
+    first = date_part.split('/', 1)[0]
+    if not first.isdigit():
+        return None
+    fmt = '%d/%m/%Y' if int(first) > 12 else '%m/%d/%Y'
+    return f"{fmt} %H:%M" if time_part else fmt
+
+
+if DATE_CACHE_SIZE > 0:
+    # Bounded LRU over parse_datetime for callers that see the same strings repeatedly
+    # (datetimes are immutable, so cached results can be shared)
+    parse_datetime_cached = lru_cache(maxsize=DATE_CACHE_SIZE)(parse_datetime)
+else:
+    parse_datetime_cached = parse_datetime
+
+
 def format_datetime(dt: datetime, include_time: bool = True) -> str:
     """
     Format datetime object to standard string format
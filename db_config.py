@@ -1,12 +1,25 @@
 """
 Database Configuration for PostgreSQL
 Handles connection to PostgreSQL database with fallback to JSON
+
+Connections are pooled (QueuePool) because gunicorn workers are long-lived;
+the pool is sized from the environment:
+
+    DB_POOL_SIZE       connections kept open per worker (default 5, 0 disables pooling)
+    DB_MAX_OVERFLOW    extra connections allowed under load (default 10)
+    DB_POOL_RECYCLE    seconds before a connection is replaced (default 1800)
+    DB_POOL_TIMEOUT    seconds to wait for a free connection (default 30)
 """
 
 import os
+import threading
+import time
+from typing import Dict, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 # Get database URL from environment variable
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
@@ -18,25 +31,161 @@ if DATABASE_URL.startswith('postgres://'):
 # Check if we should use PostgreSQL or JSON
 USE_POSTGRES = bool(DATABASE_URL)
 
+# Connection pool settings
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
 # Create SQLAlchemy base
 Base = declarative_base()
 
+
+class PoolMetrics:
+    """Thread-safe counters for connection checkouts, updated by InstrumentedQueuePool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_checkout(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how often and how long callers wait for a connection"""
+
+    def __init__(self, *args, metrics: Optional[PoolMetrics] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool - keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.metrics.record_checkin()
+        super()._do_return_conn(record)
+
+    def _create_connection(self):
+        self.metrics.record_connect()
+        return super()._create_connection()
+
+
+def get_database_url() -> str:
+    """Database URL from the environment, normalized for SQLAlchemy"""
+    return DATABASE_URL
+
+
+def make_engine(database_url: str, pool_size: int = POOL_SIZE, max_overflow: int = MAX_OVERFLOW,
+                pool_recycle: int = POOL_RECYCLE, pool_timeout: float = POOL_TIMEOUT):
+    """Create an engine with an instrumented connection pool (pool_size=0 disables pooling)"""
+    if pool_size <= 0:
+        return create_engine(database_url, poolclass=NullPool, echo=False)
+
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,  # Replace connections before the server drops idle ones
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,  # Verify connections before using
+        echo=False,  # Set to True for SQL query logging
+    )
+
+
+def pool_status(db_engine=None) -> Dict:
+    """Current pool occupancy plus checkout/wait metrics for an engine (default: the app engine)"""
+    db_engine = db_engine or engine
+    if db_engine is None:
+        return {'pooled': False}
+
+    pool = db_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {'pooled': False, 'status': pool.status()}
+
+    status = {
+        'pooled': True,
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': pool._max_overflow,
+    }
+    status.update(pool.metrics.snapshot())
+    return status
+
+
 # Database engine and session
 engine = None
 SessionLocal = None
 
 if USE_POSTGRES:
-    # Create engine with connection pooling
-    engine = create_engine(
-        DATABASE_URL,
-        poolclass=NullPool,  # Disable pooling for serverless environments
-        echo=False,  # Set to True for SQL query logging
-        pool_pre_ping=True,  # Verify connections before using
-    )
+    engine = make_engine(DATABASE_URL)
 
     # Create session factory
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _reset_pool_after_fork():
+    """Give a forked worker its own pool instead of sharing the parent's sockets"""
+    if engine is not None:
+        # close=False leaves the parent's connections alone; the child opens fresh ones
+        engine.dispose(close=False)
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = PoolMetrics()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
 def get_db():
     """Get database session"""
     if not USE_POSTGRES or not SessionLocal:
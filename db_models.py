@@ -16,6 +16,7 @@ class CustomerModel(Base):
     email = Column(String(200))
     phone = Column(String(50))
     address = Column(Text)
+    lead_pilot_id = Column(String(50))  # Crew ID of assigned lead pilot for approvals
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -37,7 +38,11 @@ class PassengerModel(Base):
 
     passenger_id = Column(String(50), primary_key=True)
     name = Column(String(200), nullable=False)
+    middle_name = Column(String(200))
+    date_of_birth = Column(String(50))
+    gender = Column(String(10))
     passport_number = Column(String(100))
+    passport_country = Column(String(100))
     nationality = Column(String(100))
     passport_expiry = Column(String(50))
     contact = Column(String(200))
@@ -50,7 +55,14 @@ class CrewModel(Base):
 
     crew_id = Column(String(50), primary_key=True)
     name = Column(String(200), nullable=False)
-    role = Column(String(100))  # Pilot, Co-pilot, Flight Attendant
+    middle_name = Column(String(200))
+    role = Column(String(100))  # Pilot, Co-pilot, Flight Attendant (CrewMember.crew_type)
+    date_of_birth = Column(String(50))
+    gender = Column(String(10))
+    passport_number = Column(String(100))
+    passport_country = Column(String(100))
+    nationality = Column(String(100))
+    passport_expiry = Column(String(50))
     license_number = Column(String(100))
     license_expiry = Column(String(50))
     contact = Column(String(200))
@@ -62,10 +74,11 @@ class JetModel(Base):
 
     jet_id = Column(String(50), primary_key=True)
     model = Column(String(200), nullable=False)
-    registration = Column(String(100), unique=True)
+    registration = Column(String(100), unique=True)  # PrivateJet.tail_number
     capacity = Column(Integer)
     status = Column(String(50))  # Available, In Flight, Maintenance
-    customer_id = Column(String(50), index=True)
+    customer_id = Column(String(50), index=True)  # Primary owner
+    customer_ids = Column(JSON)  # All owners (shared jets)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -80,7 +93,11 @@ class FlightModel(Base):
     arrival_time = Column(String(50))
     passenger_ids = Column(JSON)  # Store as JSON array
     crew_ids = Column(JSON)  # Store as JSON array
-    status = Column(String(50))  # Scheduled, In Progress, Completed, Cancelled
+    status = Column(String(50), index=True)  # Scheduled, In Progress, Completed, Cancelled
+    approval_status = Column(String(50), index=True)  # Pending, Approved, Rejected
+    requested_by = Column(String(50))
+    approved_by = Column(String(50))
+    approval_date = Column(String(50))
     customer_id = Column(String(50), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -92,10 +109,32 @@ class MaintenanceModel(Base):
     jet_id = Column(String(50), nullable=False, index=True)
     maintenance_type = Column(String(200))  # Routine, Engine, Avionics, etc.
     scheduled_date = Column(String(50))
-    completion_date = Column(String(50))
+    completion_date = Column(String(50))  # MaintenanceRecord.completed_date
     description = Column(Text)
-    status = Column(String(50))  # Scheduled, In Progress, Completed
+    status = Column(String(50), index=True)  # Scheduled, In Progress, Completed
     performed_by = Column(String(200))
     customer_id = Column(String(50), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+# Single-row counter bumped on every save so workers can detect each other's commits
+class StorageVersionModel(Base):
+    __tablename__ = 'storage_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Highest record ID number handed out per ID prefix (FL, JET, ...) - workers reserve blocks from it
+class IdSequenceModel(Base):
+    __tablename__ = 'id_sequences'
+
+    prefix = Column(String(20), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+# Most recent record changes, numbered from the 'changes' row of id_sequences - clients sync from it
+class ChangeLogModel(Base):
+    __tablename__ = 'change_log'
+
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    collection = Column(String(50), nullable=False)
+    record_id = Column(String(50), nullable=False)
@@ -0,0 +1,441 @@
+"""
+SQL Storage Backend for JetScheduleManager
+Keeps records in PostgreSQL (or SQLite for local testing) using the db_models tables.
+Records are fetched per operation with indexed queries instead of being loaded up front.
+"""
+
+import logging
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import JSON, case, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from db_config import Base
+from db_models import (
+    CustomerModel, UserModel, PassengerModel, CrewModel,
+    JetModel, FlightModel, MaintenanceModel, StorageVersionModel, IdSequenceModel, ChangeLogModel
+)
+from storage import CHANGE_SEQUENCE, DEFAULT_CHANGE_FEED_SIZE, ordered_changes
+
+logger = logging.getLogger(__name__)
+
+# Table and primary key for each manager collection
+TABLES = {
+    'users': (UserModel, 'user_id'),
+    'customers': (CustomerModel, 'customer_id'),
+    'passengers': (PassengerModel, 'passenger_id'),
+    'crew': (CrewModel, 'crew_id'),
+    'jets': (JetModel, 'jet_id'),
+    'flights': (FlightModel, 'flight_id'),
+    'maintenance': (MaintenanceModel, 'maintenance_id'),
+}
+
+# Entity fields stored under a different column name
+COLUMN_NAMES = {
+    'crew': {'crew_type': 'role'},
+    'jets': {'tail_number': 'registration'},
+    'maintenance': {'completed_date': 'completion_date'},
+}
+
+# LIKE patterns of the date texts that sort like the dates they parse to
+ISO_DATE_PATTERNS = ('____-__-__', '____-__-__ __:__', '____-__-__ __:__:__')
+
+
+class SqlCollection:
+    """
+    Dict-like view of one table, used in place of the manager's in-memory dicts
+
+    Entities handed out are cached until the next save or refresh, so an entity
+    edited in place and then passed to mark_changed() is the one that gets
+    written. Added, deleted and changed (pinned) entities are held until saved.
+    """
+
+    def __init__(self, storage: 'SqlStorage', name: str, entity_class):
+        self.storage = storage
+        self.name = name
+        self.entity_class = entity_class
+        self.model, key_name = TABLES[name]
+        self.key_column = getattr(self.model, key_name)
+        self.fields = {column: field for field, column in COLUMN_NAMES.get(name, {}).items()}
+        self._cache: Dict[str, Any] = {}
+        self._pending: Dict[str, Any] = {}  # record_id -> entity, or None when deleted
+        self._iso_columns: Dict[str, bool] = {}  # date column -> whether every value is ISO or blank
+
+    # Conversion
+    def _to_entity(self, row) -> Any:
+        """Build (or reuse the cached) entity for a database row"""
+        record_id = getattr(row, self.key_column.key)
+        entity = self._cache.get(record_id)
+        if entity is None:
+            data = {}
+            for column in self.model.__table__.columns:
+                value = getattr(row, column.key)
+                # Columns added later are NULL on older rows - let from_dict apply its defaults
+                if value is not None:
+                    data[self.fields.get(column.key, column.key)] = value
+            entity = self.entity_class.from_dict(data)
+            self._cache[record_id] = entity
+        return entity
+
+    def to_row(self, entity) -> Dict:
+        """Column values for an entity"""
+        return entity_to_row(self.name, entity)
+
+    def _rows(self, *criteria) -> List[Any]:
+        """Entities for rows matching criteria, with unsaved local changes applied"""
+        with self.storage.session_factory() as session:
+            rows = session.execute(select(self.model).where(*criteria).order_by(self.key_column)).scalars().all()
+            return [self._to_entity(row) for row in rows
+                    if getattr(row, self.key_column.key) not in self._pending]
+
+    # Mapping interface
+    def __getitem__(self, record_id: str):
+        if record_id in self._pending:
+            entity = self._pending[record_id]
+            if entity is None:
+                raise KeyError(record_id)
+            return entity
+
+        entity = self._cache.get(record_id)
+        if entity is not None:
+            return entity
+
+        with self.storage.session_factory() as session:
+            row = session.get(self.model, record_id)
+            if row is None:
+                raise KeyError(record_id)
+            return self._to_entity(row)
+
+    def get(self, record_id: str, default=None):
+        try:
+            return self[record_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, record_id) -> bool:
+        return self.get(record_id) is not None
+
+    def __setitem__(self, record_id: str, entity):
+        self._pending[record_id] = entity
+        self._cache[record_id] = entity
+
+    def __delitem__(self, record_id: str):
+        if record_id not in self:
+            raise KeyError(record_id)
+        self._pending[record_id] = None
+        self._cache.pop(record_id, None)
+
+    def pop(self, record_id: str, *default):
+        try:
+            entity = self[record_id]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[record_id]
+        return entity
+
+    def keys(self) -> List[str]:
+        with self.storage.session_factory() as session:
+            stored = session.execute(select(self.key_column).order_by(self.key_column)).scalars().all()
+        keys = [k for k in stored if k not in self._pending]
+        keys.extend(k for k, entity in self._pending.items() if entity is not None)
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        if not self._pending:
+            with self.storage.session_factory() as session:
+                return session.execute(select(func.count()).select_from(self.model)).scalar_one()
+        return len(self.keys())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def values(self) -> List[Any]:
+        entities = self._rows()
+        entities.extend(entity for entity in self._pending.values() if entity is not None)
+        return entities
+
+    def items(self) -> List[tuple]:
+        return [(getattr(entity, self.key_column.key), entity) for entity in self.values()]
+
+    def find_by(self, field: str, value) -> List[Any]:
+        """Entities whose field equals value (or, for list fields, contains it)"""
+        column_name = COLUMN_NAMES.get(self.name, {}).get(field, field)
+        column = self.model.__table__.columns.get(column_name)
+        if column is not None and not isinstance(column.type, JSON):
+            # Indexed query, then overlay unsaved local changes
+            matches = self._rows(column == value)
+            matches.extend(entity for entity in self._pending.values()
+                           if entity is not None and getattr(entity, field) == value)
+            return matches
+
+        return [entity for entity in self.values() if _matches(getattr(entity, field, None), value)]
+
+    def _column(self, field: str):
+        return self.model.__table__.columns.get(COLUMN_NAMES.get(self.name, {}).get(field, field))
+
+    def query_page(self, filters: Dict[str, List[str]], date_field: Optional[str], start: Optional[datetime],
+                   end: Optional[datetime], sort: str, descending: bool,
+                   offset: int, limit: int) -> Optional[Tuple[int, List[Any]]]:
+        """
+        (total, entities on the page) for a list_query.ListQuery page, or None if it cannot run in SQL
+
+        Dates are stored as text, so the date range and date sorts compare
+        strings - which only order like the parsed dates the in-memory path
+        compares while every value is ISO (ISO_DATE_PATTERNS) or blank. A
+        date column holding any other supported form (MM/DD/YYYY, a "T"
+        separator, ...) is left to the caller's in-memory path, as are
+        unsaved local changes and filters on JSON columns.
+        """
+        columns = [self._column(field) for field in [*filters, sort] + ([date_field] if date_field else [])]
+        if self._pending or any(column is None or isinstance(column.type, JSON) for column in columns):
+            return None
+        date_fields = {field for field in [date_field, sort] if field and self._is_date(field)}
+        if not all(self._iso_dates(self._column(field)) for field in date_fields):
+            return None
+
+        criteria = [self._column(field).in_(values) for field, values in filters.items()]
+        if date_field:
+            column = self._column(date_field)
+            criteria.append(column != '')
+            if start:
+                criteria.append(column >= start.strftime('%Y-%m-%d'))
+            if end:
+                criteria.append(column < end.strftime('%Y-%m-%d'))
+        sort_column = self._column(sort)
+        order = [sort_column, self.key_column]
+        if sort in date_fields:
+            # Blank dates last, as list_query.sort_key orders missing values
+            order.insert(0, case((or_(sort_column.is_(None), sort_column == ''), 1), else_=0))
+        if descending:
+            order = [term.desc() for term in order]
+
+        with self.storage.session_factory() as session:
+            total = session.execute(select(func.count()).select_from(self.model).where(*criteria)).scalar_one()
+            rows = session.execute(select(self.model).where(*criteria).order_by(*order)
+                                   .offset(offset).limit(limit)).scalars().all()
+            return total, [self._to_entity(row) for row in rows]
+
+    def _is_date(self, field: str) -> bool:
+        """Whether an entity field is a date string (a DateField with a parsed companion)"""
+        return hasattr(getattr(self.entity_class, field, None), 'parsed_name')
+
+    def _iso_dates(self, column) -> bool:
+        """Whether every value of a date column is ISO text or blank (checked once per save or refresh)"""
+        iso = self._iso_columns.get(column.key)
+        if iso is None:
+            with self.storage.session_factory() as session:
+                other = session.execute(select(self.key_column).where(
+                    column != '', ~or_(*[column.like(pattern) for pattern in ISO_DATE_PATTERNS])).limit(1)).first()
+            iso = self._iso_columns[column.key] = other is None
+        return iso
+
+    # Hooks used by the manager and SqlStorage
+    def pin(self, record_id: str):
+        """Hold a changed entity until the next save so in-place edits are not lost"""
+        if record_id not in self._pending:
+            entity = self._cache.get(record_id)
+            if entity is not None:
+                self._pending[record_id] = entity
+
+    def pending_items(self):
+        return list(self._pending.items())
+
+    def clear_pending(self):
+        self._pending = {}
+        self._cache = {}
+        self._iso_columns = {}
+
+    def invalidate(self):
+        """Forget cached rows so the next access sees other workers' commits"""
+        self._cache = {}
+        self._iso_columns = {}
+
+
+class SqlStorage:
+    """
+    Storage backend over the SQLAlchemy models in db_models
+
+    Used automatically when DATABASE_URL is set (db_config.USE_POSTGRES). The
+    manager's collections become SqlCollection objects, and save_data() writes
+    only the changed records in one transaction. Each save also appends its
+    numbered changes to the change_log table, which keeps the most recent
+    change_feed_size entries for incremental sync (see change_feed).
+    """
+
+    def __init__(self, engine=None, change_feed_size: int = DEFAULT_CHANGE_FEED_SIZE):
+        if engine is None:
+            from db_config import engine
+            if engine is None:
+                raise ValueError("SQL storage requires DATABASE_URL to be set")
+        self.engine = engine
+        self.session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self.collections: Dict[str, SqlCollection] = {}
+        self.change_feed_size = change_feed_size
+        # Change sequence the collections have caught up with (see load_changes)
+        self._synced_seq: Optional[int] = None
+
+        Base.metadata.create_all(bind=engine)
+        with self.session_factory.begin() as session:
+            if session.get(StorageVersionModel, 1) is None:
+                session.add(StorageVersionModel(id=1, version=0))
+            if session.get(IdSequenceModel, CHANGE_SEQUENCE) is None:
+                session.add(IdSequenceModel(prefix=CHANGE_SEQUENCE, value=0))
+
+    def open_collections(self, entity_classes: Dict[str, Any]) -> Dict[str, SqlCollection]:
+        """Create the table-backed collections the manager uses instead of dicts"""
+        self._synced_seq = self.change_sequence()
+        self.collections = {name: SqlCollection(self, name, entity_class)
+                            for name, entity_class in entity_classes.items()}
+        return self.collections
+
+    def lock(self, shared: bool = False):
+        """Transactions already isolate concurrent workers"""
+        return nullcontext()
+
+    def version(self) -> int:
+        """Counter bumped by every save from any worker"""
+        with self.session_factory() as session:
+            return session.execute(select(StorageVersionModel.version).where(StorageVersionModel.id == 1)).scalar_one()
+
+    def reserve_ids(self, prefix: str, count: int, floor: int = 0) -> int:
+        """Reserve count ID numbers above floor for prefix in one transaction; returns the first"""
+        for attempt in range(2):
+            try:
+                with self.session_factory.begin() as session:
+                    # The UPDATE locks the row, so concurrent workers get disjoint blocks
+                    bumped = session.execute(
+                        update(IdSequenceModel).where(IdSequenceModel.prefix == prefix).values(
+                            value=case((IdSequenceModel.value < floor, floor), else_=IdSequenceModel.value) + count)
+                    ).rowcount
+                    if not bumped:
+                        session.add(IdSequenceModel(prefix=prefix, value=floor + count))
+                        session.flush()
+                    last = session.execute(select(IdSequenceModel.value)
+                                           .where(IdSequenceModel.prefix == prefix)).scalar_one()
+                return last - count + 1
+            except IntegrityError:
+                if attempt:
+                    raise
+                # Another worker created the row first - bump it instead
+
+    def change_sequence(self) -> int:
+        """Sequence number of the last record change committed by any worker"""
+        with self.session_factory() as session:
+            return read_change_sequence(session)
+
+    def change_feed(self, since: int) -> Optional[Tuple[int, List[Tuple[int, str, str]]]]:
+        """
+        (current sequence, [(seq, collection, record ID)]) for records changed after since
+
+        Each record is listed once, at its latest change, oldest first. Returns
+        None if the change log no longer reaches back to since (or since is
+        from the future), in which case the caller has to start over.
+        """
+        with self.session_factory() as session:
+            # Log rows commit with the counter, so every change up to current is visible once it is
+            current = read_change_sequence(session)
+            oldest = session.execute(select(func.min(ChangeLogModel.seq))).scalar_one()
+            floor = current if oldest is None else oldest - 1
+            if since < floor or since > current:
+                return None
+            rows = session.execute(select(ChangeLogModel.seq, ChangeLogModel.collection, ChangeLogModel.record_id)
+                                   .where(ChangeLogModel.seq > since, ChangeLogModel.seq <= current)
+                                   .order_by(ChangeLogModel.seq)).all()
+        latest = {}
+        for seq, collection, record_id in rows:
+            latest.pop((collection, record_id), None)
+            latest[(collection, record_id)] = seq
+        return current, [(seq, collection, record_id) for (collection, record_id), seq in latest.items()]
+
+    def load(self) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """Nothing to preload - records are queried on demand"""
+        return None
+
+    def load_changes(self, since: Any) -> Optional[List[Dict]]:
+        """
+        Drop cached rows and say which records changed since the collections last caught up
+
+        The collections re-query rows on next access, so the change records
+        carry no values - just {'c': collection, 'id': record ID, 's': seq}
+        from the change log. Returns None if the log no longer reaches back
+        that far, as any record may have changed.
+        """
+        for collection in self.collections.values():
+            collection.invalidate()
+        feed = self.change_feed(self._synced_seq) if self._synced_seq is not None else None
+        if feed is None:
+            self._synced_seq = self.change_sequence()
+            return None
+        self._synced_seq, changes = feed
+        return [{'c': collection, 'id': record_id, 's': seq} for seq, collection, record_id in changes]
+
+    def save(self, collections: Dict[str, SqlCollection], changes: Dict[str, Set[str]]) -> int:
+        """
+        Upsert changed records and delete removed ones in a single transaction
+
+        Returns the sequence number of the first change. The change counter is
+        bumped first, so its row lock numbers concurrent saves in commit order.
+        """
+        ordered = ordered_changes(changes)
+        with self.session_factory.begin() as session:
+            if ordered:
+                session.execute(update(IdSequenceModel).where(IdSequenceModel.prefix == CHANGE_SEQUENCE)
+                                .values(value=IdSequenceModel.value + len(ordered)))
+            first_seq = read_change_sequence(session) - len(ordered) + 1
+            for seq, (name, record_id) in enumerate(ordered, first_seq):
+                collection = collections[name]
+                entity = collection.get(record_id)
+                if entity is None:
+                    session.execute(delete(collection.model).where(collection.key_column == record_id))
+                else:
+                    session.merge(collection.model(**collection.to_row(entity)))
+                session.add(ChangeLogModel(seq=seq, collection=name, record_id=record_id))
+            if any(changes.values()):
+                session.execute(update(StorageVersionModel).where(StorageVersionModel.id == 1)
+                                .values(version=StorageVersionModel.version + 1))
+            if ordered:
+                session.execute(delete(ChangeLogModel)
+                                .where(ChangeLogModel.seq <= first_seq + len(ordered) - 1 - self.change_feed_size))
+
+        if ordered and self._synced_seq == first_seq - 1:
+            # No other worker committed since we caught up - our own changes need no reload
+            self._synced_seq = first_seq + len(ordered) - 1
+        for collection in collections.values():
+            collection.clear_pending()
+        return first_seq
+
+
+def read_change_sequence(session) -> int:
+    """Current value of the change counter"""
+    return session.execute(select(IdSequenceModel.value)
+                           .where(IdSequenceModel.prefix == CHANGE_SEQUENCE)).scalar_one_or_none() or 0
+
+
+def restart_change_feed(session):
+    """Empty the change log and move the counter on, so clients holding older sequence numbers start over"""
+    session.execute(delete(ChangeLogModel))
+    if session.get(IdSequenceModel, CHANGE_SEQUENCE) is None:
+        session.add(IdSequenceModel(prefix=CHANGE_SEQUENCE, value=1))
+    else:
+        session.execute(update(IdSequenceModel).where(IdSequenceModel.prefix == CHANGE_SEQUENCE)
+                        .values(value=IdSequenceModel.value + 1))
+
+
+def entity_to_row(name: str, entity) -> Dict:
+    """Column values of the name table for an entity"""
+    names = COLUMN_NAMES.get(name, {})
+    return {names.get(field, field): value for field, value in entity.to_dict().items()}
+
+
+def _matches(attribute, value) -> bool:
+    if isinstance(attribute, list):
+        return value in attribute
+    return attribute == value
@@ -0,0 +1,267 @@
+"""
+Live Change Events for Manajet
+Pushes flight, jet and maintenance changes to Server-Sent Events subscribers
+
+ChangePublisher turns every save of a JetScheduleManager - request handlers
+and the StatusUpdater's scheduler alike - into small change events and
+publishes them on an EventHub, which hands them to the queues of this
+process's subscribers. With a FileEventChannel the events reach every
+gunicorn worker: publishers append them to a shared file that each worker
+with subscribers tails, a local stand-in for a pub/sub server such as Redis.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from storage import FileLock
+
+logger = logging.getLogger(__name__)
+
+# Collections whose changes are pushed, and the record fields each event carries
+EVENT_FIELDS = {
+    'flights': ('status', 'approval_status', 'jet_id', 'departure_time', 'arrival_time'),
+    'jets': ('status',),
+    'maintenance': ('status', 'jet_id', 'scheduled_date'),
+}
+
+# Events a subscriber may fall behind by before it is dropped (it reconnects and catches up)
+DEFAULT_QUEUE_SIZE = 1000
+
+# Event file size (bytes) at which the next publisher starts a new file
+DEFAULT_EVENT_FILE_BYTES = 1024 * 1024
+
+# Seconds between checks of the event file for new events
+DEFAULT_POLL_INTERVAL = 0.25
+
+
+def build_event(manager, seq: int, collection: str, record_id: str,
+                deleted_jet_id: Optional[str] = None) -> Optional[Dict]:
+    """
+    Change event for a saved record, or None if its collection is not pushed
+
+    Flight and maintenance events carry the owners of their jet
+    (customer_ids) so streams can be filtered without looking records up.
+    Deleted records only carry deleted=True - plus, for flights and
+    maintenance, the owners of deleted_jet_id, the jet the record was on.
+    """
+    fields = EVENT_FIELDS.get(collection)
+    if fields is None:
+        return None
+    event = {'seq': seq, 'collection': collection, 'id': record_id}
+    record = getattr(manager, collection).get(record_id)
+    if record is None:
+        event['deleted'] = True
+        jet_id = deleted_jet_id
+    else:
+        event.update((field, getattr(record, field)) for field in fields)
+        jet_id = record.jet_id if collection != 'jets' else None
+    if collection != 'jets':
+        jet = manager.get_jet(jet_id) if jet_id else None
+        event['customer_ids'] = list(jet.customer_ids) if jet else []
+    return event
+
+
+class Subscription:
+    """Bounded queue of the events one client accepts"""
+
+    def __init__(self, hub: 'EventHub', accept: Optional[Callable[[Dict], bool]], size: int):
+        self.hub = hub
+        self.accept = accept
+        self.overflowed = False
+        self._queue: queue.Queue = queue.Queue(size)
+
+    def offer(self, event: Dict):
+        if self.accept is not None and not self.accept(event):
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Next event, or None if none arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class FileEventChannel:
+    """
+    Event batches shared between processes through an append-only file
+
+    publish() appends a line per batch under a file lock, so all processes
+    read batches in the same order; poll() returns the events appended since
+    the previous call. Once the file outgrows max_bytes the next publisher
+    replaces it with an empty one - readers finish the old file through
+    their open handle before switching.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_EVENT_FILE_BYTES):
+        self.path = path
+        self.lock_file = f"{path}.lock"
+        self.max_bytes = max_bytes
+        self._file = None
+        self._pid = None
+
+    def publish(self, events: List[Dict]):
+        line = (json.dumps(events, separators=(',', ':')) + '\n').encode('utf-8')
+        with FileLock(self.lock_file):
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                tmp_file = f"{self.path}.tmp"
+                open(tmp_file, 'wb').close()
+                os.replace(tmp_file, self.path)
+            with open(self.path, 'ab') as f:
+                f.write(line)
+
+    def poll(self) -> List[Dict]:
+        if self._pid != os.getpid():
+            # Start at the end - older changes are caught up through the change feed
+            self._pid = os.getpid()
+            self._file = None
+            if os.path.exists(self.path):
+                self._file = open(self.path, 'rb')
+                self._file.seek(0, os.SEEK_END)
+            return []
+        if self._file is None:
+            # No events had been published yet
+            if not os.path.exists(self.path):
+                return []
+            self._file = open(self.path, 'rb')
+
+        events = self._read()
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = False
+        if replaced:
+            self._file.close()
+            self._file = open(self.path, 'rb')
+            events.extend(self._read())
+        return events
+
+    def _read(self) -> List[Dict]:
+        events = []
+        while True:
+            line = self._file.readline()
+            if not line.endswith(b'\n'):
+                # Nothing more, or a line still being written - read it again next time
+                self._file.seek(-len(line), os.SEEK_CUR)
+                return events
+            events.extend(json.loads(line))
+
+
+class EventHub:
+    """
+    Fans published events out to this process's subscribers
+
+    Without a channel events go straight to the subscribers. With one they
+    take the round trip through it, so every worker delivers the same events
+    in the same order; a thread polls the channel while anyone subscribes.
+    """
+
+    def __init__(self, channel: Optional[FileEventChannel] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def publish(self, events: List[Dict]):
+        if not events:
+            return
+        if self.channel is None:
+            self.deliver(events)
+            return
+        try:
+            self.channel.publish(events)
+        except OSError as e:
+            logger.warning(f"Could not publish {len(events)} change event(s): {e}")
+
+    def subscribe(self, accept: Optional[Callable[[Dict], bool]] = None) -> Subscription:
+        """Start queueing the events accept(event) approves (all if None); close() the subscription when done"""
+        subscription = Subscription(self, accept, self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+            self._start_polling()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def deliver(self, events: List[Dict]):
+        """Queue events for every subscriber that accepts them"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for event in events:
+                subscription.offer(event)
+
+    def _start_polling(self):
+        """Start the channel polling thread unless this process runs one (caller holds the lock)"""
+        if self.channel is None or (self._thread is not None and self._pid == os.getpid()):
+            return
+        self._pid = os.getpid()
+        self.channel.poll()  # The first poll only fixes the starting point - before subscribe() returns
+        self._thread = threading.Thread(target=self._poll, name='change-events', daemon=True)
+        self._thread.start()
+
+    def _poll(self):
+        while True:
+            try:
+                events = self.channel.poll()
+            except (OSError, ValueError):
+                logger.exception("Reading change events failed")
+                events = []
+            if events:
+                self.deliver(events)
+            time.sleep(self.poll_interval)
+
+
+class ChangePublisher:
+    """
+    Publishes an event for each flight, jet and maintenance record a manager saves
+
+    Remembers the jet of each flight and maintenance record it sees change -
+    deleted ones through manager.deleted_record - so the events of deleted
+    records still reach the customers owning that jet.
+    """
+
+    def __init__(self, manager, hub: EventHub):
+        self.manager = manager
+        self.hub = hub
+        self.jet_ids: Dict[Tuple[str, str], str] = {}
+        manager.add_change_listener(self._on_change)
+        manager.add_save_listener(self._on_save)
+
+    def build(self, seq: int, collection: str, record_id: str) -> Optional[Dict]:
+        """build_event, knowing the jets of deleted records"""
+        return build_event(self.manager, seq, collection, record_id, self.jet_ids.get((collection, record_id)))
+
+    def _on_change(self, collection: Optional[str], record_id: Optional[str]):
+        # Reloads are not scanned - records are remembered as they change
+        if collection not in ('flights', 'maintenance') or record_id is None:
+            return
+        record = getattr(self.manager, collection).get(record_id) or self.manager.deleted_record(collection, record_id)
+        if record is not None:
+            self.jet_ids[(collection, record_id)] = record.jet_id
+
+    def _on_save(self, changes: List[Tuple[int, str, str]]):
+        events = [self.build(*change) for change in changes]
+        for event in events:
+            if event is not None and not event.get('deleted') and event['collection'] != 'jets':
+                self.jet_ids[(event['collection'], event['id'])] = event['jet_id']
+        self.hub.publish([event for event in events if event is not None])
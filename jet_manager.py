@@ -3,19 +3,67 @@ Private Jet Schedule Management System
 Tracks passengers, flights, and maintenance schedules
 """
 
-import json
-import os
+import heapq
 import logging
+import os
+import sys
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, Callable, Collection, List, Dict, Optional, Set, Tuple
+from date_utils import parse_datetime_cached
+from storage import COLLECTIONS, DEFAULT_CHANGE_FEED_SIZE, DEFAULT_ID_BLOCK_SIZE, create_storage, ordered_changes
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+# Interned on load so the many records holding the same ID reference, status or airport code share one string
+_shared = sys.intern
+
+# Marks a DateField whose string has not been parsed yet
+_UNPARSED = object()
+
+
+class DateField:
+    """
+    Date string attribute that caches its parsed datetime
+
+    The string is kept in slot _<name> and its parse in slot _<name>_parsed.
+    The datetime is read through a companion attribute (parsed_name, e.g.
+    Flight.departure_at); it is parsed on first read and reset whenever the
+    string is assigned, so each value is parsed once.
+    """
+
+    def __init__(self, parsed_name: str):
+        self.parsed_name = parsed_name
+
+    def __set_name__(self, owner, name: str):
+        self.value_slot = getattr(owner, f"_{name}")
+        self.parsed_slot = getattr(owner, f"_{name}_parsed")
+        setattr(owner, self.parsed_name, property(self.parsed, doc=f"{name} as a datetime (None if unparseable)"))
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return self.value_slot.__get__(obj)
+
+    def __set__(self, obj, value):
+        self.value_slot.__set__(obj, value)
+        self.parsed_slot.__set__(obj, _UNPARSED)
+
+    def parsed(self, obj) -> Optional[datetime]:
+        value = self.parsed_slot.__get__(obj)
+        if value is _UNPARSED:
+            text = self.value_slot.__get__(obj)
+            value = parse_datetime_cached(text) if text else None
+            self.parsed_slot.__set__(obj, value)
+        return value
+
+
 class Customer:
     """Represents a customer who owns one or more jets"""
 
+    __slots__ = ('customer_id', 'name', 'company', 'email', 'phone', 'address', 'lead_pilot_id')
+
     def __init__(self, customer_id: str, name: str, company: str,
                  email: str, phone: str, address: str, lead_pilot_id: str = ""):
         self.customer_id = customer_id
@@ -63,6 +111,8 @@ class Customer:
 class User:
     """Represents a user with login credentials and role-based access"""
 
+    __slots__ = ('user_id', 'username', 'password_hash', 'role', 'related_id', 'email')
+
     def __init__(self, user_id: str, username: str, password_hash: str, role: str,
                  related_id: str = "", email: str = ""):
         self.user_id = user_id
@@ -103,6 +153,9 @@ class User:
 class Passenger:
     """Represents a passenger with personal and passport information - APIS compliant"""
 
+    __slots__ = ('passenger_id', 'name', 'middle_name', 'date_of_birth', 'gender', 'passport_number',
+                 'passport_country', 'nationality', 'passport_expiry', 'contact', 'customer_id')
+
     def __init__(self, passenger_id: str, name: str, passport_number: str,
                  nationality: str, passport_expiry: str, contact: str, customer_id: str = "",
                  date_of_birth: str = "", gender: str = "", passport_country: str = "",
@@ -143,7 +196,7 @@ class Passenger:
             data['nationality'],
             data['passport_expiry'],
             data['contact'],
-            data.get('customer_id', ''),  # Backwards compatibility
+            _shared(data.get('customer_id', '')),  # Backwards compatibility
             data.get('date_of_birth', ''),  # APIS fields with defaults
             data.get('gender', ''),
             data.get('passport_country', ''),
@@ -163,6 +216,8 @@ class Passenger:
 class PrivateJet:
     """Represents a private jet with its specifications - supports multiple customer ownership"""
 
+    __slots__ = ('jet_id', 'model', 'tail_number', 'capacity', 'customer_ids', 'status')
+
     def __init__(self, jet_id: str, model: str, tail_number: str,
                  capacity: int, customer_id: str = "", status: str = "Available"):
         self.jet_id = jet_id
@@ -230,6 +285,9 @@ class PrivateJet:
 class CrewMember:
     """Represents a crew member (pilot or cabin crew) with passport and license information - APIS compliant"""
 
+    __slots__ = ('crew_id', 'name', 'middle_name', 'crew_type', 'date_of_birth', 'gender', 'passport_number',
+                 'passport_country', 'nationality', 'passport_expiry', 'contact', 'license_number')
+
     def __init__(self, crew_id: str, name: str, crew_type: str, passport_number: str,
                  nationality: str, passport_expiry: str, contact: str,
                  license_number: Optional[str] = None, date_of_birth: str = "",
@@ -296,6 +354,14 @@ class CrewMember:
 class Flight:
     """Represents a scheduled flight with approval workflow"""
 
+    __slots__ = ('flight_id', 'jet_id', 'departure', 'destination', '_departure_time', '_departure_time_parsed',
+                 '_arrival_time', '_arrival_time_parsed', 'passenger_ids', 'crew_ids', 'status', 'approval_status',
+                 'requested_by', 'approved_by', 'approval_date')
+
+    # Strings as stored; departure_at/arrival_at give the parsed datetimes
+    departure_time = DateField('departure_at')
+    arrival_time = DateField('arrival_at')
+
     def __init__(self, flight_id: str, jet_id: str, departure: str,
                  destination: str, departure_time: str, arrival_time: str,
                  passenger_ids: List[str], crew_ids: List[str],
@@ -336,15 +402,15 @@ class Flight:
     def from_dict(cls, data: Dict):
         return cls(
             data['flight_id'],
-            data['jet_id'],
-            data['departure'],
-            data['destination'],
+            _shared(data['jet_id']),
+            _shared(data['departure']),
+            _shared(data['destination']),
             data['departure_time'],
             data['arrival_time'],
-            data['passenger_ids'],
-            data.get('crew_ids', []),  # Backwards compatibility
-            data.get('status', 'Scheduled'),
-            data.get('approval_status', 'Approved'),  # Default to approved for existing flights
+            list(map(_shared, data['passenger_ids'])),
+            list(map(_shared, data.get('crew_ids', []))),  # Backwards compatibility
+            _shared(data.get('status', 'Scheduled')),
+            _shared(data.get('approval_status', 'Approved')),  # Default to approved for existing flights
             data.get('requested_by', ''),
             data.get('approved_by', ''),
             data.get('approval_date', '')
@@ -367,6 +433,13 @@ class Flight:
 class MaintenanceRecord:
     """Represents a maintenance record for a jet"""
 
+    __slots__ = ('maintenance_id', 'jet_id', '_scheduled_date', '_scheduled_date_parsed', 'maintenance_type',
+                 'description', 'status', '_completed_date', '_completed_date_parsed')
+
+    # Strings as stored; scheduled_at/completed_at give the parsed datetimes
+    scheduled_date = DateField('scheduled_at')
+    completed_date = DateField('completed_at')
+
     def __init__(self, maintenance_id: str, jet_id: str, scheduled_date: str,
                  maintenance_type: str, description: str, status: str = "Scheduled",
                  completed_date: Optional[str] = None):
@@ -393,11 +466,11 @@ class MaintenanceRecord:
     def from_dict(cls, data: Dict):
         return cls(
             data['maintenance_id'],
-            data['jet_id'],
+            _shared(data['jet_id']),
             data['scheduled_date'],
-            data['maintenance_type'],
+            _shared(data['maintenance_type']),
             data['description'],
-            data.get('status', 'Scheduled'),
+            _shared(data.get('status', 'Scheduled')),
             data.get('completed_date')
         )
 
@@ -412,11 +485,101 @@ class MaintenanceRecord:
         return result
 
 
+# Entity class for each persisted collection
+ENTITY_CLASSES = {
+    'users': User,
+    'customers': Customer,
+    'passengers': Passenger,
+    'crew': CrewMember,
+    'jets': PrivateJet,
+    'flights': Flight,
+    'maintenance': MaintenanceRecord,
+}
+
+# Prefix of generated record IDs (FL001, JET002, ...) per collection
+ID_PREFIXES = {
+    'users': 'USER',
+    'customers': 'CUST',
+    'passengers': 'P',
+    'crew': 'CREW',
+    'jets': 'JET',
+    'flights': 'FL',
+    'maintenance': 'MAINT',
+}
+
+# Secondary indexes kept by JetScheduleManager: collection -> indexed fields
+# (list fields such as customer_ids index every element)
+INDEXED_FIELDS = {
+    'users': ['username'],
+    'passengers': ['customer_id'],
+    'jets': ['customer_ids'],
+    'flights': ['jet_id', 'status', 'approval_status'],
+    'maintenance': ['jet_id'],
+}
+
+# Collections whose changes can alter pending approval counts (approval status, jet owners, lead pilots)
+PENDING_APPROVAL_SOURCES = ('flights', 'jets', 'customers')
+
+# Parsed date attributes whose instants drive automatic status changes (see pop_due_transitions)
+TRANSITION_FIELDS = {
+    'flights': ('departure_at', 'arrival_at'),
+    'maintenance': ('scheduled_at', 'completed_at'),
+}
+
+
 class JetScheduleManager:
     """Main manager class for the private jet scheduling system"""
 
-    def __init__(self, data_file: str = "jet_schedule_data.json"):
+    def __init__(self, data_file: str = "jet_schedule_data.json", storage=None,
+                 id_block_size: Optional[int] = None, change_feed_size: Optional[int] = None):
         self.data_file = data_file
+        self.storage = storage or create_storage(data_file)
+        # Record IDs reserved from storage at a time (see _allocate_ids)
+        self.id_block_size = id_block_size or int(os.environ.get('ID_BLOCK_SIZE', DEFAULT_ID_BLOCK_SIZE))
+        # Unused reserved ID numbers per prefix: [next, last]
+        self._id_blocks: Dict[str, List[int]] = {}
+        # Highest ID number per prefix present when data was loaded
+        self._id_floors: Dict[str, int] = {}
+        # Record IDs changed since the last save, per collection
+        self._changes: Dict[str, Set[str]] = {}
+        # Entities of records deleted since the last save, for listeners describing the deletion
+        self._deleted_records: Dict[Tuple[str, str], Any] = {}
+        # Storage version our in-memory data corresponds to
+        self._storage_version = None
+        # Secondary indexes: (collection, field) -> value -> record IDs (a dict keeps insertion order)
+        self._indexes: Dict[Tuple[str, str], Dict[Any, Dict[str, None]]] = {}
+        # Values each record is currently indexed under (collection -> record ID -> values), for removal
+        self._index_keys: Dict[str, Dict[str, Tuple]] = {}
+        # Records changed since their last indexing, re-indexed before the next lookup
+        self._stale_index: Set[Tuple[str, str]] = set()
+        # Cached get_pending_approvals counts per pilot (None = all pilots)
+        self._pending_counts: Dict[Optional[str], int] = {}
+        # Min-heap of (instant, collection, record ID) status transitions, built on first use (None = rebuild)
+        self._transitions: Optional[List[Tuple[datetime, str, str]]] = None
+        # Current transition instants per (collection, record ID) - heap entries not listed here are stale
+        self._transition_keys: Dict[Tuple[str, str], Tuple[datetime, ...]] = {}
+        # Status of each scheduled record when it was last scheduled, to spot changes across full reloads
+        self._transition_statuses: Dict[Tuple[str, str], str] = {}
+        # Latest now passed to pop_due_transitions - instants up to it have been handed out
+        self._transitions_done: Optional[datetime] = None
+        # Records changed since their transitions were last scheduled
+        self._stale_transitions: Set[Tuple[str, str]] = set()
+        # Callbacks told about record changes (see add_change_listener)
+        self._change_listeners: List[Callable[[Optional[str], Optional[str]], None]] = []
+        # Callbacks told about the numbered changes of each save (see add_save_listener)
+        self._save_listeners: List[Callable[[List[Tuple[int, str, str]]], None]] = []
+        # When each record was last seen changing, per collection, oldest first (see modified_since)
+        self._modified_at: Dict[str, Dict[str, datetime]] = {}
+        # Per collection, the last full load - changes before it are unknown
+        self._modified_floor: Dict[str, datetime] = {}
+        # Records kept in the change feed at most (see changes_since)
+        self.change_feed_size = change_feed_size or int(os.environ.get('CHANGE_FEED_SIZE', DEFAULT_CHANGE_FEED_SIZE))
+        # Change sequence number of each recently committed record change, oldest first
+        self._change_feed: Dict[Tuple[str, str], int] = {}
+        # Sequence number after which the feed is complete (None = unknown until the next load)
+        self._feed_floor: Optional[int] = None
+        # Highest change sequence number our in-memory data includes
+        self._change_seq = 0
         self.users: Dict[str, User] = {}
         self.customers: Dict[str, Customer] = {}
         self.passengers: Dict[str, Passenger] = {}
@@ -424,84 +587,537 @@ class JetScheduleManager:
         self.jets: Dict[str, PrivateJet] = {}
         self.flights: Dict[str, Flight] = {}
         self.maintenance: Dict[str, MaintenanceRecord] = {}
+        self._rebuild_indexes()
         self.load_data()
 
-    def _generate_next_id(self, prefix: str, existing_dict: Dict) -> str:
-        """Generate next available ID with given prefix"""
-        if not existing_dict:
-            return f"{prefix}001"
-
-        # Extract numeric parts from existing IDs with this prefix
-        numbers = []
-        for key in existing_dict.keys():
-            if key.startswith(prefix):
-                try:
-                    num = int(key[len(prefix):])
-                    numbers.append(num)
-                except ValueError:
-                    continue
-
-        # Find next number
-        next_num = max(numbers) + 1 if numbers else 1
-        return f"{prefix}{next_num:03d}"
+    def _restore_id_counters(self):
+        """Reset reserved ID blocks and note the highest existing ID number per prefix"""
+        self._id_blocks = {}
+        self._id_floors = {}
+        for collection, prefix in ID_PREFIXES.items():
+            floor = 0
+            for key in getattr(self, collection).keys():
+                if key.startswith(prefix) and key[len(prefix):].isdigit():
+                    floor = max(floor, int(key[len(prefix):]))
+            self._id_floors[prefix] = floor
+
+    def _allocate_ids(self, collection: str, count: int = 1) -> List[str]:
+        """
+        Hand out new record IDs for a collection in O(1) each
+
+        IDs come from a block of numbers reserved in storage, so processes
+        sharing the data never allocate the same ID. A block is only
+        reserved when the current one runs out.
+        """
+        prefix = ID_PREFIXES[collection]
+        records = getattr(self, collection)
+        ids = []
+        while len(ids) < count:
+            block = self._id_blocks.get(prefix)
+            if not block or block[0] > block[1]:
+                size = max(self.id_block_size, count - len(ids))
+                first = self.storage.reserve_ids(prefix, size, self._id_floors.get(prefix, 0))
+                block = self._id_blocks[prefix] = [first, first + size - 1]
+            record_id = f"{prefix}{block[0]:03d}"
+            block[0] += 1
+            if record_id not in records:  # Skip numbers taken by records added with explicit IDs
+                ids.append(record_id)
+        return ids
+
+    def allocate_ids(self, collection: str, count: int) -> List[str]:
+        """Reserve count new IDs for a collection at once (for importers creating many records)"""
+        if collection not in ID_PREFIXES:
+            raise ValueError(f"Unknown collection: {collection}")
+        return self._allocate_ids(collection, count)
 
     def generate_user_id(self) -> str:
         """Generate next available user ID"""
-        return self._generate_next_id("USER", self.users)
+        return self._allocate_ids('users')[0]
 
     def generate_customer_id(self) -> str:
         """Generate next available customer ID"""
-        return self._generate_next_id("CUST", self.customers)
+        return self._allocate_ids('customers')[0]
 
     def generate_passenger_id(self) -> str:
         """Generate next available passenger ID"""
-        return self._generate_next_id("P", self.passengers)
+        return self._allocate_ids('passengers')[0]
 
     def generate_crew_id(self) -> str:
         """Generate next available crew ID"""
-        return self._generate_next_id("CREW", self.crew)
+        return self._allocate_ids('crew')[0]
 
     def generate_jet_id(self) -> str:
         """Generate next available jet ID"""
-        return self._generate_next_id("JET", self.jets)
+        return self._allocate_ids('jets')[0]
 
     def generate_flight_id(self) -> str:
         """Generate next available flight ID"""
-        return self._generate_next_id("FL", self.flights)
+        return self._allocate_ids('flights')[0]
 
     def generate_maintenance_id(self) -> str:
         """Generate next available maintenance ID"""
-        return self._generate_next_id("MAINT", self.maintenance)
+        return self._allocate_ids('maintenance')[0]
+
+    def _record_change(self, collection: str, record_id: str):
+        """Remember that a record was added, updated or deleted since the last save"""
+        self._changes.setdefault(collection, set()).add(record_id)
+        records = getattr(self, collection)
+        if hasattr(records, 'pin'):
+            records.pin(record_id)
+        elif collection in INDEXED_FIELDS:
+            # Indexed fields may still be edited after this call, so re-index lazily
+            self._stale_index.add((collection, record_id))
+        if collection in PENDING_APPROVAL_SOURCES:
+            self._pending_counts.clear()
+        if collection in TRANSITION_FIELDS and self._transitions is not None:
+            self._stale_transitions.add((collection, record_id))
+        self._notify_change(collection, record_id)
+
+    def _delete_record(self, collection: str, record_id: str):
+        """Remove a record, keeping its entity for listeners until the next save (see deleted_record)"""
+        self._deleted_records[(collection, record_id)] = getattr(self, collection).pop(record_id)
+        self._record_change(collection, record_id)
+
+    def deleted_record(self, collection: str, record_id: str):
+        """The entity of a record this manager deleted since its last save (None if it did not)"""
+        return self._deleted_records.get((collection, record_id))
+
+    def mark_changed(self, collection: str, record_id: str):
+        """Flag a record that was modified in place (e.g. jet.customer_ids.append) for the next save"""
+        if collection not in COLLECTIONS:
+            raise ValueError(f"Unknown collection: {collection}")
+        self._record_change(collection, record_id)
+
+    def add_change_listener(self, listener: Callable[[Optional[str], Optional[str]], None]):
+        """
+        Call listener(collection, record_id) whenever a record is added, changed or deleted
+
+        Covers local changes and those synced from other workers. record_id is
+        None when a whole collection was replaced, and collection is None too
+        after a full reload. The record may still be edited after the call, so
+        listeners should only note what is stale and read records later.
+        """
+        self._change_listeners.append(listener)
+
+    def add_save_listener(self, listener: Callable[[List[Tuple[int, str, str]]], None]):
+        """
+        Call listener([(seq, collection, record_id)]) after each save that commits changes
+
+        The list holds the save's changes in sequence order (a listed record
+        that no longer exists was deleted). Listeners run while the storage
+        lock is still held, so saves from all processes reach them in commit
+        order - they should only hand the changes on.
+        """
+        self._save_listeners.append(listener)
+
+    def _notify_change(self, collection: Optional[str], record_id: Optional[str]):
+        now = datetime.now()
+        if record_id is not None:
+            stamps = self._modified_at.setdefault(collection, {})
+            stamps.pop(record_id, None)  # Re-insert to keep stamps in time order
+            stamps[record_id] = now
+        else:
+            for name in [collection] if collection else COLLECTIONS:
+                self._modified_floor[name] = now
+                self._modified_at.pop(name, None)
+            # Which records changed is unknown - the feed restarts after the load (see _restart_change_feed)
+            self._change_feed = {}
+            self._feed_floor = None
+        for listener in self._change_listeners:
+            listener(collection, record_id)
+
+    def modified_since(self, collection: str, since: datetime) -> Optional[Set[str]]:
+        """
+        IDs of records added, changed or deleted at or after since, or None if unknown
+
+        Changes are timestamped as this process makes or syncs them, so records
+        changed by other workers are stamped a little late (never missed). Before
+        the last full load - including a refresh of SQL-backed storage whose
+        change log no longer reached back - nothing is known and None is returned.
+        """
+        floor = self._modified_floor.get(collection)
+        if floor is None or since < floor:
+            return None
+        record_ids = set()
+        for record_id, instant in reversed(self._modified_at.get(collection, {}).items()):
+            if instant < since:
+                break
+            record_ids.add(record_id)
+        return record_ids
+
+    def changes_since(self, since: int) -> Optional[Tuple[int, List[Tuple[int, str, str]]]]:
+        """
+        (current sequence, [(seq, collection, record ID)]) for records committed after change since
+
+        Every save numbers its changes from a sequence shared by all workers.
+        Each record is listed once, at its latest change, oldest first; a
+        listed record that no longer exists was deleted. Returns None when
+        the feed does not reach back to since - it keeps change_feed_size
+        records, and restarts whenever data is reloaded without saying which
+        records changed (other workers' saves outside journal mode) - so the
+        caller has to fetch everything again.
+        """
+        if hasattr(self.storage, 'change_feed'):
+            # SQL storage keeps a shared change log
+            return self.storage.change_feed(since)
+        if self._feed_floor is None or since < self._feed_floor or since > self._change_seq:
+            return None
+        changes = []
+        for (collection, record_id), seq in reversed(self._change_feed.items()):
+            if seq <= since:
+                break
+            changes.append((seq, collection, record_id))
+        changes.reverse()
+        return self._change_seq, changes
+
+    def change_sequence(self) -> int:
+        """Sequence number of the last committed change our data includes (see changes_since)"""
+        if hasattr(self.storage, 'change_feed'):
+            return self.storage.change_sequence()
+        return self._change_seq
+
+    def _stamp_change(self, collection: str, record_id: str, seq: int):
+        """Move a record to the end of the change feed under its new sequence number"""
+        self._change_feed.pop((collection, record_id), None)
+        self._change_feed[(collection, record_id)] = seq
+        if len(self._change_feed) > self.change_feed_size:
+            # Clients synced before the oldest change may have missed it
+            oldest = next(iter(self._change_feed))
+            self._feed_floor = self._change_feed.pop(oldest)
+        self._change_seq = max(self._change_seq, seq)
+
+    def _restart_change_feed(self):
+        """Catch up with the storage's change sequence after a load (caller holds the lock)"""
+        if hasattr(self.storage, 'change_feed'):
+            return
+        self._change_seq = self.storage.change_sequence()
+        if self._feed_floor is None:
+            self._feed_floor = self._change_seq
+
+    def _collections(self) -> Dict[str, Dict]:
+        """Map collection names to the manager's dicts"""
+        return {name: getattr(self, name) for name in COLLECTIONS}
 
     def save_data(self):
-        """Save all data to JSON file"""
-        data = {
-            'users': {k: v.to_dict() for k, v in self.users.items()},
-            'customers': {k: v.to_dict() for k, v in self.customers.items()},
-            'passengers': {k: v.to_dict() for k, v in self.passengers.items()},
-            'crew': {k: v.to_dict() for k, v in self.crew.items()},
-            'jets': {k: v.to_dict() for k, v in self.jets.items()},
-            'flights': {k: v.to_dict() for k, v in self.flights.items()},
-            'maintenance': {k: v.to_dict() for k, v in self.maintenance.items()}
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """
+        Save data through the storage backend (full file, change log or per-collection files)
+
+        Runs under the storage's inter-process lock. If another process committed
+        since our last load or save, its records are merged in first so that
+        concurrent workers never overwrite each other's changes.
+        """
+        with self.storage.lock():
+            if self.storage.version() != self._storage_version:
+                self._sync_from_storage()
+            first_seq = self.storage.save(self._collections(), self._changes)
+            self._storage_version = self.storage.version()
+            saved = [(seq, name, record_id)
+                     for seq, (name, record_id) in enumerate(ordered_changes(self._changes), first_seq)]
+            if saved:
+                for listener in self._save_listeners:
+                    listener(saved)
+        if not hasattr(self.storage, 'change_feed'):
+            for seq, name, record_id in saved:
+                self._stamp_change(name, record_id, seq)
+        self._changes = {}
+        self._deleted_records = {}
         logger.info(f"Data saved to {self.data_file}")
 
     def load_data(self):
-        """Load data from JSON file"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-
-            self.users = {k: User.from_dict(v) for k, v in data.get('users', {}).items()}
-            self.customers = {k: Customer.from_dict(v) for k, v in data.get('customers', {}).items()}
-            self.passengers = {k: Passenger.from_dict(v) for k, v in data.get('passengers', {}).items()}
-            self.crew = {k: CrewMember.from_dict(v) for k, v in data.get('crew', {}).items()}
-            self.jets = {k: PrivateJet.from_dict(v) for k, v in data.get('jets', {}).items()}
-            self.flights = {k: Flight.from_dict(v) for k, v in data.get('flights', {}).items()}
-            self.maintenance = {k: MaintenanceRecord.from_dict(v) for k, v in data.get('maintenance', {}).items()}
+        """Load data through the storage backend"""
+        if hasattr(self.storage, 'open_collections'):
+            # Query-backed storage (db_storage.SqlStorage) - records are fetched per operation
+            for name, collection in self.storage.open_collections(ENTITY_CLASSES).items():
+                setattr(self, name, collection)
+            self._storage_version = self.storage.version()
+            self._changes = {}
+            self._deleted_records = {}
+            self._transitions = None
+            self._notify_change(None, None)
+            self._restore_id_counters()
+            return
+
+        with self.storage.lock(shared=True):
+            version = self.storage.version()
+            data = self.storage.load()
+            if data is not None:
+                self._load_collections(data)
+            self._restart_change_feed()
+        self._storage_version = version
+        if data is not None:
+            self._changes = {}
+            self._deleted_records = {}
             logger.info(f"Data loaded from {self.data_file}")
+        self._restore_id_counters()
+
+    def refresh_if_changed(self) -> bool:
+        """Reload changes committed by other processes since our last load or save (True if any)"""
+        if self.storage.version() == self._storage_version:
+            return False
+
+        with self.storage.lock(shared=True):
+            self._sync_from_storage()
+        logger.info(f"Reloaded changes from {self.data_file}")
+        return True
+
+    def _sync_from_storage(self):
+        """Apply committed changes from storage, keeping unsaved local changes on top (caller holds the lock)"""
+        version = self.storage.version()
+        records = self.storage.load_changes(self._storage_version)
+        pending = {name: {record_id: getattr(self, name).get(record_id) for record_id in record_ids}
+                   for name, record_ids in self._changes.items()}
+
+        if hasattr(self.storage, 'open_collections'):
+            # Query-backed storage re-queries rows itself - only pass on which records changed
+            if records is None:
+                self._transitions = None
+                self._notify_change(None, None)
+            for record in records or ():
+                if record['c'] in TRANSITION_FIELDS and self._transitions is not None:
+                    self._stale_transitions.add((record['c'], record['id']))
+                self._notify_change(record['c'], record['id'])
+        elif records is None:
+            self._load_collections(self.storage.load() or {})
+        else:
+            for record in records:
+                self._apply_change_record(record)
+
+        for name, entities in pending.items():
+            collection = getattr(self, name)
+            for record_id, entity in entities.items():
+                if entity is None:
+                    collection.pop(record_id, None)
+                else:
+                    collection[record_id] = entity
+                if name in INDEXED_FIELDS:
+                    self._stale_index.add((name, record_id))
+                if name in TRANSITION_FIELDS and self._transitions is not None:
+                    self._stale_transitions.add((name, record_id))
+        self._changes = {name: set(entities) for name, entities in pending.items()}
+        self._storage_version = version
+        self._pending_counts.clear()
+        self._restart_change_feed()
+
+    def _load_collections(self, data: Dict[str, Dict[str, Dict]]):
+        """Build entity dicts from raw per-collection record dicts"""
+        self.users = {k: User.from_dict(v) for k, v in data.get('users', {}).items()}
+        self.customers = {k: Customer.from_dict(v) for k, v in data.get('customers', {}).items()}
+        self.passengers = {k: Passenger.from_dict(v) for k, v in data.get('passengers', {}).items()}
+        self.crew = {k: CrewMember.from_dict(v) for k, v in data.get('crew', {}).items()}
+        self.jets = {k: PrivateJet.from_dict(v) for k, v in data.get('jets', {}).items()}
+        self.flights = {k: Flight.from_dict(v) for k, v in data.get('flights', {}).items()}
+        self.maintenance = {k: MaintenanceRecord.from_dict(v) for k, v in data.get('maintenance', {}).items()}
+        self._rebuild_indexes()
+        self._pending_counts.clear()
+        self._transitions = None
+        self._notify_change(None, None)
+
+    def _find(self, collection: str, field: str, value) -> List:
+        """Records whose field equals value (or, for list fields like customer_ids, contains it)"""
+        records = getattr(self, collection)
+        if hasattr(records, 'find_by'):
+            return records.find_by(field, value)
+
+        index = self._indexes.get((collection, field))
+        if index is not None:
+            if self._stale_index:
+                self._refresh_stale_indexes()
+            return [records[record_id] for record_id in index.get(value, ())]
+
+        matches = []
+        for record in records.values():
+            attribute = getattr(record, field)
+            if (value in attribute) if isinstance(attribute, list) else attribute == value:
+                matches.append(record)
+        return matches
+
+    def find_ids(self, collection: str, field: str, value) -> Collection[str]:
+        """
+        IDs of records whose field equals value (or, for list fields, contains it)
+
+        For indexed fields this is the index entry itself (no copy), so callers
+        must not modify it or hold on to it across changes.
+        """
+        records = getattr(self, collection)
+        if hasattr(records, 'find_by'):
+            return {getattr(record, records.key_column.key): None for record in records.find_by(field, value)}
+
+        index = self._indexes.get((collection, field))
+        if index is not None:
+            if self._stale_index:
+                self._refresh_stale_indexes()
+            return index.get(value, {})
+
+        matches = {}
+        for record_id, record in records.items():
+            attribute = getattr(record, field)
+            if (value in attribute) if isinstance(attribute, list) else attribute == value:
+                matches[record_id] = None
+        return matches
+
+    def _apply_change_record(self, record: Dict):
+        """Apply a change record from storage (see storage.make_change_record) to the entity dicts"""
+        name = record['c']
+        entity_class = ENTITY_CLASSES[name]
+        if record['op'] == 'replace':
+            setattr(self, name, {k: entity_class.from_dict(v) for k, v in record['v'].items()})
+            self._rebuild_indexes(name)
+            if name in TRANSITION_FIELDS:
+                self._transitions = None
+            self._notify_change(name, None)
+            return
+        if record['op'] == 'put':
+            getattr(self, name)[record['id']] = entity_class.from_dict(record['v'])
+        elif record['op'] == 'del':
+            getattr(self, name).pop(record['id'], None)
+        if 's' in record:
+            self._stamp_change(name, record['id'], record['s'])
+        else:
+            # Written before changes were numbered - the feed cannot say when
+            self._feed_floor = None
+        if name in INDEXED_FIELDS:
+            self._stale_index.add((name, record['id']))
+        if name in TRANSITION_FIELDS and self._transitions is not None:
+            self._stale_transitions.add((name, record['id']))
+        self._notify_change(name, record['id'])
+
+    # Secondary Indexes
+    def _rebuild_indexes(self, collection: Optional[str] = None):
+        """Index every record of one collection, or of all indexed collections"""
+        for name in [collection] if collection else list(INDEXED_FIELDS):
+            if name not in INDEXED_FIELDS:
+                continue
+            for field in INDEXED_FIELDS[name]:
+                self._indexes[(name, field)] = {}
+            self._index_keys[name] = {}
+            self._stale_index = {key for key in self._stale_index if key[0] != name}
+            for record_id, record in getattr(self, name).items():
+                self._index_record(name, record_id, record)
+
+    def _index_values(self, name: str, record) -> Tuple:
+        """Values a record is indexed under, one per indexed field (list fields copied to tuples)"""
+        return tuple(tuple(value) if isinstance(value, list) else value
+                     for value in [getattr(record, field) for field in INDEXED_FIELDS[name]])
+
+    def _index_record(self, name: str, record_id: str, record):
+        values = self._index_values(name, record)
+        for field, value in zip(INDEXED_FIELDS[name], values):
+            index = self._indexes[(name, field)]
+            for key in value if isinstance(value, tuple) else (value,):
+                index.setdefault(key, {})[record_id] = None
+        self._index_keys[name][record_id] = values
+
+    def _unindex_record(self, name: str, record_id: str):
+        values = self._index_keys[name].pop(record_id, None)
+        if values is None:
+            return
+        for field, value in zip(INDEXED_FIELDS[name], values):
+            index = self._indexes[(name, field)]
+            for key in value if isinstance(value, tuple) else (value,):
+                record_ids = index.get(key)
+                if record_ids is not None:
+                    record_ids.pop(record_id, None)
+                    if not record_ids:
+                        del index[key]
+
+    def _refresh_stale_indexes(self):
+        """Re-index records added, changed or deleted since the last lookup"""
+        stale, self._stale_index = self._stale_index, set()
+        for name, record_id in stale:
+            record = getattr(self, name).get(record_id)
+            if record is not None and self._index_keys[name].get(record_id) == self._index_values(name, record):
+                continue  # Indexed fields unchanged - keep its position
+            self._unindex_record(name, record_id)
+            if record is not None:
+                self._index_record(name, record_id, record)
+
+    # Status Transitions
+    def pop_due_transitions(self, now: datetime) -> List[Tuple[str, Any]]:
+        """
+        (collection, record) pairs with a status transition instant at or before now
+
+        Each instant (departure, arrival, scheduled and completed dates) is
+        returned once, so a tick costs O(k log n) for the k records due rather
+        than a scan. Added or changed records are rescheduled with all their
+        instants, so any past ones make them due again on the next call. After
+        a full reload only records whose instants or status differ from before
+        are; the others only keep the instants still ahead.
+        """
+        if self._transitions is None:
+            self._rebuild_transitions()
+        elif self._stale_transitions:
+            self._refresh_stale_transitions()
+
+        heap = self._transitions
+        due: Dict[Tuple[str, str], None] = {}
+        while heap and heap[0][0] <= now:
+            instant, name, record_id = heapq.heappop(heap)
+            if instant in self._transition_keys.get((name, record_id), ()):
+                due[(name, record_id)] = None
+        if self._transitions_done is None or now > self._transitions_done:
+            self._transitions_done = now
+
+        result = []
+        for name, record_id in due:
+            record = getattr(self, name).get(record_id)
+            if record is not None:
+                result.append((name, record))
+        return result
+
+    def _transition_times(self, name: str, record) -> Tuple[datetime, ...]:
+        """Parsed instants of a record's transition fields (missing or unparseable dates skipped)"""
+        instants = [getattr(record, field) for field in TRANSITION_FIELDS[name]]
+        return tuple(instant for instant in instants if instant is not None)
+
+    def _rebuild_transitions(self, changed: Collection[Tuple[str, str]] = ()):
+        """
+        Schedule every flight and maintenance record
+
+        Instants already handed out are only queued again for records that
+        are new, listed in changed, or whose instants or status differ from
+        when they were last scheduled - after a full reload, a tick then
+        checks the records other workers changed rather than every past one.
+        """
+        done = self._transitions_done
+        previous_keys, previous_statuses = self._transition_keys, self._transition_statuses
+        heap = []
+        self._transition_keys = {}
+        self._transition_statuses = {}
+        self._stale_transitions = set()
+        for name in TRANSITION_FIELDS:
+            for record_id, record in getattr(self, name).items():
+                instants = self._transition_times(name, record)
+                if not instants:
+                    continue
+                key = (name, record_id)
+                self._transition_keys[key] = instants
+                self._transition_statuses[key] = record.status
+                if done is not None and key not in changed and previous_keys.get(key) == instants \
+                        and previous_statuses.get(key) == record.status:
+                    heap.extend((instant, name, record_id) for instant in instants if instant > done)
+                else:
+                    heap.extend((instant, name, record_id) for instant in instants)
+        heapq.heapify(heap)
+        self._transitions = heap
+
+    def _refresh_stale_transitions(self):
+        """Reschedule records added, changed or deleted since the last call"""
+        stale, self._stale_transitions = self._stale_transitions, set()
+        for name, record_id in stale:
+            record = getattr(self, name).get(record_id)
+            instants = self._transition_times(name, record) if record is not None else ()
+            if instants:
+                self._transition_keys[(name, record_id)] = instants
+                self._transition_statuses[(name, record_id)] = record.status
+                for instant in instants:
+                    heapq.heappush(self._transitions, (instant, name, record_id))
+            else:
+                self._transition_keys.pop((name, record_id), None)
+                self._transition_statuses.pop((name, record_id), None)
+
+        # Entries of rescheduled records pile up - start over once most of the heap is stale
+        if len(self._transitions) > 4 * max(len(self._transition_keys), 64):
+            self._rebuild_transitions(changed=stale)
 
     # User Management
     def add_user(self, user_id: str, username: str, password_hash: str, role: str,
@@ -515,12 +1131,13 @@ class JetScheduleManager:
             return ""
 
         # Check if username already exists
-        if any(u.username == username for u in self.users.values()):
+        if self._find('users', 'username', username):
             logger.error(f"Username {username} already exists")
             return ""
 
         user = User(user_id, username, password_hash, role, related_id, email)
         self.users[user_id] = user
+        self._record_change('users', user_id)
         logger.info(f"User {username} added successfully with ID: {user_id}")
         return user_id
 
@@ -530,10 +1147,8 @@ class JetScheduleManager:
 
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
-        for user in self.users.values():
-            if user.username == username:
-                return user
-        return None
+        matches = self._find('users', 'username', username)
+        return matches[0] if matches else None
 
     def update_user(self, user_id: str, username: str, password_hash: str, role: str,
                    related_id: str = "", email: str = "") -> bool:
@@ -543,6 +1158,7 @@ class JetScheduleManager:
             return False
 
         self.users[user_id] = User(user_id, username, password_hash, role, related_id, email)
+        self._record_change('users', user_id)
         logger.info(f"User {user_id} updated successfully")
         return True
 
@@ -552,7 +1168,7 @@ class JetScheduleManager:
             logger.error(f"User ID {user_id} not found")
             return False
 
-        del self.users[user_id]
+        self._delete_record('users', user_id)
         logger.info(f"User {user_id} deleted successfully")
         return True
 
@@ -569,6 +1185,7 @@ class JetScheduleManager:
 
         customer = Customer(customer_id, name, company, email, phone, address, lead_pilot_id)
         self.customers[customer_id] = customer
+        self._record_change('customers', customer_id)
         logger.info(f"Customer {name} added successfully with ID: {customer_id}")
         return customer_id
 
@@ -584,6 +1201,7 @@ class JetScheduleManager:
             return False
 
         self.customers[customer_id] = Customer(customer_id, name, company, email, phone, address, lead_pilot_id)
+        self._record_change('customers', customer_id)
         logger.info(f"Customer {customer_id} updated successfully")
         return True
 
@@ -594,18 +1212,18 @@ class JetScheduleManager:
             return False
 
         # Check if customer has jets
-        customer_jets = [j for j in self.jets.values() if j.customer_id == customer_id]
+        customer_jets = self.get_customer_jets(customer_id)
         if customer_jets:
             logger.warning(f"Customer {customer_id} has {len(customer_jets)} jet(s): {', '.join([j.jet_id for j in customer_jets])}")
             return False
 
         # Check if customer has passengers
-        customer_passengers = [p for p in self.passengers.values() if p.customer_id == customer_id]
+        customer_passengers = self.get_customer_passengers(customer_id)
         if customer_passengers:
             logger.warning(f"Customer {customer_id} has {len(customer_passengers)} passenger(s)")
             return False
 
-        del self.customers[customer_id]
+        self._delete_record('customers', customer_id)
         logger.info(f"Customer {customer_id} deleted successfully")
         return True
 
@@ -621,7 +1239,15 @@ class JetScheduleManager:
 
     def get_customer_jets(self, customer_id: str) -> List[PrivateJet]:
         """Get all jets owned by a customer"""
-        return [j for j in self.jets.values() if j.customer_id == customer_id]
+        return [j for j in self._find('jets', 'customer_ids', customer_id) if j.customer_id == customer_id]
+
+    def get_shared_jets(self, customer_id: str) -> List[PrivateJet]:
+        """Get all jets a customer owns or co-owns"""
+        return self._find('jets', 'customer_ids', customer_id)
+
+    def get_customer_passengers(self, customer_id: str) -> List[Passenger]:
+        """Get all passengers belonging to a customer"""
+        return self._find('passengers', 'customer_id', customer_id)
 
     # Passenger Management
     def add_passenger(self, passenger_id: str, name: str, passport_number: str,
@@ -641,6 +1267,7 @@ class JetScheduleManager:
                             nationality, passport_expiry, contact, customer_id,
                             date_of_birth, gender, passport_country, middle_name)
         self.passengers[passenger_id] = passenger
+        self._record_change('passengers', passenger_id)
         logger.info(f"Passenger {name} added successfully with ID: {passenger_id}")
         return passenger_id
 
@@ -660,6 +1287,7 @@ class JetScheduleManager:
         self.passengers[passenger_id] = Passenger(passenger_id, name, passport_number,
                                                   nationality, passport_expiry, contact, customer_id,
                                                   date_of_birth, gender, passport_country, middle_name)
+        self._record_change('passengers', passenger_id)
         logger.info(f"Passenger {passenger_id} updated successfully")
         return True
 
@@ -675,7 +1303,7 @@ class JetScheduleManager:
             logger.warning(f"Passenger {passenger_id} is assigned to {len(assigned_flights)} flight(s): {', '.join([f.flight_id for f in assigned_flights])}")
             return False
 
-        del self.passengers[passenger_id]
+        self._delete_record('passengers', passenger_id)
         logger.info(f"Passenger {passenger_id} deleted successfully")
         return True
 
@@ -710,6 +1338,7 @@ class JetScheduleManager:
         crew_member = CrewMember(crew_id, name, crew_type, passport_number,
                                 nationality, passport_expiry, contact, license_number)
         self.crew[crew_id] = crew_member
+        self._record_change('crew', crew_id)
         logger.info(f"Crew member {name} ({crew_type}) added successfully with ID: {crew_id}")
         return crew_id
 
@@ -732,6 +1361,7 @@ class JetScheduleManager:
 
         self.crew[crew_id] = CrewMember(crew_id, name, crew_type, passport_number,
                                        nationality, passport_expiry, contact, license_number)
+        self._record_change('crew', crew_id)
         logger.info(f"Crew member {crew_id} updated successfully")
         return True
 
@@ -748,7 +1378,7 @@ class JetScheduleManager:
             logger.info(f"  Flight IDs: {', '.join([f.flight_id for f in assigned_flights])}")
             return False
 
-        del self.crew[crew_id]
+        self._delete_record('crew', crew_id)
         logger.info(f"Crew member {crew_id} deleted successfully")
         return True
 
@@ -789,6 +1419,7 @@ class JetScheduleManager:
 
         jet = PrivateJet(jet_id, model, tail_number, capacity, customer_id, status)
         self.jets[jet_id] = jet
+        self._record_change('jets', jet_id)
         logger.info(f"Jet {model} added successfully with ID: {jet_id}")
         return jet_id
 
@@ -823,6 +1454,7 @@ class JetScheduleManager:
             return False
 
         self.jets[jet_id] = PrivateJet(jet_id, model, tail_number, capacity, customer_id, status)
+        self._record_change('jets', jet_id)
         logger.info(f"Jet {jet_id} updated successfully")
         return True
 
@@ -833,14 +1465,14 @@ class JetScheduleManager:
             return False
 
         # Check if jet is assigned to any flights or maintenance
-        assigned_flights = [f for f in self.flights.values() if f.jet_id == jet_id]
-        assigned_maintenance = [m for m in self.maintenance.values() if m.jet_id == jet_id]
+        assigned_flights = self.get_jet_flights(jet_id)
+        assigned_maintenance = self.get_jet_maintenance(jet_id)
 
         if assigned_flights or assigned_maintenance:
             logger.warning(f"Jet {jet_id} has {len(assigned_flights)} flight(s) and {len(assigned_maintenance)} maintenance record(s)")
             return False
 
-        del self.jets[jet_id]
+        self._delete_record('jets', jet_id)
         logger.info(f"Jet {jet_id} deleted successfully")
         return True
 
@@ -884,8 +1516,8 @@ class JetScheduleManager:
         # Check jet availability status
         if jet.status == "Maintenance":
             active_maintenance = [
-                m for m in self.maintenance.values()
-                if m.jet_id == jet_id and m.status == "In Progress"
+                m for m in self.get_jet_maintenance(jet_id)
+                if m.status == "In Progress"
             ]
             if active_maintenance:
                 logger.warning(f"Jet {jet_id} is currently in maintenance")
@@ -893,8 +1525,8 @@ class JetScheduleManager:
 
         if jet.status == "In Flight":
             active_flights = [
-                f for f in self.flights.values()
-                if f.jet_id == jet_id and f.status == "In Progress"
+                f for f in self.get_jet_flights(jet_id)
+                if f.status == "In Progress"
             ]
             if active_flights:
                 logger.warning(f"Jet {jet_id} is currently in flight")
@@ -913,6 +1545,7 @@ class JetScheduleManager:
                        departure_time, arrival_time, passenger_ids, crew_ids,
                        "Scheduled", approval_status, requested_by)
         self.flights[flight_id] = flight
+        self._record_change('flights', flight_id)
 
         if approval_status == "Pending":
             logger.info(f"Flight {flight_id} created and pending approval")
@@ -941,6 +1574,7 @@ class JetScheduleManager:
 
         self.flights[flight_id] = Flight(flight_id, jet_id, departure, destination,
                                         departure_time, arrival_time, passenger_ids, crew_ids, status)
+        self._record_change('flights', flight_id)
         logger.info(f"Flight {flight_id} updated successfully")
         return True
 
@@ -950,7 +1584,7 @@ class JetScheduleManager:
             logger.error(f"Flight ID {flight_id} not found")
             return False
 
-        del self.flights[flight_id]
+        self._delete_record('flights', flight_id)
         logger.info(f"Flight {flight_id} deleted successfully")
         return True
 
@@ -980,6 +1614,7 @@ class JetScheduleManager:
         flight.approval_status = "Approved"
         flight.approved_by = approved_by
         flight.approval_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._record_change('flights', flight_id)
 
         logger.info(f"Flight {flight_id} approved by {approver.name}")
         return True
@@ -1006,13 +1641,14 @@ class JetScheduleManager:
         flight.approval_status = "Rejected"
         flight.approved_by = rejected_by
         flight.approval_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._record_change('flights', flight_id)
 
         logger.info(f"Flight {flight_id} rejected by {rejector.name}")
         return True
 
     def get_pending_approvals(self, pilot_crew_id: str = None) -> List[Flight]:
         """Get all flights pending approval, optionally filtered by pilot"""
-        pending = [f for f in self.flights.values() if f.approval_status == "Pending"]
+        pending = self._find('flights', 'approval_status', "Pending")
 
         if pilot_crew_id:
             # Filter by lead pilot responsibility
@@ -1031,16 +1667,30 @@ class JetScheduleManager:
 
         return pending
 
+    def get_pending_approvals_count(self, pilot_crew_id: str = None) -> int:
+        """Number of flights pending approval (cached until a flight, jet or customer changes)"""
+        if pilot_crew_id not in self._pending_counts:
+            self._pending_counts[pilot_crew_id] = len(self.get_pending_approvals(pilot_crew_id))
+        return self._pending_counts[pilot_crew_id]
+
     def get_flight(self, flight_id: str) -> Optional[Flight]:
         """Get flight by ID"""
         return self.flights.get(flight_id)
 
+    def get_jet_flights(self, jet_id: str) -> List[Flight]:
+        """Get all flights assigned to a jet"""
+        return self._find('flights', 'jet_id', jet_id)
+
+    def get_jet_maintenance(self, jet_id: str) -> List[MaintenanceRecord]:
+        """Get all maintenance records for a jet"""
+        return self._find('maintenance', 'jet_id', jet_id)
+
     def list_flights(self, status_filter: Optional[str] = None):
         """List all flights, optionally filtered by status"""
-        flights = list(self.flights.values())
-
         if status_filter:
-            flights = [f for f in flights if f.status == status_filter]
+            flights = self._find('flights', 'status', status_filter)
+        else:
+            flights = list(self.flights.values())
 
         if not flights:
             logger.info(f"No flights found{' with status: ' + status_filter if status_filter else ''}")
@@ -1065,10 +1715,12 @@ class JetScheduleManager:
 
         # Update flight status
         flight.status = new_status
+        self._record_change('flights', flight_id)
 
         # Synchronize jet status based on flight status
         if jet_id in self.jets:
             jet = self.jets[jet_id]
+            self._record_change('jets', jet_id)
 
             if new_status == "In Progress":
                 # Flight is active - set jet to In Flight
@@ -1079,15 +1731,15 @@ class JetScheduleManager:
             elif new_status in ["Completed", "Cancelled"]:
                 # Flight ended - check if there are other active flights for this jet
                 other_active_flights = [
-                    f for f in self.flights.values()
-                    if f.jet_id == jet_id and f.flight_id != flight_id and f.status == "In Progress"
+                    f for f in self.get_jet_flights(jet_id)
+                    if f.flight_id != flight_id and f.status == "In Progress"
                 ]
 
                 if not other_active_flights:
                     # No other active flights, check for active maintenance
                     active_maintenance = [
-                        m for m in self.maintenance.values()
-                        if m.jet_id == jet_id and m.status == "In Progress"
+                        m for m in self.get_jet_maintenance(jet_id)
+                        if m.status == "In Progress"
                     ]
 
                     if active_maintenance:
@@ -1136,8 +1788,8 @@ class JetScheduleManager:
         # Check jet availability status
         if jet.status == "In Flight":
             active_flights = [
-                f for f in self.flights.values()
-                if f.jet_id == jet_id and f.status == "In Progress"
+                f for f in self.get_jet_flights(jet_id)
+                if f.status == "In Progress"
             ]
             if active_flights:
                 logger.warning(f"Jet {jet_id} is currently in flight")
@@ -1145,8 +1797,8 @@ class JetScheduleManager:
 
         if jet.status == "Maintenance":
             active_maintenance = [
-                m for m in self.maintenance.values()
-                if m.jet_id == jet_id and m.status == "In Progress"
+                m for m in self.get_jet_maintenance(jet_id)
+                if m.status == "In Progress"
             ]
             if active_maintenance:
                 logger.warning(f"Jet {jet_id} already has maintenance in progress")
@@ -1155,6 +1807,7 @@ class JetScheduleManager:
         maintenance = MaintenanceRecord(maintenance_id, jet_id, scheduled_date,
                                        maintenance_type, description)
         self.maintenance[maintenance_id] = maintenance
+        self._record_change('maintenance', maintenance_id)
         logger.info(f"Maintenance {maintenance_id} scheduled successfully")
         return maintenance_id
 
@@ -1168,6 +1821,7 @@ class JetScheduleManager:
 
         self.maintenance[maintenance_id] = MaintenanceRecord(maintenance_id, jet_id, scheduled_date,
                                                              maintenance_type, description, status, completed_date)
+        self._record_change('maintenance', maintenance_id)
         logger.info(f"Maintenance {maintenance_id} updated successfully")
         return True
 
@@ -1177,7 +1831,7 @@ class JetScheduleManager:
             logger.error(f"Maintenance ID {maintenance_id} not found")
             return False
 
-        del self.maintenance[maintenance_id]
+        self._delete_record('maintenance', maintenance_id)
         logger.info(f"Maintenance {maintenance_id} deleted successfully")
         return True
 
@@ -1196,10 +1850,12 @@ class JetScheduleManager:
         maintenance.status = new_status
         if completed_date and new_status == "Completed":
             maintenance.completed_date = completed_date
+        self._record_change('maintenance', maintenance_id)
 
         # Synchronize jet status based on maintenance status
         if jet_id in self.jets:
             jet = self.jets[jet_id]
+            self._record_change('jets', jet_id)
 
             if new_status == "In Progress":
                 # Maintenance started - set jet to Maintenance
@@ -1210,15 +1866,15 @@ class JetScheduleManager:
             elif new_status == "Completed":
                 # Maintenance completed - check if there are other active maintenance tasks
                 other_active_maintenance = [
-                    m for m in self.maintenance.values()
-                    if m.jet_id == jet_id and m.maintenance_id != maintenance_id and m.status == "In Progress"
+                    m for m in self.get_jet_maintenance(jet_id)
+                    if m.maintenance_id != maintenance_id and m.status == "In Progress"
                 ]
 
                 if not other_active_maintenance:
                     # No other active maintenance, check for active flights
                     active_flights = [
-                        f for f in self.flights.values()
-                        if f.jet_id == jet_id and f.status == "In Progress"
+                        f for f in self.get_jet_flights(jet_id)
+                        if f.status == "In Progress"
                     ]
 
                     if active_flights:
@@ -1283,7 +1939,7 @@ class JetScheduleManager:
         logger.info(f"\n{jet}\n")
 
         # Flights
-        flights = [f for f in self.flights.values() if f.jet_id == jet_id]
+        flights = self.get_jet_flights(jet_id)
         logger.info(f"\nFLIGHTS ({len(flights)}):")
         logger.info(f"{'-'*60}")
         if flights:
@@ -1293,7 +1949,7 @@ class JetScheduleManager:
             logger.info("No flights scheduled")
 
         # Maintenance
-        maintenance = [m for m in self.maintenance.values() if m.jet_id == jet_id]
+        maintenance = self.get_jet_maintenance(jet_id)
         logger.info(f"\n\nMAINTENANCE ({len(maintenance)}):")
         logger.info(f"{'-'*60}")
         if maintenance:
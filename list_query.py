@@ -0,0 +1,362 @@
+"""
+List Queries for Manajet
+Filtered, sorted and paginated record lists for the list pages
+
+Each (collection, sort field) gets a sorted list of (key, record ID), built
+on first use and kept up to date from the manager's change events, so a page
+is a slice of an ordering (or a walk along it checking filters against the
+manager's secondary indexes) rather than a sort of every record. Only the
+records on the requested page are looked up and handed to the template.
+SQL-backed collections push the same query down as WHERE/ORDER BY/LIMIT.
+
+The same orderings serve the mobile API's keyset pagination: an opaque
+cursor holds the (key, record ID) entry a page ended on, and the next page
+starts right after it, so pages stay consistent while records are added or
+deleted between requests.
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pagination import Pagination
+
+# Record ID field per collection
+ID_FIELDS = {
+    'flights': 'flight_id',
+    'jets': 'jet_id',
+    'passengers': 'passenger_id',
+    'crew': 'crew_id',
+    'maintenance': 'maintenance_id',
+    'customers': 'customer_id',
+}
+
+# Sortable fields per collection: query name -> entity attribute holding the sort key
+SORT_FIELDS = {
+    'flights': {'departure_time': 'departure_at', 'arrival_time': 'arrival_at', 'flight_id': 'flight_id',
+                'jet_id': 'jet_id', 'status': 'status'},
+    'jets': {'jet_id': 'jet_id', 'model': 'model', 'tail_number': 'tail_number', 'capacity': 'capacity',
+             'status': 'status'},
+    'passengers': {'passenger_id': 'passenger_id', 'name': 'name', 'nationality': 'nationality',
+                   'passport_expiry': 'passport_expiry'},
+    'crew': {'crew_id': 'crew_id', 'name': 'name', 'crew_type': 'crew_type', 'passport_expiry': 'passport_expiry'},
+    'maintenance': {'scheduled_date': 'scheduled_at', 'maintenance_id': 'maintenance_id', 'jet_id': 'jet_id',
+                    'maintenance_type': 'maintenance_type', 'status': 'status'},
+    'customers': {'customer_id': 'customer_id', 'name': 'name', 'company': 'company'},
+}
+
+# Sort used when none (or an unknown one) is requested
+DEFAULT_SORTS = {
+    'flights': 'departure_time',
+    'jets': 'jet_id',
+    'passengers': 'passenger_id',
+    'crew': 'crew_id',
+    'maintenance': 'scheduled_date',
+    'customers': 'customer_id',
+}
+
+# Fields the list pages filter on by equality
+FILTER_FIELDS = {
+    'flights': ('status', 'jet_id', 'approval_status'),
+    'jets': ('status', 'customer_ids'),
+    'passengers': ('customer_id', 'nationality'),
+    'crew': ('crew_type',),
+    'maintenance': ('status', 'jet_id', 'maintenance_type'),
+    'customers': (),
+}
+
+# Date field filtered by date_from/date_to, per collection (must also be in SORT_FIELDS)
+DATE_FIELDS = {
+    'flights': 'departure_time',
+    'maintenance': 'scheduled_date',
+}
+
+# Below this share of an ordering a candidate set is sorted directly instead of walking the ordering
+CANDIDATE_SORT_RATIO = 0.25
+
+SortKey = Tuple[int, Any]
+
+
+def sort_key(value) -> SortKey:
+    """Comparable key for a field value: text case-insensitively, missing values last"""
+    if value is None or value == "":
+        return (1, "")
+    if isinstance(value, str):
+        return (0, value.lower())
+    return (0, value)
+
+
+def encode_cursor(collection: str, sort: str, entry: Tuple[SortKey, str]) -> str:
+    """Opaque cursor for the ordering entry a page ended on"""
+    (missing, value), record_id = entry
+    kind, value = ('d', value.isoformat()) if isinstance(value, datetime) else ('v', value)
+    token = json.dumps([collection, sort, missing, kind, value, record_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+
+
+def decode_cursor(collection: str, sort: str, cursor: str) -> Tuple[SortKey, str]:
+    """Ordering entry of a cursor from encode_cursor (ValueError if malformed or for another listing)"""
+    try:
+        token = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        cursor_collection, cursor_sort, missing, kind, value, record_id = token
+        if kind == 'd':
+            value = datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if (cursor_collection, cursor_sort) != (collection, sort) or missing not in (0, 1) \
+            or not isinstance(record_id, str):
+        raise ValueError("Invalid cursor: not from this listing")
+    return (missing, value), record_id
+
+
+def day_bounds(date_from: Optional[datetime], date_to: Optional[datetime]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Half-open [start, end) range covering whole days from date_from through date_to"""
+    start = date_from.replace(hour=0, minute=0, second=0, microsecond=0) if date_from else None
+    end = date_to.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1) if date_to else None
+    return start, end
+
+
+class ListQuery:
+    """
+    Paginated list queries over a manager's collections
+
+    Orderings are maintained like the dashboard summary: changes are only
+    noted when they happen and applied to the affected orderings on the next
+    query, by moving the changed records (or re-sorting once many changed).
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        # (collection, sort field) -> sorted [(key, record_id)]
+        self._orderings: Dict[Tuple[str, str], List[Tuple[SortKey, str]]] = {}
+        # (collection, sort field) -> record_id -> key it is ordered under
+        self._keys: Dict[Tuple[str, str], Dict[str, SortKey]] = {}
+        self._dirty: Dict[str, Set[str]] = {}
+        manager.add_change_listener(self._on_change)
+
+    def _on_change(self, collection: Optional[str], record_id: Optional[str]):
+        if collection is None or record_id is None:
+            # Full reload or a replaced collection
+            for key in [key for key in self._orderings if collection is None or key[0] == collection]:
+                del self._orderings[key]
+                del self._keys[key]
+            if collection is None:
+                self._dirty = {}
+            else:
+                self._dirty.pop(collection, None)
+        elif collection in SORT_FIELDS:
+            self._dirty.setdefault(collection, set()).add(record_id)
+
+    # Orderings
+    def _ordering(self, collection: str, sort: str) -> Tuple[List[Tuple[SortKey, str]], Dict[str, SortKey]]:
+        dirty = self._dirty.pop(collection, None)
+        if dirty:
+            for key in [key for key in self._orderings if key[0] == collection]:
+                self._apply_dirty(key, dirty)
+
+        key = (collection, sort)
+        if key not in self._orderings:
+            attribute = SORT_FIELDS[collection][sort]
+            keys = {record_id: sort_key(getattr(record, attribute))
+                    for record_id, record in getattr(self.manager, collection).items()}
+            self._orderings[key] = sorted((value, record_id) for record_id, value in keys.items())
+            self._keys[key] = keys
+        return self._orderings[key], self._keys[key]
+
+    def _apply_dirty(self, key: Tuple[str, str], dirty: Set[str]):
+        ordering, keys = self._orderings[key], self._keys[key]
+        records = getattr(self.manager, key[0])
+        attribute = SORT_FIELDS[key[0]][key[1]]
+        if len(dirty) * 16 > len(ordering):
+            # Many changes - re-sorting is cheaper than moving each one
+            for record_id in dirty:
+                record = records.get(record_id)
+                if record is None:
+                    keys.pop(record_id, None)
+                else:
+                    keys[record_id] = sort_key(getattr(record, attribute))
+            ordering[:] = sorted((value, record_id) for record_id, value in keys.items())
+            return
+        for record_id in dirty:
+            record = records.get(record_id)
+            new = sort_key(getattr(record, attribute)) if record is not None else None
+            old = keys.get(record_id)
+            if old == new:
+                continue
+            if old is not None:
+                position = bisect_left(ordering, (old, record_id))
+                if position < len(ordering) and ordering[position] == (old, record_id):
+                    del ordering[position]
+                del keys[record_id]
+            if new is not None:
+                insort(ordering, (new, record_id))
+                keys[record_id] = new
+
+    # Queries
+    def page(self, collection: str, filters: Optional[Dict[str, Sequence[str]]] = None,
+             date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+             sort: Optional[str] = None, descending: bool = False,
+             page: int = 1, per_page: int = 20) -> Pagination:
+        """
+        One page of a collection's records
+
+        Args:
+            collection: Manager collection name (a key of SORT_FIELDS)
+            filters: Field -> accepted values (a record matches if its field equals any of them;
+                for list fields like customer_ids, if the list contains one). Fields must be in
+                FILTER_FIELDS; an empty value list matches nothing
+            date_from: Earliest day of the collection's DATE_FIELDS field (inclusive)
+            date_to: Latest day of that field (inclusive)
+            sort: Sort field (a key of SORT_FIELDS[collection]); unknown values use the default
+            descending: Reverse the sort order
+            page: Page number (1-indexed)
+            per_page: Records per page
+
+        Returns:
+            Pagination holding only the requested page's records
+        """
+        if sort not in SORT_FIELDS[collection]:
+            sort = DEFAULT_SORTS[collection]
+        filters = {field: list(values) for field, values in (filters or {}).items()
+                   if field in FILTER_FIELDS[collection]}
+        page = max(1, page)
+        offset = (page - 1) * per_page
+        start, end = day_bounds(date_from, date_to)
+
+        records = getattr(self.manager, collection)
+        if hasattr(records, 'query_page'):
+            date_column = DATE_FIELDS.get(collection) if (start or end) else None
+            result = records.query_page(filters, date_column, start, end, sort, descending, offset, per_page)
+            if result is not None:
+                total, items = result
+                return Pagination(items, page, per_page, total=total)
+
+        ordering, keys = self._ordering(collection, sort)
+        entries: Sequence[Tuple[SortKey, str]] = ordering
+        in_range = None
+        if start or end:
+            date_field = DATE_FIELDS[collection]
+            if sort == date_field:
+                # The range is a slice of the ordering
+                low = bisect_left(ordering, ((0, start),)) if start else 0
+                high = bisect_left(ordering, ((0, end),)) if end else bisect_left(ordering, ((1,),))
+                entries = ordering[low:high]
+            else:
+                attribute = SORT_FIELDS[collection][date_field]
+
+                def in_range(record_id: str) -> bool:
+                    value = getattr(records[record_id], attribute)
+                    return value is not None and (not start or value >= start) and (not end or value < end)
+
+        candidate_sets = [self._matching_ids(collection, field, values) for field, values in filters.items()]
+        candidate_sets.sort(key=len)
+
+        if not candidate_sets and in_range is None:
+            total = len(entries)
+            if descending:
+                page_entries = entries[max(0, total - offset - per_page):max(0, total - offset)][::-1]
+            else:
+                page_entries = entries[offset:offset + per_page]
+            page_ids = [record_id for _, record_id in page_entries]
+        elif candidate_sets and len(candidate_sets[0]) < len(entries) * CANDIDATE_SORT_RATIO:
+            # Few candidates: check and sort just those
+            smallest, others = candidate_sets[0], candidate_sets[1:]
+            low, high = (entries[0], entries[-1]) if entries else (None, None)
+            matches = []
+            for record_id in smallest:
+                if all(record_id in ids for ids in others) and (in_range is None or in_range(record_id)):
+                    entry = (keys[record_id], record_id)
+                    if entries is ordering or (low is not None and low <= entry <= high):
+                        matches.append(entry)
+            matches.sort(reverse=descending)
+            total = len(matches)
+            page_ids = [record_id for _, record_id in matches[offset:offset + per_page]]
+        else:
+            # Walk the ordering, keeping only the page. With a single filter over the whole
+            # ordering its candidate set is the total, so the walk stops at the page's end;
+            # otherwise every match is counted.
+            known_total = len(candidate_sets[0]) if (len(candidate_sets) == 1 and in_range is None
+                                                     and entries is ordering) else None
+            total = 0
+            page_ids = []
+            for _, record_id in (reversed(entries) if descending else entries):
+                if all(record_id in ids for ids in candidate_sets) and (in_range is None or in_range(record_id)):
+                    if offset <= total < offset + per_page:
+                        page_ids.append(record_id)
+                    total += 1
+                    if known_total is not None and total >= offset + per_page:
+                        break
+            if known_total is not None:
+                total = known_total
+
+        return Pagination([records[record_id] for record_id in page_ids], page, per_page, total=total)
+
+    def keyset(self, collection: str, sort: Optional[str] = None, after: Optional[Tuple[SortKey, str]] = None,
+               limit: Optional[int] = None, filters: Optional[Dict[str, Sequence[str]]] = None,
+               ids: Optional[Collection[str]] = None) -> Tuple[List[Any], Optional[Tuple[SortKey, str]]]:
+        """
+        Records following an ordering entry, for keyset (cursor) pagination
+
+        Args:
+            collection: Manager collection name (a key of SORT_FIELDS)
+            sort: Sort field; unknown values use the default
+            after: Entry the previous page ended on (see decode_cursor), None for the first page
+            limit: Most records to return (None for all)
+            filters: As for page()
+            ids: Only consider these record IDs (e.g. from manager.modified_since)
+
+        Returns:
+            (records, last entry) - the entry is None when no records follow this page
+        """
+        if sort not in SORT_FIELDS[collection]:
+            sort = DEFAULT_SORTS[collection]
+        ordering, keys = self._ordering(collection, sort)
+        candidate_sets = [self._matching_ids(collection, field, values) for field, values in (filters or {}).items()
+                          if field in FILTER_FIELDS[collection]]
+        if ids is not None:
+            candidate_sets.append(ids)
+        candidate_sets.sort(key=len)
+        try:
+            start = bisect_right(ordering, after) if after else 0
+        except TypeError:
+            raise ValueError("Invalid cursor: not from this listing") from None
+
+        found: List[Tuple[SortKey, str]] = []
+        wanted = len(ordering) if limit is None else limit + 1  # One extra tells whether more follow
+        if candidate_sets and len(candidate_sets[0]) < (len(ordering) - start) * CANDIDATE_SORT_RATIO:
+            # Few candidates: check and sort just those
+            smallest, others = candidate_sets[0], candidate_sets[1:]
+            low = ordering[start] if start < len(ordering) else None
+            for record_id in smallest:
+                key = keys.get(record_id)
+                if key is not None and all(record_id in matching for matching in others):
+                    entry = (key, record_id)
+                    if low is not None and entry >= low:
+                        found.append(entry)
+            found.sort()
+            del found[wanted:]
+        else:
+            for position in range(start, len(ordering)):
+                entry = ordering[position]
+                if all(entry[1] in matching for matching in candidate_sets):
+                    found.append(entry)
+                    if len(found) == wanted:
+                        break
+
+        more = limit is not None and len(found) > limit
+        if more:
+            del found[limit:]
+        records = getattr(self.manager, collection)
+        return [records[record_id] for _, record_id in found], (found[-1] if more else None)
+
+    def _matching_ids(self, collection: str, field: str, values: Iterable[str]):
+        """IDs of records whose field matches any of values (read-only; may be a manager index)"""
+        values = list(dict.fromkeys(values))
+        if len(values) == 1:
+            return self.manager.find_ids(collection, field, values[0])
+        matches: Dict[str, None] = {}
+        for value in values:
+            matches.update(self.manager.find_ids(collection, field, value))
+        return matches
@@ -0,0 +1,75 @@
+"""
+Database Migration: Add entity columns used by the SQL storage backend
+Run this script to bring tables created from older db_models up to date
+(new passenger/crew/jet/flight fields, approval columns and status indexes)
+"""
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateIndex
+
+# Load environment variables
+load_dotenv()
+
+from db_config import Base, DATABASE_URL
+import db_models  # noqa: F401 - registers the tables on Base.metadata
+
+
+def migrate(database_url: str = DATABASE_URL):
+    """Add any model columns and indexes missing from existing tables"""
+    engine = create_engine(database_url)
+
+    print("=" * 60)
+    print("Database Migration: Add entity columns")
+    print("=" * 60)
+
+    try:
+        # Tables that do not exist yet (e.g. storage_version) are created whole
+        Base.metadata.create_all(bind=engine)
+        existing = inspect(engine)
+
+        changes = []
+        with engine.connect() as conn:
+            for table in Base.metadata.sorted_tables:
+                columns = {c['name'] for c in existing.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in columns:
+                        continue
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    changes.append(f"Added '{column.name}' column to {table.name} ({column_type})")
+
+                indexes = {i['name'] for i in existing.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        conn.execute(CreateIndex(index))
+                        changes.append(f"Created index {index.name}")
+            conn.commit()
+
+        if not changes:
+            print("✓ All tables are already up to date")
+            return True
+
+        print("\n✓ Migration completed successfully!")
+        print("\nChanges made:")
+        for change in changes:
+            print(f"  - {change}")
+
+    except Exception as e:
+        print(f"\n✗ Migration failed: {str(e)}")
+        return False
+
+    return True
+
+if __name__ == '__main__':
+    if not DATABASE_URL:
+        print("DATABASE_URL is not set - nothing to migrate.")
+    else:
+        print("\nThis script will add missing columns and indexes to your database tables.")
+        print("Make sure you have a backup of your database before proceeding.\n")
+
+        response = input("Continue with migration? (yes/no): ")
+        if response.lower() in ['yes', 'y']:
+            migrate()
+        else:
+            print("Migration cancelled.")
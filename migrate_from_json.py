@@ -1,20 +1,247 @@
 """
 Migrate Data from JSON to PostgreSQL
-Reads jet_schedule_data.json and imports all data into PostgreSQL
+Streams jet_schedule_data.json and imports all data into PostgreSQL
+
+Records are parsed one at a time (the file is never loaded whole) and written
+with bulk upserts, committing every --batch-size records. After each commit a
+checkpoint file records how far the migration got, so re-running after a
+failure resumes from the last committed batch instead of starting over.
+
+Usage:
+    python migrate_from_json.py [--file jet_schedule_data.json] [--batch-size 1000] [--restart] [--keep-json]
 """
 
+import argparse
 import json
-import sys
 import os
+import re
+import sys
+import time
 from datetime import datetime
-from db_config import USE_POSTGRES, SessionLocal
-from db_models import (
-    CustomerModel, UserModel, PassengerModel, CrewModel,
-    JetModel, FlightModel, MaintenanceModel
-)
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from db_config import Base, USE_POSTGRES, engine as default_engine
+from db_models import StorageVersionModel
+from db_storage import TABLES, entity_to_row, restart_change_feed
+from jet_manager import ENTITY_CLASSES
+from storage import file_signature, write_json_file
+
+DEFAULT_BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+
+
+class JsonStream:
+    """Minimal incremental JSON reader: walks structure by hand and decodes values from a sliding buffer"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed (False at end of file)"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON file")
+
+    def accept(self, char: str) -> bool:
+        """Consume char if it comes next"""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char: str):
+        if not self.accept(char):
+            raise ValueError(f"Expected '{char}' but found '{self.peek()}'")
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more of the file as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_records(json_file: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str, Dict]]:
+    """Yield (collection, record_id, record) for every record in a manager data file, in file order"""
+    with open(json_file, 'r') as f:
+        stream = JsonStream(f, chunk_size)
+        stream.expect('{')
+        if stream.accept('}'):
+            return
+
+        while True:
+            collection = stream.value()
+            stream.expect(':')
+            if collection in TABLES and stream.peek() == '{':
+                stream.expect('{')
+                if not stream.accept('}'):
+                    while True:
+                        record_id = stream.value()
+                        stream.expect(':')
+                        yield collection, record_id, stream.value()
+                        if not stream.accept(','):
+                            break
+                    stream.expect('}')
+            else:
+                stream.value()  # Not a manager collection - skip it
+
+            if not stream.accept(','):
+                break
+        stream.expect('}')
+
+
+def record_to_row(collection: str, record: Dict) -> Dict:
+    """Column values for a raw JSON record (from_dict fills defaults and upgrades old formats)"""
+    return entity_to_row(collection, ENTITY_CLASSES[collection].from_dict(record))
 
-def migrate_data():
-    """Migrate all data from JSON to PostgreSQL"""
+
+def upsert_rows(session, collection: str, rows: List[Dict]):
+    """Insert rows, replacing any with the same primary key, in one bulk statement"""
+    model, key_name = TABLES[collection]
+    dialect = session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_name],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != key_name}
+        )
+        session.execute(stmt, rows)
+    else:
+        key_column = getattr(model, key_name)
+        session.execute(delete(model).where(key_column.in_([row[key_name] for row in rows])))
+        session.execute(insert(model), rows)
+
+
+def checkpoint_file(json_file: str) -> str:
+    return f"{json_file}.checkpoint"
+
+
+def load_checkpoint(json_file: str) -> int:
+    """Records already committed by an interrupted run over this same file (0 if none)"""
+    path = checkpoint_file(json_file)
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('source') != list(file_signature(json_file)):
+        print(f"⚠️  {json_file} changed since the last run - ignoring checkpoint")
+        return 0
+    return checkpoint.get('records', 0)
+
+
+def save_checkpoint(json_file: str, records: int):
+    write_json_file(checkpoint_file(json_file),
+                    {'source': list(file_signature(json_file)), 'records': records}, indent=None)
+
+
+def migrate_data(json_file: str = 'jet_schedule_data.json', batch_size: int = DEFAULT_BATCH_SIZE,
+                 resume: bool = True, db_engine=None) -> Dict:
+    """
+    Stream json_file into the database in batches and return a summary
+
+    Each batch is one transaction followed by a checkpoint update, so a
+    failure loses at most the batch in flight and resume=True picks up
+    after the last committed one.
+    """
+    db_engine = db_engine or default_engine
+    Base.metadata.create_all(bind=db_engine)
+    Session = sessionmaker(bind=db_engine)
+
+    skip = load_checkpoint(json_file) if resume else 0
+    if skip:
+        print(f"⏩ Resuming after {skip} already migrated records")
+
+    counts: Dict[str, int] = {}
+    committed = skip
+    batch: List[Dict] = []
+    batch_collection: Optional[str] = None
+    start = time.perf_counter()
+
+    def flush():
+        nonlocal committed, batch
+        with Session.begin() as session:
+            upsert_rows(session, batch_collection, batch)
+        committed += len(batch)
+        counts[batch_collection] = counts.get(batch_collection, 0) + len(batch)
+        save_checkpoint(json_file, committed)
+        elapsed = time.perf_counter() - start
+        print(f"  {batch_collection}: {counts[batch_collection]} records "
+              f"({(committed - skip) / elapsed:,.0f} records/s)")
+        batch = []
+
+    for position, (collection, record_id, record) in enumerate(iter_json_records(json_file)):
+        if position < skip:
+            continue
+        if batch and (collection != batch_collection or len(batch) >= batch_size):
+            flush()
+        batch_collection = collection
+        batch.append(record_to_row(collection, record))
+    if batch:
+        flush()
+
+    # Tell running app workers (SqlStorage) that the tables changed, and mobile clients to refetch
+    with Session.begin() as session:
+        restart_change_feed(session)
+        if session.get(StorageVersionModel, 1) is None:
+            session.add(StorageVersionModel(id=1, version=1))
+        else:
+            session.execute(update(StorageVersionModel).where(StorageVersionModel.id == 1)
+                            .values(version=StorageVersionModel.version + 1))
+
+    if os.path.exists(checkpoint_file(json_file)):
+        os.remove(checkpoint_file(json_file))
+    elapsed = time.perf_counter() - start
+    migrated = committed - skip
+    return {
+        'records': migrated,
+        'skipped': skip,
+        'collections': counts,
+        'seconds': elapsed,
+        'records_per_second': migrated / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate jet_schedule_data.json into PostgreSQL")
+    parser.add_argument('--file', default='jet_schedule_data.json', help="JSON data file to migrate")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Records per transaction")
+    parser.add_argument('--restart', action='store_true', help="Ignore any checkpoint and start from the beginning")
+    parser.add_argument('--keep-json', action='store_true', help="Leave the JSON file in place afterwards")
+    args = parser.parse_args()
 
     if not USE_POSTGRES:
         print("❌ ERROR: DATABASE_URL not set")
@@ -22,175 +249,45 @@ def migrate_data():
         sys.exit(1)
 
     # Check if JSON file exists
-    json_file = 'jet_schedule_data.json'
+    json_file = args.file
     if not os.path.exists(json_file):
         print(f"❌ ERROR: {json_file} not found")
         print("No data to migrate. Run setup_initial_data.py to create sample data.")
         sys.exit(1)
 
     print("🔄 Starting migration from JSON to PostgreSQL...")
-    print(f"📂 Reading from: {json_file}")
+    print(f"📂 Reading from: {json_file} (batches of {args.batch_size})")
 
     try:
-        # Load JSON data
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-
-        print(f"✅ Loaded JSON data")
-
-        # Create database session
-        db = SessionLocal()
-
-        try:
-            # Migrate Customers
-            if 'customers' in data:
-                print(f"\n👥 Migrating {len(data['customers'])} customers...")
-                for cust_id, cust_data in data['customers'].items():
-                    customer = CustomerModel(
-                        customer_id=cust_data['customer_id'],
-                        name=cust_data['name'],
-                        company=cust_data['company'],
-                        email=cust_data['email'],
-                        phone=cust_data['phone'],
-                        address=cust_data['address']
-                    )
-                    db.merge(customer)  # Insert or update
-                db.commit()
-                print(f"✅ Migrated {len(data['customers'])} customers")
-
-            # Migrate Users
-            if 'users' in data:
-                print(f"\n🔐 Migrating {len(data['users'])} users...")
-                for user_id, user_data in data['users'].items():
-                    user = UserModel(
-                        user_id=user_data['user_id'],
-                        username=user_data['username'],
-                        password_hash=user_data['password_hash'],
-                        role=user_data['role'],
-                        related_id=user_data.get('related_id', ''),
-                        email=user_data.get('email', '')
-                    )
-                    db.merge(user)
-                db.commit()
-                print(f"✅ Migrated {len(data['users'])} users")
-
-            # Migrate Passengers
-            if 'passengers' in data:
-                print(f"\n🧳 Migrating {len(data['passengers'])} passengers...")
-                for pass_id, pass_data in data['passengers'].items():
-                    passenger = PassengerModel(
-                        passenger_id=pass_data['passenger_id'],
-                        name=pass_data['name'],
-                        passport_number=pass_data['passport_number'],
-                        nationality=pass_data['nationality'],
-                        passport_expiry=pass_data['passport_expiry'],
-                        contact=pass_data['contact'],
-                        customer_id=pass_data.get('customer_id', '')
-                    )
-                    db.merge(passenger)
-                db.commit()
-                print(f"✅ Migrated {len(data['passengers'])} passengers")
-
-            # Migrate Crew
-            if 'crew' in data:
-                print(f"\n✈️ Migrating {len(data['crew'])} crew members...")
-                for crew_id, crew_data in data['crew'].items():
-                    crew = CrewModel(
-                        crew_id=crew_data['crew_id'],
-                        name=crew_data['name'],
-                        role=crew_data['role'],
-                        license_number=crew_data['license_number'],
-                        license_expiry=crew_data['license_expiry'],
-                        contact=crew_data['contact']
-                    )
-                    db.merge(crew)
-                db.commit()
-                print(f"✅ Migrated {len(data['crew'])} crew members")
-
-            # Migrate Jets
-            if 'jets' in data:
-                print(f"\n🛩️ Migrating {len(data['jets'])} aircraft...")
-                for jet_id, jet_data in data['jets'].items():
-                    jet = JetModel(
-                        jet_id=jet_data['jet_id'],
-                        model=jet_data['model'],
-                        registration=jet_data['registration'],
-                        capacity=jet_data['capacity'],
-                        status=jet_data['status'],
-                        customer_id=jet_data.get('customer_id', '')
-                    )
-                    db.merge(jet)
-                db.commit()
-                print(f"✅ Migrated {len(data['jets'])} aircraft")
-
-            # Migrate Flights
-            if 'flights' in data:
-                print(f"\n🛫 Migrating {len(data['flights'])} flights...")
-                for flight_id, flight_data in data['flights'].items():
-                    flight = FlightModel(
-                        flight_id=flight_data['flight_id'],
-                        jet_id=flight_data['jet_id'],
-                        departure=flight_data['departure'],
-                        destination=flight_data['destination'],
-                        departure_time=flight_data['departure_time'],
-                        arrival_time=flight_data['arrival_time'],
-                        passenger_ids=flight_data['passenger_ids'],
-                        crew_ids=flight_data['crew_ids'],
-                        status=flight_data['status'],
-                        customer_id=flight_data.get('customer_id', '')
-                    )
-                    db.merge(flight)
-                db.commit()
-                print(f"✅ Migrated {len(data['flights'])} flights")
-
-            # Migrate Maintenance
-            if 'maintenance' in data:
-                print(f"\n🔧 Migrating {len(data['maintenance'])} maintenance records...")
-                for maint_id, maint_data in data['maintenance'].items():
-                    maintenance = MaintenanceModel(
-                        maintenance_id=maint_data['maintenance_id'],
-                        jet_id=maint_data['jet_id'],
-                        maintenance_type=maint_data['maintenance_type'],
-                        scheduled_date=maint_data['scheduled_date'],
-                        completion_date=maint_data.get('completion_date', ''),
-                        description=maint_data['description'],
-                        status=maint_data['status'],
-                        performed_by=maint_data.get('performed_by', ''),
-                        customer_id=maint_data.get('customer_id', '')
-                    )
-                    db.merge(maintenance)
-                db.commit()
-                print(f"✅ Migrated {len(data['maintenance'])} maintenance records")
-
-            print("\n" + "="*50)
-            print("✅ Migration completed successfully!")
-            print("="*50)
-
-            # Create backup of JSON file
-            backup_file = f'jet_schedule_data_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-            os.rename(json_file, backup_file)
-            print(f"\n📦 Original JSON file backed up to: {backup_file}")
-
-            print("\n🎉 Your app is now using PostgreSQL!")
-            print("\nNext step: Deploy updated app to DigitalOcean")
-
-        except Exception as e:
-            db.rollback()
-            print(f"\n❌ Error during migration: {e}")
-            import traceback
-            traceback.print_exc()
-            sys.exit(1)
-        finally:
-            db.close()
-
-    except json.JSONDecodeError as e:
+        summary = migrate_data(json_file, args.batch_size, resume=not args.restart)
+    except (ValueError, json.JSONDecodeError) as e:
         print(f"❌ Error reading JSON file: {e}")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+        print(f"\n❌ Error during migration: {e}")
+        print("Committed batches are kept - run the script again to resume.")
         import traceback
         traceback.print_exc()
         sys.exit(1)
 
+    print("\n" + "="*50)
+    print("✅ Migration completed successfully!")
+    print("="*50)
+    for collection, count in summary['collections'].items():
+        print(f"  {collection}: {count}")
+    if summary['skipped']:
+        print(f"  (skipped {summary['skipped']} records migrated by an earlier run)")
+    print(f"\n⏱️  {summary['records']} records in {summary['seconds']:.2f}s "
+          f"({summary['records_per_second']:,.0f} records/s)")
+
+    if not args.keep_json:
+        # Create backup of JSON file
+        backup_file = f'{os.path.splitext(json_file)[0]}_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+        os.rename(json_file, backup_file)
+        print(f"\n📦 Original JSON file backed up to: {backup_file}")
+
+    print("\n🎉 Your app is now using PostgreSQL!")
+    print("\nNext step: Deploy updated app to DigitalOcean")
+
 if __name__ == '__main__':
-    migrate_data()
+    main()
@@ -3,33 +3,37 @@ Pagination Utility for Manajet
 Simple pagination for list views
 """
 
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from math import ceil
 
 
 class Pagination:
     """Simple pagination helper"""
 
-    def __init__(self, items: List[Any], page: int = 1, per_page: int = 20):
+    def __init__(self, items: List[Any], page: int = 1, per_page: int = 20, total: Optional[int] = None):
         """
         Initialize pagination
 
         Args:
-            items: List of items to paginate
+            items: List of items to paginate, or just the current page's items when total is given
             page: Current page number (1-indexed)
             per_page: Items per page
+            total: Number of items across all pages, for items fetched one page at a time
+                (see list_query.ListQuery)
         """
         self.items = items
         self.page = max(1, page)  # Ensure page is at least 1
         self.per_page = per_page
-        self.total = len(items)
+        self.total = len(items) if total is None else total
         self.pages = ceil(self.total / per_page) if per_page > 0 else 1
 
-        # Calculate slice indices
-        start = (self.page - 1) * per_page
-        end = start + per_page
-
-        self.items_on_page = items[start:end]
+        if total is None:
+            # Calculate slice indices
+            start = (self.page - 1) * per_page
+            end = start + per_page
+            self.items_on_page = items[start:end]
+        else:
+            self.items_on_page = items
         self.has_prev = self.page > 1
         self.has_next = self.page < self.pages
         self.prev_num = self.page - 1 if self.has_prev else None
@@ -1,31 +1,45 @@
 """
 Automatic Status Updater
 Updates flight and maintenance status based on current time
+
+StatusScheduler runs the updates on a background thread in a single leader
+process, off the request path.
 """
 
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 import json
 import os
 import logging
-from date_utils import parse_datetime
+import threading
+import time
+from storage import write_json_file
+
+try:
+    import fcntl
+except ImportError:  # Windows - every process acts as the leader
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+# Serializes StatusScheduler.start() between request threads
+_start_lock = threading.Lock()
+
+
 class StatusUpdater:
     """Automatically update status based on time"""
 
     def __init__(self, manager):
         self.manager = manager
 
-    def update_flight_status(self, flight):
+    def update_flight_status(self, flight, now: Optional[datetime] = None):
         """Update single flight status based on time"""
-        now = datetime.now()
+        now = now or datetime.now()
         updated = False
 
-        # Parse times
-        departure_dt = parse_datetime(flight.departure_time)
-        arrival_dt = parse_datetime(flight.arrival_time)
+        # Times (parsed once and cached by the entity)
+        departure_dt = flight.departure_at
+        arrival_dt = flight.arrival_at
 
         if not departure_dt or not arrival_dt:
             return False
@@ -45,19 +59,20 @@ class StatusUpdater:
         # Update if changed
         if new_status != old_status:
             flight.status = new_status
+            self.manager.mark_changed('flights', flight.flight_id)
             updated = True
             logger.info(f"Flight {flight.flight_id}: {old_status} -> {new_status}")
 
         return updated
 
-    def update_maintenance_status(self, maintenance):
+    def update_maintenance_status(self, maintenance, now: Optional[datetime] = None):
         """Update single maintenance status based on time"""
-        now = datetime.now()
+        now = now or datetime.now()
         updated = False
 
-        # Parse dates
-        scheduled_dt = parse_datetime(maintenance.scheduled_date)
-        completed_dt = parse_datetime(maintenance.completed_date)
+        # Dates (parsed once and cached by the entity)
+        scheduled_dt = maintenance.scheduled_at
+        completed_dt = maintenance.completed_at
 
         if not scheduled_dt:
             return False
@@ -79,27 +94,37 @@ class StatusUpdater:
         # Update if changed
         if new_status != old_status:
             maintenance.status = new_status
+            self.manager.mark_changed('maintenance', maintenance.maintenance_id)
             updated = True
             logger.info(f"Maintenance {maintenance.maintenance_id}: {old_status} -> {new_status}")
 
         return updated
 
-    def update_all_statuses(self):
-        """Update all flights and maintenance statuses"""
+    def update_all_statuses(self, full_scan: bool = False):
+        """
+        Update flights and maintenance whose departure, arrival or maintenance dates have passed
+
+        Only records the manager reports as due (pop_due_transitions) are
+        checked; full_scan=True re-checks every record instead.
+        """
+        now = datetime.now()
         logger.info("Running automatic status updates...")
-        logger.info(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info(f"Current time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
 
         flights_updated = 0
         maintenance_updated = 0
 
-        # Update all flights
-        for flight in self.manager.flights.values():
-            if self.update_flight_status(flight):
-                flights_updated += 1
+        if full_scan:
+            due = [('flights', flight) for flight in self.manager.flights.values()]
+            due.extend(('maintenance', maint) for maint in self.manager.maintenance.values())
+        else:
+            due = self.manager.pop_due_transitions(now)
 
-        # Update all maintenance
-        for maint in self.manager.maintenance.values():
-            if self.update_maintenance_status(maint):
+        for collection, record in due:
+            if collection == 'flights':
+                if self.update_flight_status(record, now):
+                    flights_updated += 1
+            elif self.update_maintenance_status(record, now):
                 maintenance_updated += 1
 
         # Save if any changes
@@ -112,6 +137,7 @@ class StatusUpdater:
         return {
             'flights_updated': flights_updated,
             'maintenance_updated': maintenance_updated,
+            'records_checked': len(due),
             'timestamp': datetime.now().isoformat()
         }
 
@@ -124,7 +150,7 @@ class StatusUpdater:
         }
 
         for flight in self.manager.flights.values():
-            departure_dt = parse_datetime(flight.departure_time)
+            departure_dt = flight.departure_at
             if departure_dt:
                 time_diff = (departure_dt - now).total_seconds() / 3600
                 if 0 < time_diff <= hours:
@@ -137,7 +163,7 @@ class StatusUpdater:
                     })
 
         for maint in self.manager.maintenance.values():
-            scheduled_dt = parse_datetime(maint.scheduled_date)
+            scheduled_dt = maint.scheduled_at
             if scheduled_dt and maint.status != 'Completed':
                 time_diff = (scheduled_dt - now).total_seconds() / 3600
                 if 0 < time_diff <= hours:
@@ -152,34 +178,195 @@ class StatusUpdater:
         return upcoming
 
 
-# Background task runner
-class BackgroundUpdater:
-    """Run status updates in background"""
-
-    def __init__(self, manager, interval_minutes=5):
-        self.manager = manager
-        self.updater = StatusUpdater(manager)
-        self.interval = interval_minutes * 60  # Convert to seconds
-        self.last_run = None
-
-    def should_run(self):
-        """Check if it's time to run update"""
-        if not self.last_run:
+# Background scheduler
+class SchedulerMetrics:
+    """Thread-safe counters for scheduler runs and their durations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.runs = 0
+            self.failures = 0
+            self.total_duration = 0.0
+            self.max_duration = 0.0
+            self.last_duration = 0.0
+            self.last_run = None
+            self.last_result = None
+            self.last_error = None
+
+    def record_run(self, duration: float, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self._lock:
+            if error:
+                self.failures += 1
+                self.last_error = error
+            else:
+                self.runs += 1
+                self.last_result = result
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+            self.last_duration = duration
+            self.last_run = datetime.now().isoformat()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            attempts = self.runs + self.failures
+            return {
+                'runs': self.runs,
+                'failures': self.failures,
+                'last_run': self.last_run,
+                'last_duration_ms': round(self.last_duration * 1000, 3),
+                'avg_duration_ms': round(self.total_duration / attempts * 1000, 3) if attempts else 0.0,
+                'max_duration_ms': round(self.max_duration * 1000, 3),
+                'last_result': self.last_result,
+                'last_error': self.last_error,
+            }
+
+
+class LeaderLock:
+    """Non-blocking exclusive file lock held for the life of the process that wins it"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Become leader if no other process is (True if this process holds the lock)"""
+        if self._fd is not None:
             return True
-
-        now = datetime.now()
-        elapsed = (now - self.last_run).total_seconds()
-        return elapsed >= self.interval
-
-    def run_if_needed(self):
-        """Run update if interval has passed"""
-        if self.should_run():
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class StatusScheduler:
+    """
+    Run status updates on a background thread, in one process at a time
+
+    Every gunicorn worker starts a scheduler thread, but only the one holding
+    the leader lock runs updates; the others keep trying at each interval and
+    take over if the leader exits. The leader works on its own manager (from
+    manager_factory), so it never touches objects a request thread is using -
+    its saves reach the request managers through refresh_if_changed() like
+    any other worker's. That manager is only built on the first run after
+    taking the leader lock, and dropped on stop(), so other workers never
+    hold a second copy of the data. Run durations are kept in metrics and written to
+    status_file so every worker can report them.
+    """
+
+    def __init__(self, manager_factory: Callable, interval_minutes: float = 5,
+                 lock_file: str = "jet_schedule_data.json.scheduler.lock", status_file: Optional[str] = None):
+        self.manager_factory = manager_factory
+        self.interval = interval_minutes * 60  # Convert to seconds
+        self.leader_lock = LeaderLock(lock_file)
+        self.status_file = status_file or f"{os.path.splitext(lock_file)[0]}.json"
+        self.metrics = SchedulerMetrics()
+        self.updater = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        """Start the scheduler thread unless this process already runs one (cheap to call per request)"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with _start_lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked from a process that had a scheduler - none of its state is ours
+                self.leader_lock = LeaderLock(self.leader_lock.path)
+                self.metrics = SchedulerMetrics()
+                self.updater = None
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='status-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the thread, give up leadership and release the scheduler's manager"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.leader_lock.release()
+        self.updater = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader_lock.held
+
+    def run_once(self) -> Optional[Dict]:
+        """Run one update if this process is the leader; returns the update result or None"""
+        if not self.leader_lock.try_acquire():
+            return None
+
+        start = time.perf_counter()
+        try:
+            if self.updater is None:
+                self.updater = StatusUpdater(self.manager_factory())
+            else:
+                self.updater.manager.refresh_if_changed()
             result = self.updater.update_all_statuses()
-            self.last_run = datetime.now()
-            return result
-        return None
-
-
-def create_scheduled_task(manager, interval_minutes=5):
-    """Create a background updater instance"""
-    return BackgroundUpdater(manager, interval_minutes)
+        except Exception as e:
+            self.metrics.record_run(time.perf_counter() - start, error=str(e))
+            self._write_status()
+            raise
+        duration = time.perf_counter() - start
+        self.metrics.record_run(duration, result)
+        self._write_status()
+        logger.info(f"Status update run took {duration * 1000:.1f} ms")
+        return result
+
+    def status(self) -> Dict:
+        """Metrics of the leader's runs (from status_file) and whether this process is the leader"""
+        status = {'leader_pid': None, 'interval_seconds': self.interval}
+        if os.path.exists(self.status_file):
+            try:
+                with open(self.status_file, 'r') as f:
+                    status.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        status['is_leader'] = self.is_leader
+        return status
+
+    def _write_status(self):
+        status = self.metrics.snapshot()
+        status['leader_pid'] = os.getpid()
+        try:
+            write_json_file(self.status_file, status, indent=None)
+        except OSError as e:
+            logger.warning(f"Could not write scheduler status to {self.status_file}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Status update run failed")
+            self._stop.wait(self.interval)
+
+
+def create_scheduled_task(manager_factory: Callable, interval_minutes: float = 5,
+                          lock_file: str = "jet_schedule_data.json.scheduler.lock") -> StatusScheduler:
+    """Create a background status scheduler (call start() in each worker)"""
+    return StatusScheduler(manager_factory, interval_minutes, lock_file)
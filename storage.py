@@ -0,0 +1,429 @@
+"""
+Storage Backends for JetScheduleManager
+Persists the manager's collections as a single JSON file, a snapshot plus change log,
+or one JSON file per collection
+
+All backends write through temp-file-plus-rename and serialize writers from
+different processes (gunicorn workers) with a file lock. version() returns a
+cheap token (file stat signatures) so a process can tell whether another one
+has committed changes and reload only then.
+
+Every save numbers the records it writes from one shared change sequence
+(see number_changes), so processes agree on the order changes were committed.
+"""
+
+import json
+import os
+import logging
+from typing import Dict, Optional, Set, Any, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Collections persisted by JetScheduleManager, in file order
+COLLECTIONS = ['users', 'customers', 'passengers', 'crew', 'jets', 'flights', 'maintenance']
+
+# Default journal size (bytes) that triggers folding the log into the snapshot
+DEFAULT_COMPACT_BYTES = 1024 * 1024
+
+# Default number of record IDs a process reserves at a time
+DEFAULT_ID_BLOCK_SIZE = 10
+
+# Default number of most recent record changes kept for incremental sync (see JetScheduleManager.changes_since)
+DEFAULT_CHANGE_FEED_SIZE = 10000
+
+# Indentation of data files; None writes compact JSON, which encodes several times faster
+DEFAULT_JSON_INDENT = 2
+
+# Sequence file key counting committed record changes (ID prefixes are upper case, so it cannot clash)
+CHANGE_SEQUENCE = 'changes'
+
+
+class FileLock:
+    """Inter-process lock held with flock on a side file (a no-op where fcntl is unavailable)"""
+
+    def __init__(self, path: str, shared: bool = False):
+        self.path = path
+        self.shared = shared
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class JsonFileStorage:
+    """Stores every collection in one JSON document (the original jet_schedule_data.json layout)"""
+
+    def __init__(self, data_file: str = "jet_schedule_data.json", indent: Optional[int] = DEFAULT_JSON_INDENT):
+        self.data_file = data_file
+        self.indent = indent
+        self.lock_file = f"{data_file}.lock"
+        self.sequence_file = f"{data_file}.seq"
+
+    def lock(self, shared: bool = False) -> FileLock:
+        """Lock out writers in other processes (shared=True still allows concurrent readers)"""
+        return FileLock(self.lock_file, shared)
+
+    def version(self) -> Any:
+        """Token that changes whenever any process commits a save"""
+        return file_signature(self.data_file)
+
+    def load_changes(self, since: Any) -> Optional[List[Dict]]:
+        """Change records committed after version since, or None if a full reload is needed"""
+        return None
+
+    def reserve_ids(self, prefix: str, count: int, floor: int = 0) -> int:
+        """Reserve count ID numbers above floor for prefix; returns the first (must not hold the lock)"""
+        with self.lock():
+            return reserve_sequence(self.sequence_file, prefix, count, floor)
+
+    def change_sequence(self) -> int:
+        """Sequence number of the last record change committed by any process"""
+        return read_sequence(self.sequence_file, CHANGE_SEQUENCE)
+
+    def load(self) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """Load raw record dicts per collection, or None if nothing has been saved yet"""
+        if not os.path.exists(self.data_file):
+            return None
+
+        with open(self.data_file, 'r') as f:
+            data = json.load(f)
+        return {name: data.get(name, {}) for name in COLLECTIONS}
+
+    def save(self, collections: Dict[str, Dict[str, Any]], changes: Dict[str, Set[str]]) -> int:
+        """Rewrite the whole file (every save is a full dump); returns the first change's sequence number"""
+        first_seq = number_changes(self.sequence_file, changes)
+        self.write_snapshot(collections)
+        return first_seq
+
+    def write_snapshot(self, collections: Dict[str, Dict[str, Any]]):
+        """Serialize all collections and replace the data file"""
+        data = {name: {k: v.to_dict() for k, v in collections[name].items()}
+                for name in COLLECTIONS}
+        write_json_file(self.data_file, data, self.indent)
+
+
+class JournaledStorage(JsonFileStorage):
+    """
+    Snapshot file plus an append-only change log (write-ahead log)
+
+    Each save appends one compact JSON line per changed record, so it costs
+    O(changes) instead of O(dataset). Once the log grows past compact_bytes it
+    is folded into a fresh snapshot and truncated. The snapshot uses the same
+    layout as JsonFileStorage, so existing data files can be journaled as-is.
+    """
+
+    def __init__(self, data_file: str = "jet_schedule_data.json", log_file: Optional[str] = None,
+                 compact_bytes: int = DEFAULT_COMPACT_BYTES, indent: Optional[int] = DEFAULT_JSON_INDENT):
+        super().__init__(data_file, indent)
+        self.log_file = log_file or f"{data_file}.log"
+        self.compact_bytes = compact_bytes
+
+    def version(self) -> Tuple:
+        """Snapshot signature plus log length - appends only move the second part"""
+        log_size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        return (file_signature(self.data_file), log_size)
+
+    def load_changes(self, since: Any) -> Optional[List[Dict]]:
+        """Read only the log records appended since the given version"""
+        if not since:
+            return None
+        snapshot_sig, offset = since
+        current_sig, current_size = self.version()
+        if current_sig != snapshot_sig or current_size < offset:
+            # The log was compacted into a new snapshot
+            return None
+        if current_size == offset:
+            return []
+
+        with open(self.log_file, 'r') as f:
+            f.seek(offset)
+            return read_change_records(f, self.log_file)
+
+    def load(self) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """Load the snapshot and replay the change log on top of it"""
+        data = super().load()
+        if not os.path.exists(self.log_file):
+            return data
+
+        if data is None:
+            data = {name: {} for name in COLLECTIONS}
+
+        with open(self.log_file, 'r') as f:
+            records = read_change_records(f, self.log_file)
+        for record in records:
+            apply_change_record(data, record)
+
+        logger.info(f"Replayed {len(records)} change record(s) from {self.log_file}")
+        return data
+
+    def save(self, collections: Dict[str, Dict[str, Any]], changes: Dict[str, Set[str]]) -> int:
+        """
+        Append a record per changed entity; compact when the log gets too large
+
+        Records carry their change sequence number, so processes replaying
+        them know exactly when each change was committed.
+        """
+        first_seq = number_changes(self.sequence_file, changes)
+        if not os.path.exists(self.data_file):
+            # First save - start from a snapshot so the log only ever holds deltas
+            self.compact(collections)
+            return first_seq
+
+        lines = [json.dumps(make_change_record(name, record_id, collections[name].get(record_id), seq),
+                            separators=(',', ':'))
+                 for seq, (name, record_id) in enumerate(ordered_changes(changes), first_seq)]
+        if lines:
+            with open(self.log_file, 'ab+') as f:
+                payload = ('\n'.join(lines) + '\n').encode('utf-8')
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        # Terminate a record torn by a crash so it cannot swallow this one
+                        payload = b'\n' + payload
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+        if os.path.exists(self.log_file) and os.path.getsize(self.log_file) >= self.compact_bytes:
+            self.compact(collections)
+        return first_seq
+
+    def compact(self, collections: Dict[str, Dict[str, Any]]):
+        """Fold the change log into a new snapshot and truncate the log"""
+        self.write_snapshot(collections)
+        # Replaying an already-applied log is harmless, so a crash before this point loses nothing
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        logger.info(f"Compacted change log into {self.data_file}")
+
+
+class CollectionFileStorage:
+    """
+    Stores each collection in its own JSON file inside data_dir (users.json, flights.json, ...)
+
+    Only collections with changed records are rewritten on save, so a flight status
+    flip writes flights.json alone. If no collection files exist yet but the legacy
+    single data file does, it is loaded instead and every collection is written on
+    the first save.
+    """
+
+    def __init__(self, data_dir: str = "data", legacy_file: Optional[str] = "jet_schedule_data.json",
+                 indent: Optional[int] = DEFAULT_JSON_INDENT):
+        self.data_dir = data_dir
+        self.legacy_file = legacy_file
+        self.indent = indent
+        self.lock_file = os.path.join(data_dir, ".lock")
+        self.sequence_file = os.path.join(data_dir, "sequences.json")
+        self._write_all = False
+
+    def lock(self, shared: bool = False) -> FileLock:
+        """Lock out writers in other processes (shared=True still allows concurrent readers)"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        return FileLock(self.lock_file, shared)
+
+    def version(self) -> Tuple:
+        """One signature per collection file"""
+        return tuple(file_signature(self.collection_file(name)) for name in COLLECTIONS)
+
+    def load_changes(self, since: Any) -> Optional[List[Dict]]:
+        """Reload only the collection files that another process rewrote"""
+        if not since or self._write_all:
+            return None
+        current = self.version()
+        return [{'op': 'replace', 'c': name, 'v': self.load_collection(name)}
+                for name, old_sig, new_sig in zip(COLLECTIONS, since, current)
+                if old_sig != new_sig]
+
+    def reserve_ids(self, prefix: str, count: int, floor: int = 0) -> int:
+        """Reserve count ID numbers above floor for prefix; returns the first (must not hold the lock)"""
+        with self.lock():
+            return reserve_sequence(self.sequence_file, prefix, count, floor)
+
+    def change_sequence(self) -> int:
+        """Sequence number of the last record change committed by any process"""
+        return read_sequence(self.sequence_file, CHANGE_SEQUENCE)
+
+    def collection_file(self, name: str) -> str:
+        """Path of the JSON file holding one collection"""
+        return os.path.join(self.data_dir, f"{name}.json")
+
+    def load_collection(self, name: str) -> Dict[str, Dict]:
+        """Load raw record dicts for a single collection"""
+        path = self.collection_file(name)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def load(self) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """Load every collection file independently"""
+        if not any(os.path.exists(self.collection_file(name)) for name in COLLECTIONS):
+            if self.legacy_file and os.path.exists(self.legacy_file):
+                logger.info(f"No collection files in {self.data_dir}, importing {self.legacy_file}")
+                self._write_all = True
+                return JsonFileStorage(self.legacy_file).load()
+            return None
+
+        return {name: self.load_collection(name) for name in COLLECTIONS}
+
+    def save(self, collections: Dict[str, Dict[str, Any]], changes: Dict[str, Set[str]]) -> int:
+        """Rewrite only the files of collections that have changed records; returns the first change's sequence number"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        first_seq = number_changes(self.sequence_file, changes)
+        dirty = COLLECTIONS if self._write_all else [name for name in COLLECTIONS if changes.get(name)]
+        for name in dirty:
+            write_json_file(self.collection_file(name),
+                            {k: v.to_dict() for k, v in collections[name].items()}, self.indent)
+        self._write_all = False
+        if dirty:
+            logger.info(f"Wrote collection file(s): {', '.join(dirty)}")
+        return first_seq
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def write_json_file(path: str, data: Dict, indent: Optional[int] = 2):
+    """
+    Write JSON to a temp file and rename it over path
+
+    The temp file is fsynced before the rename, so after a crash path holds
+    either the old or the new content - never a torn file. The document is
+    encoded in one call (json.dump would issue a write per token).
+    """
+    payload = json.dumps(data, indent=indent, separators=None if indent is not None else (',', ':'))
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def read_sequence(path: str, prefix: str) -> int:
+    """Current high-water mark for prefix in a JSON sequence file (0 if none)"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r') as f:
+        return json.load(f).get(prefix, 0)
+
+
+def reserve_sequence(path: str, prefix: str, count: int, floor: int = 0) -> int:
+    """
+    Advance the high-water mark for prefix in a JSON sequence file by count
+
+    Returns the first number of the reserved block. The caller holds the
+    storage lock, so concurrent processes always get disjoint blocks.
+    """
+    sequences = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            sequences = json.load(f)
+    first = max(sequences.get(prefix, 0), floor) + 1
+    sequences[prefix] = first + count - 1
+    write_json_file(path, sequences, indent=None)
+    return first
+
+
+def number_changes(path: str, changes: Dict[str, Set[str]]) -> int:
+    """Reserve sequence numbers for the changes about to be saved; returns the first (caller holds the lock)"""
+    count = sum(len(record_ids) for record_ids in changes.values())
+    if not count:
+        return read_sequence(path, CHANGE_SEQUENCE) + 1
+    return reserve_sequence(path, CHANGE_SEQUENCE, count)
+
+
+def read_change_records(f, log_file: str) -> List[Dict]:
+    """Parse change records line by line, skipping records torn by a crash mid-append"""
+    records = []
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.warning(f"Skipping incomplete record in {log_file}")
+    return records
+
+
+def ordered_changes(changes: Dict[str, Set[str]]) -> List[Tuple[str, str]]:
+    """Changed (collection, record ID) pairs in the order a save numbers them"""
+    return [(name, record_id) for name, record_ids in changes.items() for record_id in sorted(record_ids)]
+
+
+def make_change_record(collection: str, record_id: str, entity: Any, seq: Optional[int] = None) -> Dict:
+    """Build a change record: a put with the serialized entity, or a delete if it is gone (s = change sequence)"""
+    if entity is None:
+        record = {'op': 'del', 'c': collection, 'id': record_id}
+    else:
+        record = {'op': 'put', 'c': collection, 'id': record_id, 'v': entity.to_dict()}
+    if seq is not None:
+        record['s'] = seq
+    return record
+
+
+def apply_change_record(data: Dict[str, Dict[str, Dict]], record: Dict):
+    """Apply a single change record (put, del or whole-collection replace) to raw per-collection dicts"""
+    if record['op'] == 'replace':
+        data[record['c']] = record['v']
+        return
+    collection = data.setdefault(record['c'], {})
+    if record['op'] == 'put':
+        collection[record['id']] = record['v']
+    elif record['op'] == 'del':
+        collection.pop(record['id'], None)
+
+
+def create_storage(data_file: str = "jet_schedule_data.json"):
+    """
+    Create the storage backend selected by the STORAGE_MODE environment variable
+
+    STORAGE_MODE=json         single JSON file rewritten on every save (default)
+    STORAGE_MODE=journal      snapshot + append-only change log
+    STORAGE_MODE=collections  one file per collection in DATA_DIR, only changed ones rewritten
+    STORAGE_MODE=sql          SQLAlchemy tables from db_models (default whenever DATABASE_URL is set)
+
+    JSON_INDENT sets the indentation of the file backends' data files ("none"
+    for compact JSON, which saves large datasets several times faster).
+    CHANGE_FEED_SIZE sets how many recent changes SQL storage keeps in its change log.
+    """
+    from db_config import USE_POSTGRES
+
+    mode = os.environ.get('STORAGE_MODE', 'sql' if USE_POSTGRES else 'json').lower()
+    indent = os.environ.get('JSON_INDENT', str(DEFAULT_JSON_INDENT)).lower()
+    indent = None if indent in ('', 'none') else int(indent)
+    if mode == 'sql':
+        from db_storage import SqlStorage
+        return SqlStorage(change_feed_size=int(os.environ.get('CHANGE_FEED_SIZE', DEFAULT_CHANGE_FEED_SIZE)))
+    if mode == 'journal':
+        compact_bytes = int(os.environ.get('JOURNAL_COMPACT_BYTES', DEFAULT_COMPACT_BYTES))
+        return JournaledStorage(data_file, compact_bytes=compact_bytes, indent=indent)
+    if mode == 'collections':
+        return CollectionFileStorage(os.environ.get('DATA_DIR', 'data'), legacy_file=data_file, indent=indent)
+    if mode != 'json':
+        logger.warning(f"Unknown STORAGE_MODE '{mode}', falling back to json")
+    return JsonFileStorage(data_file, indent=indent)
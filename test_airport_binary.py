@@ -0,0 +1,148 @@
+"""
+Unit tests for the compiled, memory-mapped airport data
+Run with: pytest test_airport_binary.py -v
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+import airport_binary
+from airport_binary import AirportFile, build_airport_file, compile_airports, open_airports
+from airport_utils import AirportDatabase
+from test_airport_search import synthetic_airports
+
+
+def write_json(tmp_path, airports):
+    path = tmp_path / "airports.json"
+    path.write_text(json.dumps({'airports': airports}))
+    return str(path)
+
+
+class TestAirportFile:
+    def test_round_trip(self):
+        airports = synthetic_airports(500)
+        airports[7]['city'] = "São Paulo"
+        compiled = AirportFile(compile_airports(airports))
+        assert len(compiled) == 500
+        assert list(compiled) == airports
+        assert compiled[-1] == airports[-1]
+        assert list(compiled.lats) == [airport['lat'] for airport in airports]
+        with pytest.raises(IndexError):
+            compiled[500]
+
+    def test_find(self):
+        airports = synthetic_airports(300)
+        airports[200]['code'] = airports[100]['code']
+        compiled = AirportFile(compile_airports(airports))
+        for row in [0, 1, 100, 299]:
+            assert compiled.find(airports[row]['code']) == row
+        assert compiled.find(airports[200]['code']) == 100  # The first listed wins
+        assert compiled.find("NOPE") is None
+        assert compiled.find("LONGER THAN A CODE") is None
+        assert AirportFile(compile_airports([])).find("LAX") is None
+
+    def test_rejects_bad_data(self):
+        with pytest.raises(ValueError):
+            AirportFile(b"not airports")
+        with pytest.raises(ValueError):
+            AirportFile(compile_airports(synthetic_airports(3))[:-1])
+        with pytest.raises(ValueError):
+            compile_airports([dict(synthetic_airports(1)[0], code="WAY TOO LONG")])
+
+
+class TestOpenAirports:
+    def test_compiles_next_to_the_json(self, tmp_path):
+        airports = synthetic_airports(50)
+        json_path = write_json(tmp_path, airports)
+        assert list(open_airports(json_path)) == airports
+        assert os.path.exists(tmp_path / "airports.bin")
+
+    def test_rebuilds_when_the_json_changes(self, tmp_path):
+        json_path = write_json(tmp_path, synthetic_airports(50))
+        build_airport_file(json_path)
+        assert len(open_airports(json_path)) == 50
+
+        json_path = write_json(tmp_path, synthetic_airports(60))
+        stamp = os.path.getmtime(tmp_path / "airports.bin") + 1
+        os.utime(json_path, (stamp, stamp))
+        assert len(open_airports(json_path)) == 60
+
+    def test_unwritable_directory_compiles_in_memory(self, tmp_path, monkeypatch):
+        airports = synthetic_airports(20)
+        json_path = write_json(tmp_path, airports)
+
+        def fail(*args):
+            raise PermissionError("read-only")
+        monkeypatch.setattr(airport_binary, 'build_airport_file', fail)
+        assert list(open_airports(json_path)) == airports
+        assert not os.path.exists(tmp_path / "airports.bin")
+
+    def test_missing_json(self, tmp_path):
+        assert len(open_airports(str(tmp_path / "missing.json"))) == 0
+
+
+class TestLazyDatabase:
+    def test_opens_on_first_use(self, tmp_path):
+        airports = synthetic_airports(50)
+        db = AirportDatabase(write_json(tmp_path, airports))
+        assert db._airports is None and not os.path.exists(tmp_path / "airports.bin")
+
+        assert db.get_airport_by_code(airports[3]['code'].lower()) == airports[3]
+        assert db._search_index is None and db._spatial_index is None  # Indexes wait for their first query
+        assert os.path.exists(tmp_path / "airports.bin")
+
+    def test_workers_share_the_compiled_file(self, tmp_path):
+        airports = synthetic_airports(50)
+        json_path = write_json(tmp_path, airports)
+        AirportDatabase(json_path).airports
+        stamp = os.path.getmtime(tmp_path / "airports.bin")
+
+        assert AirportDatabase(json_path).search_airports(airports[0]['code'], 1)[0]['code'] == airports[0]['code']
+        assert os.path.getmtime(tmp_path / "airports.bin") == stamp  # Mapped, not rebuilt
+
+
+@pytest.mark.benchmark
+class TestAirportStartupBenchmark:
+    """Startup and first lookup over 70k airports: parse the JSON (before) against mapping the compiled file (after)"""
+
+    def test_startup_cost(self, tmp_path, capsys):
+        airports = synthetic_airports(70_000)
+        json_path = write_json(tmp_path, airports)
+        build_airport_file(json_path)
+        first, second = airports[10]['code'], airports[60_000]['code']
+
+        def before():
+            with open(json_path, 'r') as f:
+                loaded = json.load(f)['airports']
+            by_code = {}
+            for airport in loaded:
+                by_code.setdefault(airport['code'], airport)
+            return loaded, by_code[first], by_code[second]
+
+        def after():
+            db = AirportDatabase(json_path)
+            return db, db.calculate_distance(first, second)
+
+        timings, memory = {}, {}
+        for label, start_up in [('before', before), ('after', after)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            kept = start_up()
+            timings[label] = time.perf_counter() - start
+            memory[label] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del kept
+
+        with capsys.disabled():
+            print(f"\nAirport startup over 70k airports: JSON {timings['before'] * 1000:.0f} ms / "
+                  f"{memory['before'] / 2 ** 20:.1f} MB, compiled {timings['after'] * 1000:.2f} ms / "
+                  f"{memory['after'] / 2 ** 20:.2f} MB held by the process")
+        assert timings['after'] * 20 < timings['before']
+        assert memory['after'] * 100 < memory['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,177 @@
+"""
+Unit tests for airport lookups, distance matrices and nearby-airport queries
+Run with: pytest test_airport_distances.py -v
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+import pytest
+import airport_utils
+from airport_utils import AirportDatabase
+from test_airport_search import synthetic_airports, write_airports
+
+
+def pairwise(airports, codes_a, codes_b):
+    """Distances one haversine_distance call at a time, looking codes up in a dict of the airports"""
+    by_code = {}
+    for airport in airports:
+        by_code.setdefault(airport['code'], airport)
+    matrix = []
+    for code_a in codes_a:
+        a = by_code.get(code_a.upper().strip())
+        row = []
+        for code_b in codes_b:
+            b = by_code.get(code_b.upper().strip())
+            row.append(AirportDatabase.haversine_distance(a['lat'], a['lon'], b['lat'], b['lon'])
+                       if a and b else math.nan)
+        matrix.append(row)
+    return matrix
+
+
+class TestAirportLookup:
+    def test_get_airport_by_code(self):
+        db = AirportDatabase()
+        assert db.get_airport_by_code(" lax ")['code'] == "LAX"
+        assert db.get_airport_by_code("NOPE") is None
+
+    def test_duplicate_codes_keep_the_first(self, tmp_path):
+        airports = synthetic_airports(3)
+        airports[2]['code'] = airports[0]['code']
+        db = write_airports(tmp_path, airports)
+        assert db.get_airport_by_code(airports[0]['code']) == airports[0]
+
+
+class TestDistanceMatrix:
+    def test_matches_haversine(self):
+        db = AirportDatabase()
+        codes_a, codes_b = ["LAX", "jfk", "ORD"], ["DFW", "LAX", "BOS", "SFO"]
+        matrix = db.distance_matrix(codes_a, codes_b)
+        assert matrix.shape == (3, 4)
+        assert matrix == pytest.approx(np.array(pairwise(db.airports, codes_a, codes_b)))
+        assert matrix[0, 1] == 0
+        assert db.calculate_distance("JFK", "LAX") == pytest.approx(matrix[1, 1])
+
+    def test_unknown_codes_are_nan(self):
+        db = AirportDatabase()
+        matrix = db.distance_matrix(["LAX", "NOPE"], ["JFK", "XXXX"])
+        assert not math.isnan(matrix[0, 0])
+        assert math.isnan(matrix[0, 1]) and math.isnan(matrix[1, 0]) and math.isnan(matrix[1, 1])
+        assert db.distance_matrix([], ["JFK"]).shape == (0, 1)
+
+    def test_without_numpy(self, monkeypatch):
+        db = AirportDatabase()
+        monkeypatch.setattr(airport_utils, 'np', None)
+        codes_a, codes_b = ["LAX", "NOPE"], ["JFK", "ORD"]
+        matrix = db.distance_matrix(codes_a, codes_b)
+        assert matrix[0] == pytest.approx(pairwise(db.airports, codes_a, codes_b)[0])
+        assert all(math.isnan(distance) for distance in matrix[1])
+
+
+def by_distance(airports, lat, lon):
+    """(miles, row) of every airport, closest first, from a full scan"""
+    return sorted((AirportDatabase.haversine_distance(lat, lon, airport['lat'], airport['lon']), row)
+                  for row, airport in enumerate(airports))
+
+
+class TestNearbyAirports:
+    def test_nearest(self):
+        db = AirportDatabase()
+        results = db.nearest(33.9, -118.4, 3)  # Near LAX
+        assert results[0]['code'] == "LAX"
+        expected = by_distance(db.airports, 33.9, -118.4)[:3]
+        assert [(r['code'], r['distance_miles']) for r in results] == [
+            (db.airports[row]['code'], pytest.approx(miles)) for miles, row in expected]
+        assert len(db.nearest(0, 0, 500)) == len(db.airports)
+        assert db.nearest(0, 0, 0) == []
+
+    def test_within_radius(self):
+        db = AirportDatabase()
+        lax = db.get_airport_by_code("LAX")
+        results = db.within_radius("lax", 100)
+        assert results and all(r['distance_miles'] <= 100 for r in results)
+        assert "LAX" not in [r['code'] for r in results]
+        expected = [db.airports[row]['code'] for miles, row in by_distance(db.airports, lax['lat'], lax['lon'])
+                    if 0 < miles <= 100]
+        assert [r['code'] for r in results] == expected
+        assert db.within_radius("NOPE", 100) is None
+        assert len(db.within_radius("LAX", 13000)) == len(db.airports) - 1
+
+    def test_matches_full_scan_on_synthetic_data(self, tmp_path):
+        db = write_airports(tmp_path, synthetic_airports(5000))
+        rng = random.Random(3)
+        for _ in range(100):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            expected = by_distance(db.airports, lat, lon)
+            assert [row for _, row in db.spatial_index.nearest(lat, lon, 7)] == [row for _, row in expected[:7]]
+            radius = rng.choice([10, 150, 600, 2500])
+            found = db.spatial_index.within(lat, lon, radius)
+            assert [row for _, row in found] == [row for miles, row in expected if miles <= radius]
+            assert [miles for miles, _ in found] == pytest.approx([miles for miles, _ in expected[:len(found)]])
+
+    def test_empty_database(self, tmp_path):
+        db = write_airports(tmp_path, [])
+        assert db.nearest(10, 10) == []
+        assert db.spatial_index.within(10, 10, 100) == []
+
+
+@pytest.mark.benchmark
+class TestNearbyAirportsBenchmark:
+    """Nearest 5 and 150-mile alternates over 70k airports: full scan (before) against the index (after)"""
+
+    def test_query_cost(self, tmp_path, capsys):
+        airports = synthetic_airports(70_000)
+        db = write_airports(tmp_path, airports)
+        db.spatial_index  # Built on first use
+        rng = random.Random(9)
+        points = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(50)]
+
+        def scan(lat, lon):
+            distances = by_distance(airports, lat, lon)
+            return distances[:5], [found for found in distances if found[0] <= 150]
+
+        def index(lat, lon):
+            return db.spatial_index.nearest(lat, lon, 5), db.spatial_index.within(lat, lon, 150)
+
+        timings = {}
+        for label, query in [('before', scan), ('after', index)]:
+            start = time.perf_counter()
+            for lat, lon in points:
+                query(lat, lon)
+            timings[label] = (time.perf_counter() - start) / len(points)
+
+        with capsys.disabled():
+            print(f"\nNearby airports over 70k airports: scan {timings['before'] * 1000:.0f} ms, "
+                  f"index {timings['after'] * 1000:.2f} ms per query")
+        assert timings['after'] < 0.001
+        assert timings['after'] * 50 < timings['before']
+
+
+@pytest.mark.benchmark
+class TestDistanceMatrixBenchmark:
+    """Distances between 300 and 300 of 20k airports: haversine per pair (before) against one matrix (after)"""
+
+    def test_matrix_cost(self, tmp_path, capsys):
+        airports = synthetic_airports(20_000)
+        db = write_airports(tmp_path, airports)
+        codes = [airport['code'] for airport in airports]
+        db.airports  # Opened on first use
+        codes_a, codes_b = codes[:300], codes[-300:]
+
+        start = time.perf_counter()
+        expected = pairwise(airports, codes_a, codes_b)
+        before = time.perf_counter() - start
+        start = time.perf_counter()
+        matrix = db.distance_matrix(codes_a, codes_b)
+        after = time.perf_counter() - start
+
+        with capsys.disabled():
+            print(f"\n300 x 300 airport distances: per pair {before * 1000:.0f} ms, matrix {after * 1000:.1f} ms")
+        assert matrix == pytest.approx(np.array(expected))
+        assert after * 10 < before
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
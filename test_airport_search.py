@@ -0,0 +1,135 @@
+"""
+Unit tests for the indexed airport search
+Run with: pytest test_airport_search.py -v
+"""
+
+import json
+import random
+import string
+import time
+
+import pytest
+from airport_utils import AirportDatabase
+
+SYLLABLES = ["san", "ta", "los", "an", "ge", "spring", "field", "port", "ville", "mon", "ro", "lake", "wood",
+             "ber", "ka", "che", "new", "ton", "mar", "vi", "la", "del", "ri", "o"]
+SUFFIXES = ["International Airport", "Regional Airport", "Municipal Airport", "Airfield", "Heliport",
+            "Executive Airport", "Air Base", "Seaplane Base", "County Airport"]
+STATES = ["California", "Texas", "Ontario", "Bavaria", "Queensland", "Minas Gerais", "Kansas", "Iowa"]
+
+
+def reference_search(airports, query, limit=10):
+    """search_airports as it was: score every airport, then sort all matches"""
+    if not query or len(query) < 2:
+        return []
+    query_lower = query.lower().strip()
+    matches = []
+    for airport in airports:
+        score = 0
+        if airport['code'].lower() == query_lower:
+            score = 1000
+        elif airport['code'].lower().startswith(query_lower):
+            score = 500
+        elif airport['city'].lower() == query_lower:
+            score = 400
+        elif airport['city'].lower().startswith(query_lower):
+            score = 300
+        elif airport['state'].lower() == query_lower:
+            score = 200
+        elif query_lower in airport['name'].lower():
+            score = 100
+        elif query_lower in airport['city'].lower():
+            score = 50
+        if score > 0:
+            match = airport.copy()
+            match['relevance'] = score
+            matches.append(match)
+    matches.sort(key=lambda x: x['relevance'], reverse=True)
+    return matches[:limit]
+
+
+def synthetic_airports(count, seed=11):
+    rng = random.Random(seed)
+    airports = []
+    for i in range(count):
+        city = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        if rng.random() < 0.2:
+            city = f"{city} {rng.choice(SYLLABLES).title()}"
+        code = rng.choice("KCEL") + "".join(rng.choice(string.ascii_uppercase) for _ in range(3))
+        airports.append({
+            'code': code if i % 3 else code[1:],
+            'name': f"{city} {rng.choice(SUFFIXES)}",
+            'city': city,
+            'state': rng.choice(STATES),
+            'country': "USA",
+            'lat': rng.uniform(-60, 70),
+            'lon': rng.uniform(-180, 180),
+        })
+    return airports
+
+
+def write_airports(tmp_path, airports):
+    path = tmp_path / "airports.json"
+    path.write_text(json.dumps({'airports': airports}))
+    return AirportDatabase(str(path))
+
+
+QUERIES = ["LAX", "la", "Los Angeles", "new", "New York", "california", "international", "port", "ch", "K",
+           "  jfk ", "xyz", "a ", "Dallas", "airport", "ort w", "ON"]
+
+
+class TestAirportSearch:
+    @pytest.mark.parametrize('query', QUERIES)
+    def test_matches_full_scan(self, query):
+        db = AirportDatabase()
+        for limit in [1, 3, 10, 100]:
+            assert db.search_airports(query, limit) == reference_search(db.airports, query, limit), (query, limit)
+
+    def test_matches_full_scan_on_synthetic_data(self, tmp_path):
+        airports = synthetic_airports(3000)
+        db = write_airports(tmp_path, airports)
+        rng = random.Random(5)
+        queries = [airport[field][:rng.randint(2, 5)] for airport in rng.sample(airports, 40)
+                   for field in ('code', 'city')]
+        queries += [airport['name'][start:start + rng.randint(2, 6)] for airport in rng.sample(airports, 40)
+                    for start in [rng.randint(0, 8)]]
+        queries += STATES[:3] + ["spring", "field", "base", "zz", "ka"]
+        for query in queries:
+            for limit in [5, 50]:
+                assert db.search_airports(query, limit) == reference_search(airports, query, limit), query
+
+    def test_short_queries(self):
+        db = AirportDatabase()
+        assert db.search_airports("") == []
+        assert db.search_airports("L") == []
+
+
+@pytest.mark.benchmark
+class TestAirportSearchBenchmark:
+    """Autocomplete keystrokes over 70k airports: scan and sort (before) against the index (after)"""
+
+    def test_search_cost(self, tmp_path, capsys):
+        airports = synthetic_airports(70_000)
+        start = time.perf_counter()
+        db = write_airports(tmp_path, airports)
+        db.search_index  # Opened and indexed on first use
+        load = time.perf_counter() - start
+
+        keystrokes = ["sa", "san", "sant", "santa", "ka", "kj", "kjf", "po", "por", "port", "spr", "springf",
+                      "texas", "field air", "wood lake"]
+        timings = {}
+        for label, search in [('before', lambda query: reference_search(airports, query)),
+                              ('after', lambda query: db.search_airports(query))]:
+            start = time.perf_counter()
+            for query in keystrokes:
+                search(query)
+            timings[label] = (time.perf_counter() - start) / len(keystrokes)
+
+        with capsys.disabled():
+            print(f"\nAirport search over 70k airports: scan {timings['before'] * 1000:.0f} ms, "
+                  f"index {timings['after'] * 1000:.2f} ms per keystroke (load and index {load:.1f} s)")
+        assert timings['after'] * 20 < timings['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
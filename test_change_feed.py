@@ -0,0 +1,140 @@
+"""
+Unit tests for the numbered change feed behind /api/sync
+Run with: pytest test_change_feed.py -v
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from db_storage import SqlStorage
+from jet_manager import JetScheduleManager
+from storage import CollectionFileStorage, JournaledStorage, JsonFileStorage
+from test_storage import make_manager
+
+
+def changed(feed):
+    """(collection, record ID) pairs of a changes_since result, oldest first"""
+    _, changes = feed
+    return [(collection, record_id) for _, collection, record_id in changes]
+
+
+@pytest.fixture(params=['json', 'journal', 'collections', 'sql'])
+def storage_factory(request, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+    factories = {
+        'json': lambda: JsonFileStorage(str(tmp_path / "data.json")),
+        'journal': lambda: JournaledStorage(str(tmp_path / "data.json")),
+        'collections': lambda: CollectionFileStorage(str(tmp_path / "data"), legacy_file=None),
+        'sql': lambda: SqlStorage(engine),
+    }
+    yield factories[request.param]
+    engine.dispose()
+
+
+class TestChangeFeed:
+    def test_lists_changes_after_since(self, storage_factory):
+        manager = make_manager(storage_factory())
+        since = manager.change_sequence()
+        assert since == 5  # Customer, jet, crew, passenger and flight
+
+        manager.update_flight_status("FL001", "Cancelled")
+        manager.save_data()
+        manager.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103")
+        manager.delete_passenger("P002")
+        manager.save_data()
+
+        seq, changes = manager.changes_since(since)
+        assert seq == manager.change_sequence() > since
+        assert ('flights', "FL001") in changed((seq, changes))
+        assert ('passengers', "P002") in changed((seq, changes))
+        assert manager.get_passenger("P002") is None  # Listed, but gone - a tombstone
+        assert [s for s, _, _ in changes] == sorted(s for s, _, _ in changes)
+        assert manager.changes_since(seq) == (seq, [])
+
+    def test_each_record_listed_once(self, storage_factory):
+        manager = make_manager(storage_factory())
+        since = manager.change_sequence()
+        for status in ["In Progress", "Completed"]:
+            manager.update_flight_status("FL001", status)
+            manager.save_data()
+
+        seq, changes = manager.changes_since(since)
+        assert sorted(changed((seq, changes))) == [('flights', "FL001"), ('jets', "JET001")]
+        assert max(s for s, _, _ in changes) == seq
+
+    def test_unknown_sequences_need_a_reset(self, storage_factory):
+        manager = make_manager(storage_factory())
+        assert manager.changes_since(manager.change_sequence() + 1) is None
+
+
+class TestChangeFeedAcrossWorkers:
+    def test_journal_feed_follows_other_workers(self, tmp_path):
+        worker_a = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        since = worker_b.change_sequence()
+
+        worker_a.update_flight_status("FL001", "Cancelled")
+        worker_a.save_data()
+        crew_id = worker_b.add_crew("", "Sara Lee", "Co-pilot", "P7654321", "USA", "2030-01-01", "555-0104", "LIC-2")
+        worker_b.save_data()  # Merges worker A's save, then numbers its own after it
+
+        worker_a.refresh_if_changed()
+        assert worker_a.changes_since(since) == worker_b.changes_since(since)
+        assert changed(worker_b.changes_since(since)) == [('flights', "FL001"), ('jets', "JET001"),
+                                                          ('crew', crew_id)]
+
+    def test_full_reload_resets_the_feed(self, tmp_path):
+        worker_a = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        since = worker_b.change_sequence()
+
+        worker_a.update_flight_status("FL001", "Cancelled")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert worker_b.changes_since(since) is None
+        assert worker_b.change_sequence() == worker_a.change_sequence()
+        assert worker_b.changes_since(worker_b.change_sequence()) == (worker_b.change_sequence(), [])
+
+    def test_sql_feed_is_shared(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        worker_a = make_manager(SqlStorage(engine))
+        worker_b = JetScheduleManager(storage=SqlStorage(engine))
+        since = worker_b.change_sequence()
+
+        worker_a.delete_passenger("P001")  # Refused - passenger is on a flight
+        worker_a.update_flight_status("FL001", "Cancelled")
+        worker_a.save_data()
+        assert changed(worker_b.changes_since(since)) == [('flights', "FL001"), ('jets', "JET001")]
+        engine.dispose()
+
+
+class TestChangeFeedBounds:
+    def test_oldest_changes_are_dropped(self, tmp_path):
+        manager = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")), change_feed_size=3)
+        manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+        manager.save_data()
+        since = manager.change_sequence()
+        for i in range(4):
+            manager.add_passenger("", f"Passenger {i}", f"X{i:07d}", "USA", "2030-01-01", "555-0102", "CUST001")
+            manager.save_data()
+
+        assert manager.changes_since(since) is None
+        assert changed(manager.changes_since(since + 1)) == [('passengers', "P002"), ('passengers', "P003"),
+                                                             ('passengers', "P004")]
+
+    def test_sql_change_log_is_pruned(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        manager = JetScheduleManager(storage=SqlStorage(engine, change_feed_size=3))
+        manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+        manager.save_data()
+        since = manager.change_sequence()
+        for i in range(4):
+            manager.add_passenger("", f"Passenger {i}", f"X{i:07d}", "USA", "2030-01-01", "555-0102", "CUST001")
+            manager.save_data()
+
+        assert manager.changes_since(since) is None
+        assert len(manager.changes_since(since + 1)[1]) == 3
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,258 @@
+"""
+Unit tests for the incrementally maintained dashboard summary
+Run with: pytest test_dashboard.py -v
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from dashboard import DashboardSummary
+from db_storage import SqlStorage
+from jet_manager import Flight, JetScheduleManager
+from storage import JournaledStorage, JsonFileStorage
+
+NOW = datetime(2025, 6, 11, 12, 0)  # A Wednesday
+
+
+def at(days: float, hours: float = 0) -> str:
+    return (NOW + timedelta(days=days, hours=hours)).strftime('%Y-%m-%d %H:%M')
+
+
+def make_manager(storage):
+    manager = JetScheduleManager(storage=storage)
+    manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+    manager.add_customer("", "Ann Lee", "Lee Aviation", "ann@example.com", "555-0200", "2 Main St")
+    manager.add_jet("", "Gulfstream G650", "N650GS", 12, "CUST001")
+    manager.add_jet("", "Citation X", "N750CX", 8, "CUST002")
+    manager.add_crew("", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1")
+    manager.add_passenger("", "Jane Doe", "X1234567", "USA", "2030-01-01", "555-0102", "CUST001")
+    manager.add_passenger("", "Bob Roe", "Y1234567", "USA", "2030-01-01", "555-0103", "CUST002")
+    for i, (jet_id, days, status) in enumerate([
+        ("JET001", -3, "Completed"), ("JET001", 0, "In Progress"), ("JET001", 2, "Scheduled"),
+        ("JET002", 1, "Scheduled"), ("JET002", -1, "Completed"), ("JET002", 20, "Scheduled"),
+    ]):
+        flight_id = f"FL{i + 1:03d}"
+        manager.flights[flight_id] = Flight(flight_id, jet_id, "LAX", "JFK", at(days, -1 - i / 10), at(days, 1 + i / 10),
+                                            [], ["CREW001"], status)
+        manager.mark_changed('flights', flight_id)
+    manager.schedule_maintenance("", "JET002", at(1)[:10], "Inspection", "100 hour check")
+    manager.save_data()
+    return manager
+
+
+def reference_snapshot(manager, customer_id=None):
+    """The dashboard as index() computed it before: full passes over every record"""
+    if customer_id:
+        jets = [j for j in manager.jets.values() if customer_id in j.customer_ids]
+        jet_ids = [j.jet_id for j in jets]
+        passengers = [p for p in manager.passengers.values() if p.customer_id == customer_id]
+        flights = [f for f in manager.flights.values() if f.jet_id in jet_ids]
+        maintenance = [m for m in manager.maintenance.values() if m.jet_id in jet_ids]
+    else:
+        jets, passengers = list(manager.jets.values()), list(manager.passengers.values())
+        flights, maintenance = list(manager.flights.values()), list(manager.maintenance.values())
+
+    today = NOW.replace(hour=0, minute=0)
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=7)
+
+    def day(value):
+        return datetime.strptime(value.split()[0], '%Y-%m-%d')
+
+    return {
+        'counts': (len(passengers), len(jets), len(flights), len(maintenance),
+                   len([j for j in jets if j.status == 'Available'])),
+        'active_flights': {f.flight_id for f in flights if f.status == 'In Progress'},
+        'flights_this_week': [f.flight_id for f in sorted(flights, key=lambda f: f.departure_time)
+                              if week_start <= day(f.departure_time) < week_end],
+        'upcoming_flights': [f.flight_id for f in sorted(flights, key=lambda f: f.departure_time)
+                             if f.status == 'Scheduled' and today <= day(f.departure_time) <= today + timedelta(days=7)],
+        'maintenance_this_week': [m.maintenance_id for m in maintenance if m.status in ('Scheduled', 'In Progress')
+                                  and week_start <= day(m.scheduled_date) < week_end],
+        'recent_completed': [f.flight_id for f in sorted(flights, key=lambda f: f.arrival_time, reverse=True)
+                             if f.status == 'Completed' and today - timedelta(days=7) <= day(f.arrival_time) <= today],
+    }
+
+
+def summary_snapshot(summary, customer_id=None):
+    stats, activity = summary.snapshot(customer_id, now=NOW)
+    return {
+        'counts': (stats['total_passengers'], stats['total_jets'], stats['total_flights'],
+                   stats['total_maintenance'], stats['available_jets']),
+        'active_flights': {f.flight_id for f in activity['active_flights']},
+        'flights_this_week': [f.flight_id for f in activity['flights_this_week']],
+        'upcoming_flights': [f.flight_id for f in activity['upcoming_flights']],
+        'maintenance_this_week': [m.maintenance_id for m in activity['maintenance_this_week']],
+        'recent_completed': [f.flight_id for f in activity['recent_completed']],
+    }
+
+
+def assert_matches_reference(manager, summary):
+    for customer_id in [None, "CUST001", "CUST002", "CUST404"]:
+        assert summary_snapshot(summary, customer_id) == reference_snapshot(manager, customer_id), customer_id
+
+
+class TestDashboardSummary:
+    def test_initial_snapshot(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+        assert_matches_reference(manager, summary)
+
+        stats, activity = summary.snapshot("CUST001", now=NOW)
+        assert stats['total_crew'] == 1  # Crew visible to all
+        assert [f.flight_id for f in activity['active_flights']] == ["FL002"]
+
+    def test_follows_local_changes(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+        summary.snapshot()
+
+        manager.update_flight_status("FL003", "In Progress")
+        manager.get_flight("FL006").departure_time = at(3)
+        manager.mark_changed('flights', "FL006")
+        manager.add_passenger("", "New Person", "Z1234567", "USA", "2030-01-01", "555-0104", "CUST002")
+        manager.delete_flight("FL005")
+        assert_matches_reference(manager, summary)
+
+    def test_jet_owner_change_moves_its_flights(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+        summary.snapshot()
+
+        manager.get_jet("JET002").customer_ids.append("CUST001")
+        manager.mark_changed('jets', "JET002")
+        assert_matches_reference(manager, summary)
+        assert summary.snapshot("CUST001", now=NOW)[0]['total_flights'] == 6
+
+    def test_follows_other_workers(self, tmp_path):
+        worker_a = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(worker_b)
+        summary.snapshot()
+
+        worker_a.update_flight_status("FL004", "In Progress")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert_matches_reference(worker_b, summary)
+        assert "FL004" in summary_snapshot(summary)['active_flights']
+
+    def test_follows_other_sql_workers_record_by_record(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        worker_a = make_manager(SqlStorage(engine))
+        worker_b = JetScheduleManager(storage=SqlStorage(engine))
+        summary = DashboardSummary(worker_b)
+        summary.snapshot()
+
+        worker_a.update_flight_status("FL004", "In Progress")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert not summary._needs_rebuild
+        assert summary._dirty == {('flights', "FL004"), ('jets', "JET002")}
+        assert_matches_reference(worker_b, summary)
+        engine.dispose()
+
+    def test_full_reload_rebuilds(self, tmp_path):
+        worker_a = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(worker_b)
+        summary.snapshot()
+
+        worker_a.delete_passenger("P002")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert summary.snapshot(now=NOW)[0]['total_passengers'] == 1
+
+
+class TestStatsCounters:
+    def test_stats_per_customer(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+
+        assert summary.stats()['total_flights'] == 6
+        assert summary.stats("CUST002")['total_maintenance'] == 1
+        breakdown = json.loads(summary.stats_json(breakdown=True)[0])['customers']
+        assert breakdown["CUST001"] == {
+            'total_passengers': 1, 'total_jets': 1, 'total_flights': 3, 'total_maintenance': 0,
+            'active_flights': 1, 'available_jets': 1, 'in_flight_jets': 0, 'maintenance_jets': 0,
+        }
+        assert sorted(breakdown) == ["CUST001", "CUST002"]
+
+    def test_etag_follows_changes(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+        body, etag = summary.stats_json("CUST001")
+        version = summary.version()
+
+        # Untouched records and edits that move no counter keep the version and tag
+        manager.mark_changed('flights', "FL001")
+        assert summary.version() == version
+        assert summary.stats_json("CUST001") == (body, etag)
+
+        manager.update_flight_status("FL003", "In Progress")
+        assert summary.version() > version
+        body, changed = summary.stats_json("CUST001")
+        assert changed != etag
+        assert json.loads(body)['active_flights'] == 2
+
+    def test_breakdown_follows_customers(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        summary = DashboardSummary(manager)
+        body, etag = summary.stats_json(breakdown=True)
+
+        manager.add_customer("", "New Customer", "New Co", "new@example.com", "555-0300", "3 Main St")
+        body, added = summary.stats_json(breakdown=True)
+        assert added != etag
+        assert json.loads(body)['customers']["CUST003"]['total_jets'] == 0
+
+        manager.delete_customer("CUST003")
+        assert summary.stats_json(breakdown=True)[1] == etag
+
+    def test_etag_is_shared_across_workers(self, tmp_path):
+        worker_a = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        summary_a, summary_b = DashboardSummary(worker_a), DashboardSummary(worker_b)
+        summary_a.stats()
+        worker_a.update_flight_status("FL003", "In Progress")  # Moves only worker A's version
+
+        summary_a.version()
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert summary_a.version() != summary_b.version()
+        assert summary_a.stats_json(breakdown=True) == summary_b.stats_json(breakdown=True)
+
+
+@pytest.mark.benchmark
+class TestDashboardBenchmark:
+    """Dashboard render over 50k flights: full passes (before) against precomputed buckets (after)"""
+
+    def test_render_cost(self, tmp_path, capsys):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        for i in range(50_000):
+            flight_id = f"F{i:06d}"
+            manager.flights[flight_id] = Flight(flight_id, "JET001" if i % 2 else "JET002", "LAX", "JFK",
+                                                at(i % 400 - 200, i % 24), at(i % 400 - 200, i % 24 + 3),
+                                                [], ["CREW001"], "Scheduled")
+            manager.mark_changed('flights', flight_id)
+        summary = DashboardSummary(manager)
+        summary.snapshot()  # Initial bucketing
+
+        renders = 20
+        timings = {}
+        for label, render in [('before', lambda: reference_snapshot(manager, "CUST001")),
+                              ('after', lambda: summary.snapshot("CUST001", now=NOW))]:
+            start = time.perf_counter()
+            for _ in range(renders):
+                render()
+            timings[label] = (time.perf_counter() - start) / renders
+
+        with capsys.disabled():
+            print(f"\nDashboard render over 50k flights: full passes {timings['before'] * 1000:.0f} ms, "
+                  f"buckets {timings['after'] * 1000:.3f} ms")
+        assert timings['after'] * 100 < timings['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,11 +3,13 @@ Unit tests for date_utils module
 Run with: pytest test_date_utils.py -v
 """
 
+import time
+
 import pytest
 from datetime import datetime, timedelta
 from date_utils import (
-    parse_datetime, format_datetime, is_past, is_future,
-    is_between, days_until, hours_until
+    parse_datetime, parse_datetime_cached, format_datetime, is_past, is_future,
+    is_between, days_until, hours_until, DATETIME_FORMATS
 )
 
 
@@ -39,6 +41,69 @@ class TestParseDatetime:
         result = parse_datetime("")
         assert result is None
 
+    def test_parse_form_t_variant(self):
+        assert parse_datetime("2025-06-01T09:30") == datetime(2025, 6, 1, 9, 30)
+        assert parse_datetime("2025-06-01T09:30:15") == datetime(2025, 6, 1, 9, 30, 15)
+
+    def test_parse_iso_with_minutes(self):
+        assert parse_datetime(" 2025-06-01 09:30 ") == datetime(2025, 6, 1, 9, 30)
+
+    def test_parse_day_first_format(self):
+        assert parse_datetime("31/12/2025") == datetime(2025, 12, 31)
+        assert parse_datetime("31/12/2025 08:15") == datetime(2025, 12, 31, 8, 15)
+
+    def test_parse_ambiguous_slash_date_is_month_first(self):
+        assert parse_datetime("05/06/2025 10:00") == datetime(2025, 5, 6, 10, 0)
+
+    def test_parse_unpadded_falls_back(self):
+        assert parse_datetime("2025-6-1") == datetime(2025, 6, 1)
+
+    def test_parse_invalid_iso_shape(self):
+        assert parse_datetime("2025-13-01") is None
+
+    def test_parse_utc_offset_is_rejected(self):
+        # Aware datetimes cannot be compared with the naive ones every record holds
+        assert parse_datetime("2025-06-01 09:30+01") is None
+        assert parse_datetime("2025-06-01T09:30Z") is None
+        assert parse_datetime("2025-06-01 09+01:00") is None
+
+    def test_cached_parse(self):
+        first = parse_datetime_cached("2025-06-01 09:00")
+        assert first == datetime(2025, 6, 1, 9, 0)
+        assert parse_datetime_cached("2025-06-01 09:00") is first
+
+
+@pytest.mark.benchmark
+class TestParseDatetimeBenchmark:
+    """Mixed real-world date strings: the former strptime loop (before) against the routed parser (after)"""
+
+    def test_throughput(self, capsys):
+        samples = ["2025-06-01 09:00", "2025-06-01T09:00", "2025-06-01", "2025-06-01 09:00:00",
+                   "12/31/2025 18:45", "31/12/2025 18:45", "31/12/2025"] * 3000
+
+        def legacy_parse(date_string):
+            for fmt in DATETIME_FORMATS:
+                try:
+                    return datetime.strptime(date_string.strip(), fmt)
+                except ValueError:
+                    continue
+            return None
+
+        timings = {}
+        for label, parse in [('before', legacy_parse), ('after', parse_datetime), ('cached', parse_datetime_cached)]:
+            parse(samples[0])
+            start = time.perf_counter()
+            for sample in samples:
+                parse(sample)
+            timings[label] = time.perf_counter() - start
+
+        with capsys.disabled():
+            rates = {label: len(samples) / seconds for label, seconds in timings.items()}
+            print(f"\nparse_datetime: before {rates['before']:,.0f}/s, after {rates['after']:,.0f}/s, "
+                  f"cached {rates['cached']:,.0f}/s")
+        assert timings['after'] * 2 < timings['before']
+        assert timings['cached'] < timings['after']
+
 
 class TestFormatDatetime:
     def test_format_with_time(self):
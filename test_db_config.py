@@ -0,0 +1,95 @@
+"""
+Unit tests for database connection pooling
+Run with: pytest test_db_config.py -v -s  (-s shows the benchmark timings)
+"""
+
+import time
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+import db_config
+from db_config import make_engine, pool_status, InstrumentedQueuePool
+
+# Simulated TCP + auth handshake, making SQLite a stand-in for a remote Postgres
+CONNECT_LATENCY = 0.002
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'pool.db'}"
+
+
+def run_queries(engine, count):
+    Session = sessionmaker(bind=engine)
+    for _ in range(count):
+        with Session() as session:
+            session.execute(text("SELECT 1")).scalar_one()
+
+
+class TestPooling:
+    def test_connections_are_reused(self, database_url):
+        engine = make_engine(database_url, pool_size=2)
+        run_queries(engine, 20)
+
+        status = pool_status(engine)
+        assert status['pooled'] is True
+        assert status['connects'] == 1
+        assert status['checkouts'] == 20
+        assert status['checkins'] == 20
+        assert status['checked_out'] == 0
+        engine.dispose()
+
+    def test_pool_size_zero_disables_pooling(self, database_url):
+        engine = make_engine(database_url, pool_size=0)
+        assert isinstance(engine.pool, NullPool)
+        assert pool_status(engine)['pooled'] is False
+
+    def test_exhausted_pool_records_timeout(self, database_url):
+        engine = make_engine(database_url, pool_size=1, max_overflow=0, pool_timeout=0.05)
+        held = engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        held.close()
+
+        status = pool_status(engine)
+        assert status['timeouts'] == 1
+        assert status['max_wait_ms'] >= 50
+        engine.dispose()
+
+    def test_worker_gets_fresh_pool_after_fork(self, database_url, monkeypatch):
+        engine = make_engine(database_url, pool_size=2)
+        run_queries(engine, 3)
+        parent_pool = engine.pool
+        monkeypatch.setattr(db_config, 'engine', engine)
+
+        db_config._reset_pool_after_fork()
+
+        assert engine.pool is not parent_pool
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert pool_status(engine)['checkouts'] == 0
+        engine.dispose()
+
+
+@pytest.mark.benchmark
+class TestPoolBenchmark:
+    def test_pooled_vs_unpooled(self, database_url):
+        iterations = 100
+        timings = {}
+        for label, pool_size in [('NullPool', 0), ('QueuePool', 5)]:
+            engine = make_engine(database_url, pool_size=pool_size)
+            event.listen(engine, 'connect', lambda *args: time.sleep(CONNECT_LATENCY))
+            start = time.perf_counter()
+            run_queries(engine, iterations)
+            timings[label] = time.perf_counter() - start
+            engine.dispose()
+
+        for label, elapsed in timings.items():
+            print(f"\n{label}: {iterations} sessions in {elapsed * 1000:.1f} ms "
+                  f"({elapsed / iterations * 1e6:.0f} us/session)")
+        assert timings['QueuePool'] < timings['NullPool']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
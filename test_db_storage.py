@@ -0,0 +1,119 @@
+"""
+Unit tests for the SQL storage backend (run against SQLite)
+Run with: pytest test_db_storage.py -v
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from jet_manager import JetScheduleManager
+from db_storage import SqlStorage
+from test_storage import make_manager
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+    yield engine
+    engine.dispose()
+
+
+class TestSqlStorage:
+    def test_round_trip(self, engine):
+        make_manager(SqlStorage(engine))
+
+        reloaded = JetScheduleManager(storage=SqlStorage(engine))
+        flight = reloaded.get_flight("FL001")
+        assert flight.destination == "JFK"
+        assert flight.passenger_ids == ["P001"]
+        assert reloaded.get_jet("JET001").tail_number == "N650GS"
+        assert reloaded.get_crew("CREW001").crew_type == "Pilot"
+
+    def test_indexed_lookups(self, engine):
+        manager = make_manager(SqlStorage(engine))
+        manager.schedule_flight("", "JET001", "JFK", "LAX", "2025-06-02 09:00", "2025-06-02 15:00",
+                                [], ["CREW001"], approval_status="Pending")
+        manager.schedule_maintenance("", "JET001", "2025-07-01", "Inspection", "Annual")
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=SqlStorage(engine))
+        assert [f.flight_id for f in reloaded.get_jet_flights("JET001")] == ["FL001", "FL002"]
+        assert [m.maintenance_id for m in reloaded.get_jet_maintenance("JET001")] == ["MAINT001"]
+        assert [f.flight_id for f in reloaded.get_pending_approvals()] == ["FL002"]
+        assert [j.jet_id for j in reloaded.get_customer_jets("CUST001")] == ["JET001"]
+
+    def test_unsaved_changes_are_visible_to_queries(self, engine):
+        manager = make_manager(SqlStorage(engine))
+        manager.schedule_flight("", "JET001", "JFK", "LAX", "2025-06-02 09:00", "2025-06-02 15:00",
+                                [], ["CREW001"])
+
+        assert [f.flight_id for f in manager.get_jet_flights("JET001")] == ["FL001", "FL002"]
+        assert len(manager.flights) == 2
+        assert manager.generate_flight_id() == "FL003"
+
+    def test_in_place_edits_are_saved(self, engine):
+        manager = make_manager(SqlStorage(engine))
+        manager.update_flight_status("FL001", "In Progress")
+        manager.get_passenger("P001").customer_id = ""
+        manager.mark_changed('passengers', "P001")
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=SqlStorage(engine))
+        assert reloaded.get_flight("FL001").status == "In Progress"
+        assert reloaded.get_jet("JET001").status == "In Flight"
+        assert reloaded.get_passenger("P001").customer_id == ""
+
+    def test_delete(self, engine):
+        manager = make_manager(SqlStorage(engine))
+        manager.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103")
+        manager.save_data()
+        assert manager.delete_passenger("P002")
+        assert manager.get_passenger("P002") is None
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=SqlStorage(engine))
+        assert reloaded.get_passenger("P002") is None
+        assert list(reloaded.passengers) == ["P001"]
+
+    def test_refresh_after_other_worker_saves(self, engine):
+        worker_a = make_manager(SqlStorage(engine))
+        worker_b = JetScheduleManager(storage=SqlStorage(engine))
+        assert worker_b.get_flight("FL001").status == "Scheduled"
+        assert worker_b.refresh_if_changed() is False
+
+        worker_a.update_flight_status("FL001", "Cancelled")
+        worker_a.save_data()
+
+        assert worker_b.refresh_if_changed() is True
+        assert worker_b.get_flight("FL001").status == "Cancelled"
+
+    def test_refresh_reports_changed_records(self, engine):
+        worker_a = make_manager(SqlStorage(engine, change_feed_size=3))
+        worker_b = JetScheduleManager(storage=SqlStorage(engine))
+        changes = []
+        worker_b.add_change_listener(lambda collection, record_id: changes.append((collection, record_id)))
+
+        worker_a.update_flight_status("FL001", "Cancelled")
+        worker_a.save_data()
+        assert worker_b.refresh_if_changed() is True
+        assert sorted(changes) == [('flights', "FL001"), ('jets', "JET001")]
+
+        # Once the change log no longer reaches back, everything may have changed
+        changes.clear()
+        for name in ["A", "B", "C", "D"]:
+            worker_a.add_passenger("", name, "X0000000", "USA", "2030-01-01", "555-0100")
+            worker_a.save_data()
+        assert worker_b.refresh_if_changed() is True
+        assert changes == [(None, None)]
+        assert len(worker_b.passengers) == 5
+
+    def test_saves_without_changes_keep_the_version(self, engine):
+        storage = SqlStorage(engine)
+        manager = make_manager(storage)
+        version = storage.version()
+        storage.save(manager._collections(), {'flights': set(), 'jets': set()})
+        manager.save_data()
+        assert storage.version() == version
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,179 @@
+"""
+Unit tests for the entity classes and their (de)serialization
+Run with: pytest test_entities.py -v
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from jet_manager import (
+    Customer, User, Passenger, PrivateJet, CrewMember, Flight, MaintenanceRecord, JetScheduleManager
+)
+from date_utils import parse_datetime
+from status_updater import StatusUpdater
+from storage import JsonFileStorage
+
+
+ENTITIES = [
+    Customer("CUST001", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St"),
+    User("U001", "john", "hash", "customer", "CUST001"),
+    Passenger("P001", "Jane Doe", "X1234567", "USA", "2030-01-01", "555-0102", "CUST001"),
+    PrivateJet("JET001", "Gulfstream G650", "N650GS", 12, "CUST001"),
+    CrewMember("CREW001", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1"),
+    Flight("FL001", "JET001", "LAX", "JFK", "2025-06-01 09:00", "2025-06-01 17:00", ["P001"], ["CREW001"]),
+    MaintenanceRecord("M001", "JET001", "2025-06-02", "Inspection", "100 hour check"),
+]
+
+
+def flight_record(i: int) -> dict:
+    return {
+        'flight_id': f"FL{i:06d}", 'jet_id': f"JET{i % 50:03d}", 'departure': "LAX", 'destination': "JFK",
+        'departure_time': f"2025-{i % 12 + 1:02d}-01 09:00", 'arrival_time': f"2025-{i % 12 + 1:02d}-01 17:00",
+        'passenger_ids': ["P001", "P002"], 'crew_ids': ["CREW001"], 'status': "Scheduled",
+        'approval_status': "Approved", 'requested_by': "", 'approved_by': "", 'approval_date': "",
+    }
+
+
+@pytest.mark.parametrize('entity', ENTITIES, ids=lambda e: type(e).__name__)
+class TestSlottedEntities:
+    def test_no_instance_dict(self, entity):
+        assert not hasattr(entity, '__dict__')
+        with pytest.raises(AttributeError):
+            entity.misspelled_field = "x"
+
+    def test_round_trip(self, entity):
+        data = entity.to_dict()
+        assert type(entity).from_dict(json.loads(json.dumps(data))).to_dict() == data
+
+
+class TestEntityLoading:
+    def test_repeated_strings_are_shared(self):
+        first = Flight.from_dict(json.loads(json.dumps(flight_record(0))))
+        second = Flight.from_dict(json.loads(json.dumps(flight_record(50))))
+        assert first.jet_id is second.jet_id
+        assert first.status is second.status
+        assert first.passenger_ids[0] is second.passenger_ids[0]
+
+    def test_compact_data_file(self, tmp_path):
+        storage = JsonFileStorage(str(tmp_path / "data.json"), indent=None)
+        manager = JetScheduleManager(storage=storage)
+        manager.flights["FL000001"] = Flight.from_dict(flight_record(1))
+        manager.mark_changed('flights', "FL000001")
+        manager.save_data()
+
+        assert '\n' not in open(storage.data_file).read()
+        assert JetScheduleManager(storage=storage).get_flight("FL000001").destination == "JFK"
+
+
+class TestParsedDates:
+    def test_parsed_once_and_cached(self):
+        flight = Flight.from_dict(flight_record(0))
+        assert flight.departure_at == datetime(2025, 1, 1, 9, 0)
+        assert flight.departure_at is flight.departure_at
+        assert flight.departure_time == "2025-01-01 09:00"
+
+    def test_assignment_resets_cache(self):
+        record = MaintenanceRecord("M001", "JET001", "2025-06-02", "Inspection", "100 hour check")
+        assert record.completed_at is None
+        record.completed_date = "2025-06-03 10:30"
+        assert record.completed_at == datetime(2025, 6, 3, 10, 30)
+        record.scheduled_date = "2025-07-01"
+        assert record.scheduled_at == datetime(2025, 7, 1)
+
+    def test_form_and_unparseable_values(self):
+        flight = Flight("FL001", "JET001", "LAX", "JFK", "2025-06-01T09:00", "soon", [], [])
+        assert flight.departure_at == datetime(2025, 6, 1, 9, 0)
+        assert flight.arrival_at is None
+        assert flight.to_dict()['departure_time'] == "2025-06-01T09:00"
+
+
+@pytest.mark.benchmark
+class TestParsedDateBenchmark:
+    """Dashboard date filters and a full status rescan over 20k flights: re-parsing strings against cached datetimes"""
+
+    def test_dashboard_and_updater(self, tmp_path, capsys):
+        manager = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        for i in range(20_000):
+            record = flight_record(i)
+            manager.flights[record['flight_id']] = Flight.from_dict(record)
+        flights = list(manager.flights.values())
+        week_start = datetime(2025, 6, 1)
+        week_end = week_start + timedelta(days=7)
+        updater = StatusUpdater(manager)
+
+        def parse_date(date_str):
+            # The dashboard's former per-request helper
+            try:
+                return datetime.strptime(date_str.replace('T', ' ').split()[0], '%Y-%m-%d')
+            except ValueError:
+                return None
+
+        def before():
+            this_week = [f for f in flights if (d := parse_date(f.departure_time)) and week_start <= d < week_end]
+            for f in flights:
+                parse_datetime(f.departure_time), parse_datetime(f.arrival_time)
+            return this_week
+
+        def after():
+            this_week = [f for f in flights if (d := f.departure_at) and week_start <= d < week_end]
+            updater.update_all_statuses(full_scan=True)
+            return this_week
+
+        after()  # First access parses and caches
+        timings, matches = {}, {}
+        for label, run in [('before', before), ('after', after)]:
+            runs = []
+            for _ in range(3):
+                start = time.perf_counter()
+                matches[label] = len(run())
+                runs.append(time.perf_counter() - start)
+            timings[label] = min(runs)
+
+        with capsys.disabled():
+            print(f"\nDashboard filter + status rescan over 20k flights: parsing {timings['before'] * 1000:.0f} ms, "
+                  f"cached {timings['after'] * 1000:.0f} ms")
+        assert matches['after'] == matches['before'] > 0
+        assert timings['after'] * 2 < timings['before']
+
+
+@pytest.mark.benchmark
+class TestFlightScaleBenchmark:
+    """Memory per flight and load/save time for 100k flights"""
+
+    def test_100k_flights(self, tmp_path, capsys):
+        count = 100_000
+        data_file = tmp_path / "data.json"
+        data_file.write_text(json.dumps({'flights': {f"FL{i:06d}": flight_record(i) for i in range(count)}}))
+        gc.collect()
+
+        tracemalloc.start()
+        manager = JetScheduleManager(storage=JsonFileStorage(str(data_file)))
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        manager = JetScheduleManager(storage=JsonFileStorage(str(data_file)))
+        load_time = time.perf_counter() - start
+
+        save_times = {}
+        for indent in [2, None]:
+            manager.storage = JsonFileStorage(str(data_file), indent=indent)
+            start = time.perf_counter()
+            manager.save_data()
+            save_times[indent] = time.perf_counter() - start
+
+        with capsys.disabled():
+            print(f"\n{count} flights: {memory / count:.0f} bytes/flight, load {load_time:.2f}s, "
+                  f"save {save_times[2]:.2f}s (indented) / {save_times[None]:.2f}s (compact)")
+        assert len(manager.flights) == count
+        # Before slots and interning a loaded flight cost over 1.6 KB
+        assert memory / count < 1200
+        assert save_times[None] < save_times[2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
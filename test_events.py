@@ -0,0 +1,172 @@
+"""
+Unit tests for the live change events
+Run with: pytest test_events.py -v
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from db_storage import SqlStorage
+from events import ChangePublisher, EventHub, FileEventChannel, build_event
+from status_updater import StatusUpdater
+from jet_manager import JetScheduleManager
+from storage import JournaledStorage, JsonFileStorage
+from test_storage import make_manager
+
+
+def drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return events
+        events.append(event)
+
+
+class TestChangePublisher:
+    def test_saves_publish_events(self, tmp_path):
+        manager = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        hub = EventHub()
+        ChangePublisher(manager, hub)
+        subscription = hub.subscribe()
+
+        manager.update_flight_status("FL001", "In Progress")
+        manager.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103")
+        assert drain(subscription) == []  # Nothing until saved
+        manager.save_data()
+
+        events = drain(subscription)
+        assert [(e['collection'], e['id'], e['status']) for e in events] == [
+            ('flights', "FL001", "In Progress"), ('jets', "JET001", "In Flight")]
+        assert events[0]['customer_ids'] == ["CUST001"]
+        assert events[0]['seq'] < events[1]['seq'] < manager.change_sequence()  # Then the passenger
+
+    def test_status_updater_transitions_are_published(self, tmp_path):
+        manager = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        hub = EventHub()
+        ChangePublisher(manager, hub)
+        subscription = hub.subscribe(lambda event: event['collection'] == 'flights')
+
+        StatusUpdater(manager).update_all_statuses(full_scan=True)  # The flight is long past
+        assert [(e['id'], e['status']) for e in drain(subscription)] == [("FL001", "Completed")]
+
+    def test_deleted_records(self, tmp_path):
+        manager = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        assert build_event(manager, 7, 'passengers', "P001") is None
+        manager.delete_flight("FL001")
+        assert build_event(manager, 7, 'flights', "FL001") == {
+            'seq': 7, 'collection': 'flights', 'id': "FL001", 'deleted': True, 'customer_ids': []}
+        assert build_event(manager, 7, 'flights', "FL001", deleted_jet_id="JET001")['customer_ids'] == ["CUST001"]
+
+    def test_deletions_reach_the_jet_owners(self, tmp_path):
+        manager = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        hub = EventHub()
+        publisher = ChangePublisher(manager, hub)
+        subscription = hub.subscribe(lambda event: "CUST001" in event.get('customer_ids', ()))
+
+        manager.delete_flight("FL001")
+        manager.save_data()
+        assert [(e['id'], e.get('deleted')) for e in drain(subscription)] == [("FL001", True)]
+        seq, changes = manager.changes_since(0)
+        assert publisher.build(*changes[-1])['customer_ids'] == ["CUST001"]  # Replayed on reconnect too
+
+    def test_reloads_are_not_scanned(self, tmp_path):
+        worker_a = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        hub = EventHub()
+        publisher = ChangePublisher(worker_b, hub)
+        assert publisher.jet_ids == {}
+
+        worker_a.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103")
+        worker_a.save_data()
+        assert worker_b.refresh_if_changed() is True
+        assert publisher.jet_ids == {}
+
+        # A record deleted without ever changing before still reaches its jet's owners
+        subscription = hub.subscribe(lambda event: "CUST001" in event.get('customer_ids', ()))
+        worker_b.delete_flight("FL001")
+        worker_b.save_data()
+        assert [(e['id'], e.get('deleted')) for e in drain(subscription)] == [("FL001", True)]
+        assert worker_b.deleted_record('flights', "FL001") is None  # Released by the save
+
+    def test_sql_deletions_reach_the_jet_owners(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        make_manager(SqlStorage(engine))
+        manager = JetScheduleManager(storage=SqlStorage(engine))
+        hub = EventHub()
+        ChangePublisher(manager, hub)
+        subscription = hub.subscribe(lambda event: "CUST001" in event.get('customer_ids', ()))
+
+        assert manager.flights._cache == {}  # Nothing was loaded up front
+        manager.delete_flight("FL001")
+        manager.save_data()
+        assert [(e['id'], e.get('deleted')) for e in drain(subscription)] == [("FL001", True)]
+        engine.dispose()
+
+
+class TestEventHub:
+    def test_filters_and_overflow(self):
+        hub = EventHub(queue_size=2)
+        everything = hub.subscribe()
+        customer = hub.subscribe(lambda event: "CUST001" in event.get('customer_ids', ()))
+        events = [{'seq': i, 'collection': 'flights', 'id': f"FL00{i}", 'customer_ids': [f"CUST00{i}"]}
+                  for i in range(1, 4)]
+        hub.publish(events)
+
+        assert [e['seq'] for e in drain(customer)] == [1]
+        assert not customer.overflowed
+        assert [e['seq'] for e in drain(everything)] == [1, 2]
+        assert everything.overflowed
+
+        everything.close()
+        hub.publish(events[:1])
+        assert drain(everything) == []
+
+
+class TestFileEventChannel:
+    def test_workers_read_batches_in_order(self, tmp_path):
+        path = str(tmp_path / "data.json.events")
+        worker_a, worker_b = FileEventChannel(path), FileEventChannel(path)
+        worker_a.publish([{'seq': 1}])
+        assert worker_b.poll() == []  # Starts at the end
+
+        worker_a.publish([{'seq': 2}, {'seq': 3}])
+        worker_b.publish([{'seq': 4}])
+        assert worker_b.poll() == [{'seq': 2}, {'seq': 3}, {'seq': 4}]
+        assert worker_b.poll() == []
+
+    def test_partial_lines_wait(self, tmp_path):
+        path = str(tmp_path / "data.json.events")
+        reader = FileEventChannel(path)
+        FileEventChannel(path).publish([{'seq': 1}])
+        reader.poll()
+
+        with open(path, 'ab') as f:
+            f.write(b'[{"seq":')
+        assert reader.poll() == []
+        with open(path, 'ab') as f:
+            f.write(b'2}]\n')
+        assert reader.poll() == [{'seq': 2}]
+
+    def test_rotation_keeps_unread_events(self, tmp_path):
+        path = str(tmp_path / "data.json.events")
+        writer, reader = FileEventChannel(path, max_bytes=40), FileEventChannel(path)
+        writer.publish([{'seq': 1}])
+        reader.poll()
+
+        for seq in range(2, 8):
+            writer.publish([{'seq': seq}])
+        assert [e['seq'] for e in reader.poll()] == [2, 3, 4, 5, 6, 7]
+
+    def test_hub_delivers_through_the_channel(self, tmp_path):
+        path = str(tmp_path / "data.json.events")
+        hub_a = EventHub(FileEventChannel(path), poll_interval=0.01)
+        hub_b = EventHub(FileEventChannel(path), poll_interval=0.01)
+        subscription = hub_b.subscribe()  # Before anything was published - reads the file from its start
+
+        hub_a.publish([{'seq': 1, 'collection': 'jets', 'id': "JET001", 'status': "Maintenance"}])
+        assert subscription.get(timeout=2) == {'seq': 1, 'collection': 'jets', 'id': "JET001",
+                                               'status': "Maintenance"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,99 @@
+"""
+Unit tests for record ID allocation
+Run with: pytest test_id_allocation.py -v -s  (-s shows the benchmark timings)
+"""
+
+import json
+import time
+import pytest
+from sqlalchemy import create_engine
+from jet_manager import JetScheduleManager
+from storage import JsonFileStorage, JournaledStorage, CollectionFileStorage
+from db_storage import SqlStorage
+from test_storage import make_manager
+
+BACKENDS = {
+    'json': lambda tmp_path: JsonFileStorage(str(tmp_path / "data.json")),
+    'journal': lambda tmp_path: JournaledStorage(str(tmp_path / "data.json")),
+    'collections': lambda tmp_path: CollectionFileStorage(str(tmp_path / "data"), legacy_file=None),
+    'sql': lambda tmp_path: SqlStorage(create_engine(f"sqlite:///{tmp_path / 'jets.db'}")),
+}
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+class TestIdAllocation:
+    def test_sequential_ids(self, tmp_path, backend):
+        manager = make_manager(BACKENDS[backend](tmp_path))
+        assert manager.add_passenger("", "Second", "Y7654321", "USA", "2030-01-01", "555-0103") == "P002"
+        assert manager.generate_flight_id() == "FL002"
+        assert manager.generate_flight_id() == "FL003"
+
+    def test_workers_get_disjoint_blocks(self, tmp_path, backend):
+        worker_a = JetScheduleManager(storage=BACKENDS[backend](tmp_path), id_block_size=5)
+        worker_b = JetScheduleManager(storage=BACKENDS[backend](tmp_path), id_block_size=5)
+
+        ids_a, ids_b = [], []
+        for _ in range(7):
+            ids_a.append(worker_a.generate_passenger_id())
+            ids_b.append(worker_b.generate_passenger_id())
+
+        assert ids_a == ["P001", "P002", "P003", "P004", "P005", "P011", "P012"]
+        assert ids_b == ["P006", "P007", "P008", "P009", "P010", "P016", "P017"]
+
+    def test_bulk_allocation(self, tmp_path, backend):
+        manager = JetScheduleManager(storage=BACKENDS[backend](tmp_path), id_block_size=5)
+        ids = manager.allocate_ids('flights', 12)
+
+        assert ids == [f"FL{i:03d}" for i in range(1, 13)]
+        assert manager.generate_flight_id() == "FL013"
+        with pytest.raises(ValueError):
+            manager.allocate_ids('aircraft', 2)
+
+
+class TestIdCounterRestore:
+    def test_counters_start_above_existing_data(self, tmp_path):
+        storage = JsonFileStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        manager.add_passenger("P041", "Imported", "Z1", "USA", "2030-01-01", "555-0104")
+        manager.save_data()
+        (tmp_path / "data.json.seq").unlink()
+
+        # Sequence file lost (or data from before sequences existed) - restart from the data
+        reloaded = JetScheduleManager(storage=JsonFileStorage(storage.data_file))
+        assert reloaded.generate_passenger_id() == "P042"
+
+    def test_explicit_ids_are_skipped(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        manager.add_passenger("P002", "Explicit", "Z2", "USA", "2030-01-01", "555-0105")
+        assert manager.generate_passenger_id() == "P003"
+
+    def test_high_water_mark_is_persisted(self, tmp_path):
+        storage = JsonFileStorage(str(tmp_path / "data.json"))
+        JetScheduleManager(storage=storage, id_block_size=10).generate_jet_id()
+
+        with open(storage.sequence_file) as f:
+            assert json.load(f) == {"JET": 10}
+        # A restarted process continues after the reserved block
+        assert JetScheduleManager(storage=storage).generate_jet_id() == "JET011"
+
+
+@pytest.mark.benchmark
+class TestIdAllocationBenchmark:
+    def test_bulk_insert_is_linear(self, tmp_path, capsys):
+        manager = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")), id_block_size=1000)
+        timings = {}
+        for count in (2000, 8000):
+            start = time.perf_counter()
+            for _ in range(count):
+                manager.add_passenger("", "Bulk", "B1", "USA", "2030-01-01", "555-0106")
+            timings[count] = (time.perf_counter() - start) / count
+
+        with capsys.disabled():
+            print(f"\nPer-insert cost: {timings[2000] * 1e6:.1f} us at 2k records, "
+                  f"{timings[8000] * 1e6:.1f} us at 10k records")
+        # The old max() scan made each insert O(n) - 5x the records cost ~5x per insert
+        assert timings[8000] < timings[2000] * 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,194 @@
+"""
+Unit tests for JetScheduleManager secondary indexes
+Run with: pytest test_indexes.py -v
+"""
+
+import random
+import time
+import pytest
+from jet_manager import JetScheduleManager, INDEXED_FIELDS
+from storage import JsonFileStorage, JournaledStorage
+from test_storage import make_manager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+
+
+def scan(manager, collection, field, value):
+    """The linear scan the indexes replace"""
+    matches = []
+    for record_id, record in getattr(manager, collection).items():
+        attribute = getattr(record, field)
+        if (value in attribute) if isinstance(attribute, list) else attribute == value:
+            matches.append(record_id)
+    return sorted(matches)
+
+
+def assert_indexes_match_scans(manager):
+    for collection, fields in INDEXED_FIELDS.items():
+        key = {'users': 'user_id', 'passengers': 'passenger_id', 'jets': 'jet_id',
+               'flights': 'flight_id', 'maintenance': 'maintenance_id'}[collection]
+        for field in fields:
+            values = set()
+            for record in getattr(manager, collection).values():
+                value = getattr(record, field)
+                values.update(value if isinstance(value, list) else [value])
+            for value in values:
+                found = sorted(getattr(r, key) for r in manager._find(collection, field, value))
+                assert found == scan(manager, collection, field, value), (collection, field, value)
+
+
+class TestSecondaryIndexes:
+    def test_lookups_by_jet(self, manager):
+        manager.schedule_maintenance("", "JET001", "2025-07-01", "Inspection", "Annual")
+
+        assert [f.flight_id for f in manager.get_jet_flights("JET001")] == ["FL001"]
+        assert [m.maintenance_id for m in manager.get_jet_maintenance("JET001")] == ["MAINT001"]
+        assert manager.get_jet_flights("JET999") == []
+
+    def test_status_change_moves_flight(self, manager):
+        manager.update_flight_status("FL001", "In Progress")
+
+        assert manager._find('flights', 'status', "Scheduled") == []
+        assert [f.flight_id for f in manager._find('flights', 'status', "In Progress")] == ["FL001"]
+
+    def test_in_place_edit_is_reindexed_after_mark_changed(self, manager):
+        jet = manager.get_jet("JET001")
+        manager.add_customer("", "Ann Lee", "Lee Air", "ann@example.com", "555-0103", "2 Main St")
+        jet.customer_ids.append("CUST002")
+        manager.mark_changed('jets', "JET001")
+
+        assert manager.get_shared_jets("CUST002") == [jet]
+        assert manager.get_customer_jets("CUST002") == []  # CUST001 is still the primary owner
+
+    def test_pending_approvals_follow_approval_changes(self, manager):
+        manager.schedule_flight("", "JET001", "JFK", "LAX", "2025-06-02 09:00", "2025-06-02 15:00",
+                                [], ["CREW001"], approval_status="Pending")
+        assert [f.flight_id for f in manager.get_pending_approvals()] == ["FL002"]
+
+        manager.approve_flight("FL002", "CREW001")
+        assert manager.get_pending_approvals() == []
+
+    def test_delete_removes_from_indexes(self, manager):
+        manager.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103", "CUST001")
+        assert len(manager.get_customer_passengers("CUST001")) == 2
+
+        manager.delete_passenger("P002")
+        assert [p.passenger_id for p in manager.get_customer_passengers("CUST001")] == ["P001"]
+
+    def test_username_lookup(self, manager):
+        manager.add_user("", "jsmith", "hash", "customer", "CUST001")
+        assert manager.get_user_by_username("jsmith").related_id == "CUST001"
+        assert manager.add_user("", "jsmith", "hash", "customer") == ""
+
+    def test_refresh_from_other_worker_updates_indexes(self, tmp_path):
+        worker_a = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        worker_a.schedule_maintenance("", "JET001", "2025-07-01", "Inspection", "Annual")
+        worker_a.update_flight_status("FL001", "Completed")
+        worker_a.save_data()
+
+        worker_b.refresh_if_changed()
+        assert [m.maintenance_id for m in worker_b.get_jet_maintenance("JET001")] == ["MAINT001"]
+        assert [f.flight_id for f in worker_b._find('flights', 'status', "Completed")] == ["FL001"]
+
+    def test_random_mutations_match_linear_scans(self, manager):
+        rng = random.Random(7)
+        statuses = ["Scheduled", "In Progress", "Completed", "Cancelled"]
+        for i in range(3):
+            manager.add_jet("", f"Model {i}", f"N{i}00", 8, "CUST001")
+        for i in range(40):
+            jet_id = rng.choice(list(manager.jets))
+            action = rng.random()
+            if action < 0.5:
+                manager.schedule_flight("", jet_id, "LAX", "SFO", "2025-06-01 09:00", "2025-06-01 10:00",
+                                        [], ["CREW001"], approval_status=rng.choice(["Approved", "Pending"]))
+            elif action < 0.7:
+                manager.schedule_maintenance("", jet_id, "2025-07-01", "Inspection", "")
+            elif action < 0.9 and manager.flights:
+                manager.update_flight_status(rng.choice(list(manager.flights)), rng.choice(statuses))
+            elif manager.flights:
+                flight = manager.get_flight(rng.choice(list(manager.flights)))
+                flight.jet_id = jet_id
+                manager.mark_changed('flights', flight.flight_id)
+            if i % 5 == 0:
+                assert_indexes_match_scans(manager)
+        assert_indexes_match_scans(manager)
+
+
+class TestPendingApprovalsCount:
+    def request_flight(self, manager):
+        return manager.schedule_flight("", "JET001", "JFK", "LAX", "2025-06-02 09:00", "2025-06-02 15:00",
+                                       [], ["CREW001"], approval_status="Pending")
+
+    def test_count_is_cached_until_flights_change(self, manager, monkeypatch):
+        manager.update_customer("CUST001", "John Smith", "Smith Enterprises", "john@example.com",
+                                "555-0100", "1 Main St", lead_pilot_id="CREW001")
+        flight_id = self.request_flight(manager)
+        assert manager.get_pending_approvals_count("CREW001") == 1
+
+        calls = []
+        original = manager.get_pending_approvals
+        monkeypatch.setattr(manager, 'get_pending_approvals', lambda *args: calls.append(args) or original(*args))
+        assert manager.get_pending_approvals_count("CREW001") == 1
+        assert calls == []
+
+        manager.approve_flight(flight_id, "CREW001")
+        assert manager.get_pending_approvals_count("CREW001") == 0
+        assert len(calls) == 1
+
+    def test_lead_pilot_change_invalidates_count(self, manager):
+        self.request_flight(manager)
+        assert manager.get_pending_approvals_count("CREW001") == 0
+
+        manager.get_customer("CUST001").lead_pilot_id = "CREW001"
+        manager.mark_changed('customers', "CUST001")
+        assert manager.get_pending_approvals_count("CREW001") == 1
+
+
+@pytest.mark.benchmark
+class TestLoginPathBenchmark:
+    """Per-request lookups with many records: linear scans (before) against indexes and caches (after)"""
+
+    def test_username_and_pending_count_overhead(self, tmp_path, capsys):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        manager.update_customer("CUST001", "John Smith", "Smith Enterprises", "john@example.com",
+                                "555-0100", "1 Main St", lead_pilot_id="CREW001")
+        for i in range(5000):
+            manager.add_user(f"U{i:05d}", f"user{i}", "hash", "customer", "CUST001")
+        for i in range(2000):
+            manager.schedule_flight(f"F{i:05d}", "JET001", "LAX", "SFO", "2025-06-01 09:00", "2025-06-01 10:00",
+                                    [], ["CREW001"], approval_status="Pending" if i % 10 == 0 else "Approved")
+        requests = 200
+
+        def before():
+            # Login scan, three get_user calls (role_required, get_current_user, context processor),
+            # and the pending approvals filter on every render
+            next(u for u in manager.users.values() if u.username == "user4999")
+            for _ in range(3):
+                manager.get_user("U04999")
+            len([f for f in manager.flights.values() if f.approval_status == "Pending"])
+
+        def after():
+            manager.get_user_by_username("user4999")
+            manager.get_user("U04999")
+            manager.get_pending_approvals_count("CREW001")
+
+        timings = {}
+        for label, request in [('before', before), ('after', after)]:
+            request()  # Warm up (the first indexed lookup indexes the records added above)
+            start = time.perf_counter()
+            for _ in range(requests):
+                request()
+            timings[label] = (time.perf_counter() - start) / requests
+
+        with capsys.disabled():
+            print(f"\nPer-request lookup overhead: before {timings['before'] * 1e6:.0f} us, "
+                  f"after {timings['after'] * 1e6:.1f} us")
+        assert timings['after'] < timings['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
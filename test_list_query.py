@@ -0,0 +1,265 @@
+"""
+Unit tests for the paginated list queries
+Run with: pytest test_list_query.py -v
+"""
+
+import random
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from db_storage import SqlStorage
+from jet_manager import Flight, JetScheduleManager
+from list_query import ListQuery, SORT_FIELDS, day_bounds, decode_cursor, encode_cursor, sort_key
+from storage import JournaledStorage, JsonFileStorage
+
+STATUSES = ["Scheduled", "In Progress", "Completed", "Cancelled"]
+
+
+def make_manager(storage, flights=60):
+    manager = JetScheduleManager(storage=storage)
+    manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+    for i in range(3):
+        manager.add_jet("", "Gulfstream G650", f"N65{i}GS", 12, "CUST001")
+    manager.add_crew("", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1")
+    rng = random.Random(7)
+    for i in range(flights):
+        flight_id = f"FL{i + 1:03d}"
+        day = rng.randint(1, 28)
+        departure = f"2025-06-{day:02d} {rng.randint(0, 23):02d}:00" if i % 10 else ""
+        manager.flights[flight_id] = Flight(flight_id, f"JET00{i % 3 + 1}", "LAX", "JFK", departure,
+                                            f"2025-06-{day:02d} 23:30", [], ["CREW001"], STATUSES[i % 4])
+        manager.mark_changed('flights', flight_id)
+    manager.save_data()
+    return manager
+
+
+def reference_page(manager, filters=None, date_from=None, date_to=None, sort='departure_time',
+                   descending=False, page=1, per_page=20):
+    """The page as filtering and sorting every flight would produce it"""
+    start, end = day_bounds(date_from, date_to)
+    matches = []
+    for flight in manager.flights.values():
+        if any(getattr(flight, field) not in values for field, values in (filters or {}).items()):
+            continue
+        if start or end:
+            if flight.departure_at is None or (start and flight.departure_at < start) \
+                    or (end and flight.departure_at >= end):
+                continue
+        matches.append((sort_key(getattr(flight, SORT_FIELDS['flights'][sort])), flight.flight_id))
+    matches.sort(reverse=descending)
+    offset = (page - 1) * per_page
+    return len(matches), [flight_id for _, flight_id in matches[offset:offset + per_page]]
+
+
+def assert_matches_reference(manager, query, **kwargs):
+    result = query.page('flights', **kwargs)
+    assert (result.total, [f.flight_id for f in result.items_on_page]) == reference_page(manager, **kwargs), kwargs
+
+
+QUERIES = [
+    {},
+    {'descending': True, 'page': 2},
+    {'sort': 'status', 'per_page': 7, 'page': 3},
+    {'filters': {'status': ["Scheduled"]}},
+    {'filters': {'status': ["Scheduled", "Completed"], 'jet_id': ["JET002"]}, 'descending': True},
+    {'date_from': datetime(2025, 6, 10), 'date_to': datetime(2025, 6, 20)},
+    {'date_from': datetime(2025, 6, 10), 'descending': True, 'page': 2, 'per_page': 5},
+    {'date_to': datetime(2025, 6, 5), 'filters': {'jet_id': ["JET001"]}},
+    {'date_from': datetime(2025, 6, 10), 'sort': 'flight_id', 'filters': {'status': ["Cancelled"]}},
+    {'filters': {'jet_id': ["JET404"]}},
+]
+
+
+class TestListQuery:
+    @pytest.mark.parametrize('kwargs', QUERIES)
+    def test_pages_match_full_sort(self, tmp_path, kwargs):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        assert_matches_reference(manager, ListQuery(manager), **kwargs)
+
+    def test_follows_changes(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        query = ListQuery(manager)
+        for kwargs in QUERIES:
+            query.page('flights', **kwargs)  # Build the orderings
+
+        manager.update_flight_status("FL002", "Cancelled")
+        manager.get_flight("FL003").departure_time = "2025-06-15 12:00"
+        manager.mark_changed('flights', "FL003")
+        manager.delete_flight("FL004")
+        manager.schedule_flight("", "JET001", "LAX", "SFO", "2025-06-12 08:00", "2025-06-12 09:00", [], ["CREW001"])
+        for kwargs in QUERIES:
+            assert_matches_reference(manager, query, **kwargs)
+
+    def test_follows_other_workers(self, tmp_path):
+        worker_a = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        query = ListQuery(worker_b)
+        query.page('flights')
+
+        worker_a.get_flight("FL005").departure_time = "2025-05-01 09:00"
+        worker_a.mark_changed('flights', "FL005")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert query.page('flights').items_on_page[0].flight_id == "FL005"
+
+    def test_unknown_sort_and_filter_are_ignored(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        result = ListQuery(manager).page('flights', filters={'destination': ["SFO"]}, sort='passport_number')
+        assert (result.total, [f.flight_id for f in result.items_on_page]) == reference_page(manager)
+
+    def test_other_collections(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        query = ListQuery(manager)
+        manager.get_jet("JET002").capacity = 16
+        manager.mark_changed('jets', "JET002")
+
+        jets = query.page('jets', filters={'customer_ids': ["CUST001"]}, sort='capacity', descending=True)
+        assert [j.jet_id for j in jets.items_on_page] == ["JET002", "JET003", "JET001"]
+        assert query.page('crew', filters={'crew_type': ["Cabin Crew"]}).total == 0
+
+
+class TestKeysetPages:
+    def walk(self, query, limit, **kwargs):
+        """Flight IDs of every page, following cursors"""
+        pages, after = [], None
+        while True:
+            records, last = query.keyset('flights', 'departure_time', after=after, limit=limit, **kwargs)
+            pages.append([f.flight_id for f in records])
+            if last is None:
+                return pages
+            after = decode_cursor('flights', 'departure_time', encode_cursor('flights', 'departure_time', last))
+
+    @pytest.mark.parametrize('filters', [None, {'status': ["Completed"]}, {'jet_id': ["JET001", "JET003"]}])
+    def test_pages_cover_the_ordering(self, tmp_path, filters):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        pages = self.walk(ListQuery(manager), 7, filters=filters)
+        assert all(len(page) == 7 for page in pages[:-1])
+        assert sum(pages, []) == reference_page(manager, filters=filters, per_page=1000)[1]
+
+    def test_changes_between_pages(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        query = ListQuery(manager)
+        first, last = query.keyset('flights', 'departure_time', limit=10)
+        seen = {f.flight_id for f in first}
+
+        # A record deleted before and one added after the cursor are skipped; the rest follow in order
+        manager.delete_flight(first[0].flight_id)
+        manager.schedule_flight("", "JET001", "LAX", "SFO", "2025-05-01 08:00", "2025-05-01 09:00", [], ["CREW001"])
+        rest, _ = query.keyset('flights', 'departure_time', after=last)
+        assert not seen & {f.flight_id for f in rest}
+        assert len(seen) + len(rest) == len(manager.flights)
+
+    def test_updated_since(self, tmp_path):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")))
+        reloaded = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        query = ListQuery(reloaded)
+        before_load = datetime(2000, 1, 1)
+        assert reloaded.modified_since('flights', before_load) is None  # Unknown - everything qualifies
+
+        as_of = datetime.now()
+        reloaded.update_flight_status("FL007", "Cancelled")
+        reloaded.delete_flight("FL008")
+        assert reloaded.modified_since('flights', as_of) == {"FL007", "FL008"}
+        records, _ = query.keyset('flights', ids=reloaded.modified_since('flights', as_of))
+        assert [f.flight_id for f in records] == ["FL007"]
+
+    def test_foreign_cursors_are_rejected(self, tmp_path):
+        cursor = encode_cursor('jets', 'jet_id', ((0, "jet001"), "JET001"))
+        with pytest.raises(ValueError):
+            decode_cursor('flights', 'departure_time', cursor)
+        with pytest.raises(ValueError):
+            decode_cursor('flights', 'departure_time', "not a cursor")
+
+
+class TestSqlListQuery:
+    def test_pushed_down_to_sql(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        make_manager(SqlStorage(engine))
+        manager = JetScheduleManager(storage=SqlStorage(engine))
+        query = ListQuery(manager)
+
+        for kwargs in [{'filters': {'status': ["Scheduled"]}, 'sort': 'flight_id', 'page': 2, 'per_page': 5},
+                       {'filters': {'jet_id': ["JET002"]}, 'sort': 'flight_id', 'descending': True},
+                       {'date_from': datetime(2025, 6, 10), 'date_to': datetime(2025, 6, 20), 'sort': 'flight_id'}]:
+            assert_matches_reference(manager, query, **kwargs)
+
+        for kwargs in QUERIES:
+            assert_matches_reference(manager, query, **kwargs)
+        assert query._orderings == {}  # No page needed the in-memory orderings
+
+        # Unsaved changes are answered in memory
+        manager.update_flight_status("FL001", "Scheduled")
+        assert_matches_reference(manager, query, filters={'status': ["Scheduled"]}, sort='flight_id')
+        engine.dispose()
+
+    def test_orderings_follow_other_sql_workers(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        worker_a = make_manager(SqlStorage(engine))
+        worker_b = JetScheduleManager(storage=SqlStorage(engine))
+        query = ListQuery(worker_b)
+        ordering = query._ordering('flights', 'departure_time')[0]
+
+        worker_a.get_flight("FL005").departure_time = "2025-05-01 09:00"
+        worker_a.mark_changed('flights', "FL005")
+        worker_a.save_data()
+        worker_b.refresh_if_changed()
+        assert query._dirty == {'flights': {"FL005"}}
+        records, _ = query.keyset('flights', limit=1)
+        assert records[0].flight_id == "FL005"
+        assert query._ordering('flights', 'departure_time')[0] is ordering  # Moved, not rebuilt
+        engine.dispose()
+
+    def test_other_date_forms_are_answered_in_memory(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+        manager = make_manager(SqlStorage(engine))
+        manager.flights["FL002"].departure_time = "06/30/2025 08:00"
+        manager.flights["FL003"].departure_time = "2025-06-01T08:00"
+        manager.mark_changed('flights', "FL002")
+        manager.mark_changed('flights', "FL003")
+        manager.save_data()
+        query = ListQuery(manager)
+
+        for kwargs in QUERIES:
+            assert_matches_reference(manager, query, **kwargs)
+        # Sorts and filters on other fields still run in SQL
+        query._orderings.clear()
+        assert_matches_reference(manager, query, sort='flight_id', filters={'status': ["Scheduled"]})
+        assert query._orderings == {}
+        engine.dispose()
+
+
+@pytest.mark.benchmark
+class TestListQueryBenchmark:
+    """One flights page over 100k flights: filter and sort everything (before) against orderings (after)"""
+
+    def test_page_cost(self, tmp_path, capsys):
+        manager = make_manager(JsonFileStorage(str(tmp_path / "data.json")), flights=0)
+        for i in range(100_000):
+            flight_id = f"F{i:06d}"
+            manager.flights[flight_id] = Flight(flight_id, f"JET00{i % 3 + 1}", "LAX", "JFK",
+                                                f"20{10 + i % 15}-{i % 12 + 1:02d}-{i % 28 + 1:02d} 09:00",
+                                                "", [], ["CREW001"], STATUSES[i % 4])
+            manager.mark_changed('flights', flight_id)
+        query = ListQuery(manager)
+        query.page('flights', filters={'status': ["Scheduled"]})  # Initial ordering and index refresh
+        pages = [{'page': 40}, {'descending': True}, {'filters': {'status': ["Completed"]}, 'page': 3},
+                 {'date_from': datetime(2020, 1, 1), 'date_to': datetime(2020, 12, 31)}]
+
+        timings = {}
+        for label, render in [('before', lambda kwargs: reference_page(manager, **kwargs)),
+                              ('after', lambda kwargs: query.page('flights', **kwargs))]:
+            start = time.perf_counter()
+            for kwargs in pages:
+                render(kwargs)
+            timings[label] = (time.perf_counter() - start) / len(pages)
+
+        with capsys.disabled():
+            print(f"\nFlights page over 100k flights: full sort {timings['before'] * 1000:.0f} ms, "
+                  f"orderings {timings['after'] * 1000:.1f} ms")
+        assert timings['after'] * 5 < timings['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Unit tests for the streaming JSON to database migration (run against SQLite)
+Run with: pytest test_migrate_from_json.py -v
+"""
+
+import json
+import os
+import pytest
+from sqlalchemy import create_engine
+import migrate_from_json
+from migrate_from_json import iter_json_records, migrate_data, checkpoint_file
+from db_storage import SqlStorage
+from jet_manager import JetScheduleManager
+from storage import JsonFileStorage
+from test_storage import make_manager
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jets.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    storage = JsonFileStorage(str(tmp_path / "data.json"))
+    manager = make_manager(storage)
+    for i in range(25):
+        manager.add_passenger("", f"Passenger {i}", f"X{i:07d}", "USA", "2030-01-01", "555-0100", "CUST001")
+    manager.save_data()
+    return storage.data_file
+
+
+class TestStreamingParse:
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+    def test_matches_json_load(self, json_file, chunk_size):
+        with open(json_file) as f:
+            data = json.load(f)
+        expected = [(name, record_id, record)
+                    for name, records in data.items() for record_id, record in records.items()]
+
+        assert list(iter_json_records(json_file, chunk_size)) == expected
+
+    def test_skips_unknown_sections(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text('{"version": 3, "notes": ["a", {"b": 1}], "jets": {"JET001": {"jet_id": "JET001"}}, "users": {}}')
+
+        assert list(iter_json_records(str(path), 4)) == [('jets', 'JET001', {'jet_id': 'JET001'})]
+
+
+class TestMigration:
+    def test_migrates_all_records(self, json_file, engine):
+        summary = migrate_data(json_file, batch_size=10, db_engine=engine)
+
+        assert summary['records'] == 30
+        assert summary['collections']['passengers'] == 26
+        assert not os.path.exists(checkpoint_file(json_file))
+        manager = JetScheduleManager(storage=SqlStorage(engine))
+        assert len(manager.passengers) == 26
+        assert manager.get_crew("CREW001").crew_type == "Pilot"
+        assert manager.get_jet("JET001").tail_number == "N650GS"
+        assert manager.get_flight("FL001").passenger_ids == ["P001"]
+
+    def test_rerun_updates_existing_rows(self, json_file, engine):
+        migrate_data(json_file, db_engine=engine)
+        migrate_data(json_file, db_engine=engine)
+
+        manager = JetScheduleManager(storage=SqlStorage(engine))
+        assert len(manager.passengers) == 26
+
+    def test_resumes_after_failure(self, json_file, engine, monkeypatch):
+        upsert_rows = migrate_from_json.upsert_rows
+        calls = []
+
+        def failing_upsert(session, collection, rows):
+            calls.append(len(rows))
+            if len(calls) == 4:
+                raise RuntimeError("connection lost")
+            upsert_rows(session, collection, rows)
+
+        monkeypatch.setattr(migrate_from_json, 'upsert_rows', failing_upsert)
+        with pytest.raises(RuntimeError):
+            migrate_data(json_file, batch_size=10, db_engine=engine)
+        monkeypatch.setattr(migrate_from_json, 'upsert_rows', upsert_rows)
+
+        # customers and the first 20 passengers committed before the failure
+        with open(checkpoint_file(json_file)) as f:
+            assert json.load(f)['records'] == 21
+
+        summary = migrate_data(json_file, batch_size=10, db_engine=engine)
+        assert summary['skipped'] == 21
+        assert summary['records'] == 9
+        manager = JetScheduleManager(storage=SqlStorage(engine))
+        assert len(manager.passengers) == 26
+        assert manager.get_flight("FL001") is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
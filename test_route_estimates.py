@@ -0,0 +1,93 @@
+"""
+Unit tests for cached route distances and aircraft-specific duration estimates
+Run with: pytest test_route_estimates.py -v
+"""
+
+import random
+import time
+
+import pytest
+from aircraft_profiles import DEFAULT_PROFILE, profile_for_model
+from airport_utils import AirportDatabase
+from test_airport_search import synthetic_airports, write_airports
+
+
+class TestAircraftProfiles:
+    def test_models_match_by_keyword(self):
+        assert profile_for_model("Gulfstream G650").name == "Gulfstream G650"
+        assert profile_for_model("GULFSTREAM G650ER").name == "Gulfstream G650"
+        assert profile_for_model("Gulfstream G280").name == "Gulfstream"
+        assert profile_for_model("Citation CJ3").name == "Cessna Citation CJ"
+        assert profile_for_model("Zeppelin NT") is DEFAULT_PROFILE
+        assert profile_for_model(None) is DEFAULT_PROFILE
+
+    def test_sample_fleet_has_profiles(self):
+        for model in ["Challenger 350", "Gulfstream G650", "Bombardier Global 7500", "Cessna Citation X"]:
+            assert profile_for_model(model) is not DEFAULT_PROFILE
+
+
+class TestRouteEstimates:
+    def test_unknown_models_keep_the_old_estimate(self):
+        db = AirportDatabase()
+        distance = db.calculate_distance("LAX", "JFK")
+        total_hours = distance / 450 + 0.5
+        expected = (int(total_hours), int((total_hours - int(total_hours)) * 60))
+        assert db.estimate_flight_duration("LAX", "JFK") == expected
+        assert db.estimate_flight_duration("LAX", "JFK", aircraft_model="Unknown Jet") == expected
+        assert db.estimate_flight_duration("LAX", "NOPE") is None
+
+    def test_estimates_follow_the_aircraft(self):
+        db = AirportDatabase()
+        slow = db.estimate_flight_duration("LAX", "JFK", aircraft_model="King Air 350")
+        fast = db.estimate_flight_duration("LAX", "JFK", aircraft_model="Cessna Citation X")
+        assert fast < db.estimate_flight_duration("LAX", "JFK") < slow
+        assert db.estimate_flight_duration("LAX", "JFK", average_speed_mph=350,
+                                           aircraft_model="Cessna Citation X") > fast
+
+    def test_routes_are_cached_in_both_directions(self):
+        db = AirportDatabase(route_cache_size=8)
+        assert db.route_distance("LAX", "JFK") == db.route_distance(" jfk", "lax")
+        assert db._route_distance.cache_info().misses == 1
+        db.estimate_flight_durations([("JFK", "LAX"), ("LAX", "JFK"), ("LAX", "SFO")],
+                                     aircraft_model="Gulfstream G650")
+        info = db._route_distance.cache_info()
+        assert (info.hits, info.misses) == (3, 2)
+
+        db.load_airports()  # Reopened data starts a fresh cache
+        assert db._route_distance.cache_info().currsize == 0
+
+    def test_cache_can_be_disabled(self):
+        db = AirportDatabase(route_cache_size=0)
+        assert db.route_distance("LAX", "JFK") == AirportDatabase().route_distance("JFK", "LAX")
+        assert not hasattr(db._route_distance, 'cache_info')
+
+
+@pytest.mark.benchmark
+class TestRouteEstimateBenchmark:
+    """Durations for 20k legs over 300 routes of 70k airports: measured each time (before) against cached (after)"""
+
+    def test_planning_cost(self, tmp_path, capsys):
+        airports = synthetic_airports(70_000)
+        write_airports(tmp_path, airports).airports  # Compiles the data file once for both databases
+        rng = random.Random(4)
+        routes = [(rng.choice(airports)['code'], rng.choice(airports)['code']) for _ in range(300)]
+        legs = [route[::rng.choice([1, -1])] for route in rng.choices(routes, k=20_000)]
+        path = str(tmp_path / "airports.json")
+
+        timings, results = {}, {}
+        for label, cache_size in [('before', 0), ('after', 4096)]:
+            db = AirportDatabase(path, route_cache_size=cache_size)
+            db.airports
+            start = time.perf_counter()
+            results[label] = db.estimate_flight_durations(legs, aircraft_model="Challenger 350")
+            timings[label] = time.perf_counter() - start
+
+        with capsys.disabled():
+            print(f"\n20k leg estimates over 300 routes: uncached {timings['before'] * 1000:.0f} ms, "
+                  f"cached {timings['after'] * 1000:.0f} ms")
+        assert results['after'] == results['before']
+        assert timings['after'] * 2 < timings['before']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
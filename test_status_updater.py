@@ -0,0 +1,230 @@
+"""
+Unit tests for automatic status updates and the background scheduler
+Run with: pytest test_status_updater.py -v
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from jet_manager import Flight, JetScheduleManager
+from status_updater import StatusScheduler, StatusUpdater
+from storage import JsonFileStorage, JournaledStorage
+
+
+def make_manager(data_file, storage_class=JsonFileStorage):
+    manager = JetScheduleManager(storage=storage_class(data_file))
+    manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+    manager.add_jet("", "Gulfstream G650", "N650GS", 12, "CUST001")
+    manager.add_crew("", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1")
+    manager.schedule_flight("", "JET001", "LAX", "JFK", "2020-06-01 09:00", "2020-06-01 17:00", [], ["CREW001"])
+    manager.schedule_flight("", "JET001", "JFK", "LAX", "2099-06-01 09:00", "2099-06-01 17:00", [], ["CREW001"])
+    manager.schedule_maintenance("", "JET001", "2020-05-01", "Inspection", "100 hour check")
+    manager.save_data()
+    return manager
+
+
+def make_scheduler(tmp_path, data_file, **kwargs):
+    return StatusScheduler(lambda: JetScheduleManager(storage=JsonFileStorage(data_file)),
+                           lock_file=str(tmp_path / "scheduler.lock"), **kwargs)
+
+
+class TestStatusUpdater:
+    def test_update_all_statuses(self, tmp_path):
+        manager = make_manager(str(tmp_path / "data.json"))
+        result = StatusUpdater(manager).update_all_statuses()
+
+        assert result['flights_updated'] == 1
+        assert result['maintenance_updated'] == 1
+        assert manager.get_flight("FL001").status == "Completed"
+        assert manager.get_flight("FL002").status == "Scheduled"
+        assert manager.maintenance["MAINT001"].status == "In Progress"
+
+
+class TestTransitionQueue:
+    def test_only_due_records_are_checked(self, tmp_path):
+        manager = make_manager(str(tmp_path / "data.json"))
+        updater = StatusUpdater(manager)
+
+        first = updater.update_all_statuses()
+        assert first['records_checked'] == 2  # FL001 and MAINT001 - FL002 is in 2099
+        second = updater.update_all_statuses()
+        # FL001 was rescheduled by its own status change and is checked once more, with no effect
+        assert second['flights_updated'] == 0
+        assert updater.update_all_statuses()['records_checked'] == 0
+
+    def test_pop_due_transitions_in_time_order(self, tmp_path):
+        manager = make_manager(str(tmp_path / "data.json"))
+        due = manager.pop_due_transitions(datetime(2020, 6, 1, 12, 0))
+        assert [(name, getattr(record, 'flight_id', None)) for name, record in due] == \
+            [('maintenance', None), ('flights', "FL001")]
+        assert manager.pop_due_transitions(datetime(2020, 6, 1, 12, 0)) == []
+        # Arrival is the next instant
+        assert [name for name, _ in manager.pop_due_transitions(datetime(2020, 6, 1, 18, 0))] == ['flights']
+
+    def test_rescheduled_and_deleted_records(self, tmp_path):
+        manager = make_manager(str(tmp_path / "data.json"))
+        manager.pop_due_transitions(datetime.now())
+
+        manager.update_flight("FL002", "JET001", "JFK", "LAX", "2021-06-01 09:00", "2021-06-01 17:00",
+                              [], ["CREW001"], "Scheduled")
+        manager.schedule_flight("", "JET001", "LAX", "SFO", "2021-07-01 09:00", "2021-07-01 10:00", [], ["CREW001"])
+        manager.delete_flight("FL003")
+        assert [record.flight_id for _, record in manager.pop_due_transitions(datetime.now())] == ["FL002"]
+
+    def test_changes_from_other_workers_are_scheduled(self, tmp_path):
+        worker_a = make_manager(str(tmp_path / "data.json"), JournaledStorage)
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        worker_b.pop_due_transitions(datetime.now())
+
+        worker_a.flights["FL002"].departure_time = "2021-06-01 09:00"
+        worker_a.mark_changed('flights', "FL002")
+        worker_a.save_data()
+
+        assert worker_b.refresh_if_changed() is True
+        assert [record.flight_id for _, record in worker_b.pop_due_transitions(datetime.now())] == ["FL002"]
+
+    def test_full_reload_only_reschedules_changed_records(self, tmp_path):
+        worker_a = make_manager(str(tmp_path / "data.json"))
+        worker_b = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+        assert len(worker_b.pop_due_transitions(datetime.now())) == 2
+
+        # Any save by another worker makes JSON storage reload everything
+        worker_a.customers["CUST001"].phone = "555-0199"
+        worker_a.save_data()
+        assert worker_b.refresh_if_changed() is True
+        assert worker_b.pop_due_transitions(datetime.now()) == []
+
+        worker_a.flights["FL001"].status = "Cancelled"
+        worker_a.mark_changed('flights', "FL001")
+        worker_a.save_data()
+        assert worker_b.refresh_if_changed() is True
+        assert [record.flight_id for _, record in worker_b.pop_due_transitions(datetime.now())] == ["FL001"]
+
+
+@pytest.mark.benchmark
+class TestTransitionQueueBenchmark:
+    """Status update tick over 100k flights: full rescan (before) against the transition queue (after)"""
+
+    def test_tick_cost(self, tmp_path, capsys):
+        manager = make_manager(str(tmp_path / "data.json"))
+        for i in range(100_000):
+            year = 2015 + i % 10 if i % 2 else 2090 + i % 10  # Half long past, half far future
+            flight_id = f"F{i:06d}"
+            manager.flights[flight_id] = Flight(flight_id, "JET001", "LAX", "JFK", f"{year}-06-01 09:00",
+                                                f"{year}-06-01 17:00", [], ["CREW001"], "Completed" if i % 2 else "Scheduled")
+        updater = StatusUpdater(manager)
+        updater.update_all_statuses()  # First tick builds the queue and settles past records
+
+        timings = {}
+        for label, full_scan in [('before', True), ('after', False)]:
+            start = time.perf_counter()
+            result = updater.update_all_statuses(full_scan=full_scan)
+            timings[label] = time.perf_counter() - start
+            assert result['flights_updated'] == 0
+
+        with capsys.disabled():
+            print(f"\nStatus tick over 100k flights: full scan {timings['before'] * 1000:.0f} ms, "
+                  f"transition queue {timings['after'] * 1000:.2f} ms")
+        assert timings['after'] * 100 < timings['before']
+
+
+class TestStatusScheduler:
+    def test_run_saves_through_its_own_manager(self, tmp_path):
+        data_file = str(tmp_path / "data.json")
+        request_manager = make_manager(data_file)
+        scheduler = make_scheduler(tmp_path, data_file)
+
+        result = scheduler.run_once()
+        assert result['flights_updated'] == 1
+        assert scheduler.updater.manager is not request_manager
+        # The request-side manager still shows the old status until it syncs
+        assert request_manager.get_flight("FL001").status == "Scheduled"
+        assert request_manager.refresh_if_changed() is True
+        assert request_manager.get_flight("FL001").status == "Completed"
+        scheduler.stop()
+
+    def test_only_the_leader_runs(self, tmp_path):
+        data_file = str(tmp_path / "data.json")
+        make_manager(data_file)
+        leader = make_scheduler(tmp_path, data_file)
+        follower = make_scheduler(tmp_path, data_file)
+
+        assert leader.run_once() is not None
+        assert follower.run_once() is None
+        assert leader.is_leader and not follower.is_leader
+
+        # The follower takes over once the leader goes away
+        leader.stop()
+        assert follower.run_once() is not None
+        follower.stop()
+
+    def test_only_the_leader_builds_a_manager(self, tmp_path):
+        data_file = str(tmp_path / "data.json")
+        make_manager(data_file)
+        built = []
+
+        def factory():
+            built.append(JetScheduleManager(storage=JsonFileStorage(data_file)))
+            return built[-1]
+        leader = make_scheduler(tmp_path, data_file)
+        follower = StatusScheduler(factory, lock_file=str(tmp_path / "scheduler.lock"))
+        assert built == []  # Nothing until a run holds the lock
+
+        leader.run_once()
+        follower.run_once()
+        follower.run_once()
+        assert built == [] and follower.updater is None
+
+        leader.stop()
+        assert leader.updater is None  # Released with the lock
+        follower.run_once()
+        follower.run_once()
+        assert len(built) == 1
+        follower.stop()
+
+    def test_run_metrics_are_shared(self, tmp_path):
+        data_file = str(tmp_path / "data.json")
+        make_manager(data_file)
+        leader = make_scheduler(tmp_path, data_file)
+        follower = make_scheduler(tmp_path, data_file)
+        leader.run_once()
+        leader.run_once()
+
+        status = follower.status()
+        assert status['runs'] == 2
+        assert status['failures'] == 0
+        assert status['is_leader'] is False
+        assert status['last_result']['flights_updated'] == 0
+        assert status['max_duration_ms'] >= status['last_duration_ms'] > 0
+        leader.stop()
+
+    def test_failed_run_is_counted(self, tmp_path):
+        def broken_factory():
+            raise RuntimeError("storage unavailable")
+        scheduler = StatusScheduler(broken_factory, lock_file=str(tmp_path / "scheduler.lock"))
+
+        with pytest.raises(RuntimeError):
+            scheduler.run_once()
+        assert scheduler.metrics.snapshot()['failures'] == 1
+        assert scheduler.status()['last_error'] == "storage unavailable"
+        scheduler.stop()
+
+    def test_background_thread_runs_immediately(self, tmp_path):
+        data_file = str(tmp_path / "data.json")
+        make_manager(data_file)
+        scheduler = make_scheduler(tmp_path, data_file, interval_minutes=60)
+        scheduler.start()
+        scheduler.start()  # Idempotent - still one thread
+
+        deadline = time.time() + 5
+        while scheduler.metrics.snapshot()['runs'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        scheduler.stop(timeout=5)
+
+        assert scheduler.metrics.snapshot()['runs'] == 1
+        assert JetScheduleManager(storage=JsonFileStorage(data_file)).get_flight("FL001").status == "Completed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,228 @@
+"""
+Unit tests for storage backends
+Run with: pytest test_storage.py -v
+"""
+
+import json
+import os
+import pytest
+from jet_manager import JetScheduleManager
+from storage import JsonFileStorage, JournaledStorage, CollectionFileStorage
+
+
+def make_manager(storage):
+    manager = JetScheduleManager(storage=storage)
+    manager.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+    manager.add_jet("", "Gulfstream G650", "N650GS", 12, "CUST001")
+    manager.add_crew("", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1")
+    manager.add_passenger("", "Jane Doe", "X1234567", "USA", "2030-01-01", "555-0102", "CUST001")
+    manager.schedule_flight("", "JET001", "LAX", "JFK", "2025-06-01 09:00", "2025-06-01 17:00",
+                            ["P001"], ["CREW001"])
+    manager.save_data()
+    return manager
+
+
+class TestJsonFileStorage:
+    def test_round_trip(self, tmp_path):
+        storage = JsonFileStorage(str(tmp_path / "data.json"))
+        make_manager(storage)
+
+        reloaded = JetScheduleManager(storage=storage)
+        assert reloaded.get_flight("FL001").destination == "JFK"
+        assert reloaded.get_jet("JET001").customer_ids == ["CUST001"]
+
+    def test_missing_file_loads_nothing(self, tmp_path):
+        storage = JsonFileStorage(str(tmp_path / "missing.json"))
+        assert storage.load() is None
+
+
+class TestJournaledStorage:
+    def test_save_appends_only_changes(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        snapshot_before = open(storage.data_file).read()
+
+        manager.update_flight_status("FL001", "In Progress")
+        manager.save_data()
+
+        # Snapshot untouched, the flight and its jet were journaled
+        assert open(storage.data_file).read() == snapshot_before
+        with open(storage.log_file) as f:
+            records = [json.loads(line) for line in f]
+        assert [(r['c'], r['id']) for r in records] == [('flights', 'FL001'), ('jets', 'JET001')]
+
+    def test_reload_replays_log(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        manager.update_flight_status("FL001", "In Progress")
+        manager.delete_passenger("P001")  # Refused - passenger is on a flight
+        manager.add_passenger("", "Temp", "Y7654321", "USA", "2030-01-01", "555-0103")
+        manager.delete_passenger("P002")
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=storage)
+        assert reloaded.get_flight("FL001").status == "In Progress"
+        assert reloaded.get_jet("JET001").status == "In Flight"
+        assert reloaded.get_passenger("P001") is not None
+        assert reloaded.get_passenger("P002") is None
+
+    def test_mark_changed_journals_in_place_edits(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        manager.get_passenger("P001").customer_id = ""
+        manager.mark_changed('passengers', "P001")
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=storage)
+        assert reloaded.get_passenger("P001").customer_id == ""
+
+    def test_mark_changed_rejects_unknown_collection(self, tmp_path):
+        manager = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        with pytest.raises(ValueError):
+            manager.mark_changed('aircraft', "JET001")
+
+    def test_compaction_folds_log_into_snapshot(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"), compact_bytes=1)
+        manager = make_manager(storage)
+        manager.update_flight_status("FL001", "Completed")
+        manager.save_data()
+
+        assert not os.path.exists(storage.log_file)
+        with open(storage.data_file) as f:
+            assert json.load(f)['flights']['FL001']['status'] == "Completed"
+
+    def test_torn_last_record_is_ignored(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        manager.update_flight_status("FL001", "Cancelled")
+        manager.save_data()
+        with open(storage.log_file, 'a') as f:
+            f.write('{"op":"put","c":"flights","id":"FL0')
+
+        reloaded = JetScheduleManager(storage=storage)
+        assert reloaded.get_flight("FL001").status == "Cancelled"
+
+
+class TestCollectionFileStorage:
+    def test_one_file_per_collection(self, tmp_path):
+        storage = CollectionFileStorage(str(tmp_path / "data"), legacy_file=None)
+        make_manager(storage)
+
+        for name in ['customers', 'jets', 'crew', 'passengers', 'flights']:
+            assert os.path.exists(storage.collection_file(name))
+        with open(storage.collection_file('flights')) as f:
+            assert json.load(f)['FL001']['destination'] == "JFK"
+
+    def test_only_dirty_collections_are_written(self, tmp_path):
+        storage = CollectionFileStorage(str(tmp_path / "data"), legacy_file=None)
+        manager = make_manager(storage)
+        passengers_mtime = os.stat(storage.collection_file('passengers')).st_mtime_ns
+        flights_before = open(storage.collection_file('flights')).read()
+
+        manager.get_flight("FL001").status = "Cancelled"
+        manager.mark_changed('flights', "FL001")
+        manager.save_data()
+
+        assert os.stat(storage.collection_file('passengers')).st_mtime_ns == passengers_mtime
+        assert open(storage.collection_file('flights')).read() != flights_before
+
+    def test_imports_legacy_file(self, tmp_path):
+        legacy = JsonFileStorage(str(tmp_path / "legacy.json"))
+        make_manager(legacy)
+
+        storage = CollectionFileStorage(str(tmp_path / "data"), legacy_file=legacy.data_file)
+        manager = JetScheduleManager(storage=storage)
+        assert manager.get_flight("FL001") is not None
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=CollectionFileStorage(storage.data_dir, legacy_file=None))
+        assert reloaded.get_passenger("P001").name == "Jane Doe"
+
+
+BACKENDS = {
+    'json': lambda tmp_path: JsonFileStorage(str(tmp_path / "data.json")),
+    'journal': lambda tmp_path: JournaledStorage(str(tmp_path / "data.json")),
+    'collections': lambda tmp_path: CollectionFileStorage(str(tmp_path / "data"), legacy_file=None),
+}
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+class TestMultiProcessSafety:
+    """Two managers with separate storage objects on the same files stand in for two gunicorn workers"""
+
+    def test_concurrent_saves_do_not_overwrite(self, tmp_path, backend):
+        worker_a = make_manager(BACKENDS[backend](tmp_path))
+        worker_b = JetScheduleManager(storage=BACKENDS[backend](tmp_path))
+
+        worker_a.add_passenger("PA1", "From A", "A1234567", "USA", "2030-01-01", "555-0201")
+        worker_a.save_data()
+        worker_b.add_passenger("PB1", "From B", "B1234567", "USA", "2030-01-01", "555-0202")
+        worker_b.update_flight_status("FL001", "Cancelled")
+        worker_b.save_data()
+
+        reloaded = JetScheduleManager(storage=BACKENDS[backend](tmp_path))
+        assert reloaded.get_passenger("PA1") is not None
+        assert reloaded.get_passenger("PB1") is not None
+        assert reloaded.get_flight("FL001").status == "Cancelled"
+
+    def test_refresh_only_when_another_worker_saved(self, tmp_path, backend):
+        worker_a = make_manager(BACKENDS[backend](tmp_path))
+        worker_b = JetScheduleManager(storage=BACKENDS[backend](tmp_path))
+        assert worker_b.refresh_if_changed() is False
+
+        worker_a.update_flight_status("FL001", "In Progress")
+        worker_a.save_data()
+
+        assert worker_b.refresh_if_changed() is True
+        assert worker_b.get_flight("FL001").status == "In Progress"
+        assert worker_b.refresh_if_changed() is False
+        assert worker_a.refresh_if_changed() is False
+
+    def test_no_temp_files_left_behind(self, tmp_path, backend):
+        make_manager(BACKENDS[backend](tmp_path))
+        leftovers = [p for p in tmp_path.rglob("*") if p.name.endswith(".tmp")]
+        assert leftovers == []
+
+
+class TestIncrementalRefresh:
+    def test_journal_refresh_reads_only_new_records(self, tmp_path, monkeypatch):
+        worker_a = make_manager(JournaledStorage(str(tmp_path / "data.json")))
+        worker_b = JetScheduleManager(storage=JournaledStorage(str(tmp_path / "data.json")))
+        worker_a.update_flight_status("FL001", "In Progress")
+        worker_a.save_data()
+
+        def full_load():
+            raise AssertionError("refresh should not reload the snapshot")
+        monkeypatch.setattr(worker_b.storage, 'load', full_load)
+
+        assert worker_b.refresh_if_changed() is True
+        assert worker_b.get_jet("JET001").status == "In Flight"
+
+    def test_collections_refresh_reloads_changed_files_only(self, tmp_path):
+        worker_a = make_manager(CollectionFileStorage(str(tmp_path / "data"), legacy_file=None))
+        worker_b = JetScheduleManager(storage=CollectionFileStorage(str(tmp_path / "data"), legacy_file=None))
+        passengers_before = worker_b.passengers
+        worker_a.get_flight("FL001").status = "Completed"
+        worker_a.mark_changed('flights', "FL001")
+        worker_a.save_data()
+
+        assert worker_b.refresh_if_changed() is True
+        assert worker_b.get_flight("FL001").status == "Completed"
+        assert worker_b.passengers is passengers_before
+
+    def test_journal_append_after_torn_record(self, tmp_path):
+        storage = JournaledStorage(str(tmp_path / "data.json"))
+        manager = make_manager(storage)
+        manager.update_flight_status("FL001", "In Progress")
+        manager.save_data()
+        with open(storage.log_file, 'a') as f:
+            f.write('{"op":"put","c":"flights"')
+        manager.update_flight_status("FL001", "Completed")
+        manager.save_data()
+
+        reloaded = JetScheduleManager(storage=JournaledStorage(storage.data_file))
+        assert reloaded.get_flight("FL001").status == "Completed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
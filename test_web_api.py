@@ -0,0 +1,216 @@
+"""
+Route-level tests for the mobile JSON API
+Run with: pytest test_web_api.py -v
+"""
+
+import base64
+import json
+import os
+
+import pytest
+
+os.environ.setdefault('STATUS_SCHEDULER', 'off')
+import web_app  # noqa: E402
+from dashboard import DashboardSummary  # noqa: E402
+from events import ChangePublisher, EventHub  # noqa: E402
+from jet_manager import JetScheduleManager  # noqa: E402
+from storage import JsonFileStorage  # noqa: E402
+from web_app import app, manager  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    client = app.test_client()
+    admin = next(user for user in manager.users.values() if user.role == 'admin')
+    with client.session_transaction() as session:
+        session['user_id'] = admin.user_id
+    return client
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    """A manager over a scratch data file in place of the app's, with an admin and a CUST001 user"""
+    scratch = JetScheduleManager(storage=JsonFileStorage(str(tmp_path / "data.json")))
+    scratch.add_customer("", "John Smith", "Smith Enterprises", "john@example.com", "555-0100", "1 Main St")
+    scratch.add_customer("", "Ann Lee", "Lee Aviation", "ann@example.com", "555-0200", "2 Main St")
+    scratch.add_jet("", "Gulfstream G650", "N650GS", 12, "CUST001")
+    scratch.add_jet("", "Citation X", "N750CX", 8, "CUST002")
+    scratch.add_crew("", "Mike Anderson", "Pilot", "P1234567", "USA", "2030-01-01", "555-0101", "LIC-1")
+    scratch.add_passenger("", "Jane Doe", "X1234567", "USA", "2030-01-01", "555-0102", "CUST001")
+    scratch.schedule_flight("", "JET001", "LAX", "JFK", "2099-06-01 09:00", "2099-06-01 17:00", [], ["CREW001"])
+    scratch.schedule_flight("", "JET002", "JFK", "LAX", "2099-06-02 09:00", "2099-06-02 17:00", [], ["CREW001"])
+    scratch.add_user("USER001", "admin", "unused", "admin")
+    scratch.add_user("USER002", "john", "unused", "customer", "CUST001")
+    scratch.save_data()
+    monkeypatch.setattr(web_app, 'manager', scratch)
+    monkeypatch.setattr(web_app, 'dashboard_summary', DashboardSummary(scratch))
+    web_app.limiter.reset()
+    return scratch
+
+
+def login(user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    return client
+
+
+def cursor(*token):
+    return base64.urlsafe_b64encode(json.dumps(list(token)).encode()).decode().rstrip('=')
+
+
+class TestApiList:
+    def test_updated_since_with_utc_offset(self, client):
+        response = client.get('/api/jets?updated_since=2030-01-01T00:00:00Z')
+        assert response.status_code == 200
+        assert response.get_json() == []
+
+        response = client.get('/api/jets?updated_since=2000-01-01T00:00:00%2B00:00')
+        assert response.status_code == 200
+        assert len(response.get_json()) == len(manager.jets)
+
+    def test_cursor_with_a_value_of_the_wrong_type(self, client):
+        response = client.get(f"/api/jets?cursor={cursor('jets', 'jet_id', 0, 'v', 5, 'JET001')}")
+        assert response.status_code == 400
+        assert 'Invalid cursor' in response.get_json()['error']
+
+    def test_malformed_arguments(self, client):
+        assert client.get('/api/jets?cursor=nonsense').status_code == 400
+        assert client.get('/api/jets?updated_since=yesterday').status_code == 400
+
+
+class TestApiStats:
+    def test_requires_login(self, scratch):
+        response = app.test_client().get('/api/stats')
+        assert response.status_code == 302
+        assert '/login' in response.headers['Location']
+
+    def test_admin_stats_revalidate(self, scratch):
+        client = login("USER001")
+        response = client.get('/api/stats')
+        assert response.status_code == 200
+        stats = response.get_json()
+        assert stats['total_flights'] == 2
+        assert sorted(stats['customers']) == ["CUST001", "CUST002"]
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        response = client.get('/api/stats', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        scratch.update_flight_status("FL001", "In Progress")
+        response = client.get('/api/stats', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_customers_get_their_own_scope(self, scratch):
+        stats = login("USER002").get('/api/stats').get_json()
+        assert (stats['total_jets'], stats['total_flights'], stats['total_passengers']) == (1, 1, 1)
+        assert 'customers' not in stats
+
+    def test_rate_limited(self, scratch):
+        client = login("USER002")
+        assert all(client.get('/api/stats').status_code == 200 for _ in range(60))
+        assert client.get('/api/stats').status_code == 429
+
+
+class TestApiSync:
+    def test_since_is_parsed(self, scratch):
+        client = login("USER001")
+        seq = scratch.change_sequence()
+        assert client.get('/api/sync').get_json() == {'seq': seq, 'reset': True, 'changes': []}
+        assert client.get('/api/sync?since=yesterday').status_code == 400
+        assert client.get(f'/api/sync?since={seq + 100}').get_json()['reset'] is True  # From the future
+
+        body = client.get(f'/api/sync?since={seq}').get_json()
+        assert body == {'seq': seq, 'reset': False, 'changes': []}
+        body = client.get('/api/sync?since=0').get_json()
+        assert body['reset'] is False
+        assert {(entry['collection'], entry['id']) for entry in body['changes']} >= {('flights', "FL001"),
+                                                                                     ('jets', "JET002")}
+
+    def test_hidden_records_become_tombstones(self, scratch):
+        client = login("USER002")
+        seq = scratch.change_sequence()
+        scratch.get_flight("FL001").jet_id = "JET002"  # Moved to another customer's jet
+        scratch.mark_changed('flights', "FL001")
+        scratch.get_jet("JET002").status = "Maintenance"
+        scratch.mark_changed('jets', "JET002")
+        scratch.get_passenger("P001").contact = "555-0199"
+        scratch.mark_changed('passengers', "P001")
+        scratch.save_data()
+
+        body = client.get(f'/api/sync?since={seq}').get_json()
+        assert body['seq'] == scratch.change_sequence()
+        entries = {(entry['collection'], entry['id']): entry for entry in body['changes']}
+        assert entries[('flights', "FL001")]['deleted'] is True
+        assert 'record' not in entries[('flights', "FL001")]
+        assert entries[('passengers', "P001")]['record']['contact'] == "555-0199"
+        # Every listed entry is numbered within the returned range
+        assert all(seq < entry['seq'] <= body['seq'] for entry in body['changes'])
+
+
+class TestApiEvents:
+    def test_saves_publish_nothing_while_streams_are_off(self, client):
+        assert not web_app.LIVE_EVENTS
+        assert web_app.change_publisher is None
+        assert not any(isinstance(getattr(listener, '__self__', None), ChangePublisher)
+                       for listener in manager._save_listeners)
+        assert client.get('/api/events').status_code == 204
+
+    @pytest.fixture
+    def live(self, scratch, monkeypatch):
+        hub = EventHub()
+        monkeypatch.setattr(web_app, 'LIVE_EVENTS', True)
+        monkeypatch.setattr(web_app, 'event_hub', hub)
+        monkeypatch.setattr(web_app, 'change_publisher', ChangePublisher(scratch, hub))
+        monkeypatch.setattr(web_app, 'EVENT_STREAM_SECONDS', 0)  # End streams after the catch-up
+        return scratch
+
+    def test_last_event_id_catches_up(self, live):
+        seq = live.change_sequence()
+        live.update_flight_status("FL001", "Cancelled")
+        live.update_flight_status("FL002", "Cancelled")
+        live.save_data()
+
+        response = login("USER002").get('/api/events', headers={'Last-Event-ID': str(seq)})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = [json.loads(line[len('data: '):]) for line in response.get_data(as_text=True).splitlines()
+                  if line.startswith('data: {"')]
+        # Customers get every jet event but only their own jets' flights
+        flights = [event for event in events if event['collection'] == 'flights']
+        assert [event['id'] for event in flights] == ["FL001"]
+        assert flights[0]['status'] == "Cancelled" and flights[0]['seq'] > seq
+        assert {event['id'] for event in events if event['collection'] == 'jets'} == {"JET001", "JET002"}
+
+    def test_unknown_last_event_id_resets(self, live):
+        for last_id in ['nonsense', str(live.change_sequence() + 100)]:
+            body = login("USER001").get('/api/events', headers={'Last-Event-ID': last_id}).get_data(as_text=True)
+            assert f"id: {live.change_sequence()}\nevent: reset\n" in body
+
+
+class TestApiNearbyAirports:
+    def test_nearest_and_within_radius(self):
+        client = app.test_client()
+        results = client.get('/api/airports/nearby?lat=33.9425&lon=-118.408&limit=3').get_json()['results']
+        assert [airport['code'] for airport in results] == ["LAX", "BUR", "SNA"]
+        assert results[0]['distance_miles'] < results[1]['distance_miles'] < results[2]['distance_miles']
+
+        results = client.get('/api/airports/nearby?code=lax&radius=30').get_json()['results']
+        assert [airport['code'] for airport in results] == ["BUR"]  # The airport itself is left out
+        assert client.get('/api/airports/nearby?code=NOPE&radius=30').status_code == 404
+
+    @pytest.mark.parametrize('query', [
+        'lat=abc&lon=0', 'lat=10', 'lat=91&lon=0', 'lat=0&lon=-181', 'lat=nan&lon=0',
+        'code=LAX', 'code=LAX&radius=far', 'code=LAX&radius=-5', 'lat=0&lon=0&limit=ten',
+    ])
+    def test_invalid_arguments(self, query):
+        response = app.test_client().get(f'/api/airports/nearby?{query}')
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,17 +3,24 @@ Flask Web Application for Private Jet Schedule Management System
 Simple, lightweight web interface that works with existing code
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, session, send_file, g
 from jet_manager import JetScheduleManager
 from functools import wraps
 from datetime import datetime, timedelta
+import json
 import os
+import time
 import bcrypt
 from dotenv import load_dotenv
-from status_updater import create_scheduled_task
+from status_updater import StatusUpdater, create_scheduled_task
 from pdf_generator import pdf_generator
 from authlib.integrations.flask_client import OAuth
 from airport_utils import airport_db
+from dashboard import DashboardSummary
+from events import ChangePublisher, EventHub, FileEventChannel
+from date_utils import parse_datetime
+from list_query import DATE_FIELDS, FILTER_FIELDS, ID_FIELDS, SORT_FIELDS, ListQuery, decode_cursor, encode_cursor
+from db_config import pool_status
 from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -66,8 +73,41 @@ apple = oauth.register(
 # Initialize manager
 manager = JetScheduleManager()
 
-# Initialize automatic status updater (runs every 5 minutes)
-status_updater = create_scheduled_task(manager, interval_minutes=5)
+# Dashboard counts and activity lists, maintained incrementally from manager changes
+dashboard_summary = DashboardSummary(manager)
+
+# Sorted orderings behind the paginated list pages
+list_query = ListQuery(manager)
+
+# Each open event stream holds a worker thread, so streams are off unless gunicorn runs an async
+# worker class (or enough --threads for every open calendar page) - see README
+LIVE_EVENTS = os.environ.get('LIVE_EVENTS', 'off').lower() == 'on'
+
+# Live change events for /api/events, passed between workers through a file next to the data.
+# Saves only publish them while streams are on - nothing reads the file otherwise
+event_hub = EventHub(FileEventChannel(os.environ.get('EVENTS_FILE', f"{manager.data_file}.events")))
+change_publisher = ChangePublisher(manager, event_hub) if LIVE_EVENTS else None
+
+# Status updates for admin actions on this worker's data
+status_updater = StatusUpdater(manager)
+
+def create_scheduler_manager():
+    """
+    The status scheduler's own manager, publishing its status changes like request handlers do
+
+    Only called in the worker holding the scheduler's leader lock, on its first run there.
+    """
+    scheduler_manager = JetScheduleManager(manager.data_file)
+    if LIVE_EVENTS:
+        ChangePublisher(scheduler_manager, event_hub)
+    return scheduler_manager
+
+# Automatic status updates on a background thread of one leader worker (every 5 minutes by default)
+status_scheduler = create_scheduled_task(
+    create_scheduler_manager,
+    interval_minutes=float(os.environ.get('STATUS_UPDATE_INTERVAL_MINUTES', 5)),
+    lock_file=f"{manager.data_file}.scheduler.lock"
+)
 
 # ====================
 # CONTEXT PROCESSORS
@@ -80,7 +120,7 @@ def inject_pending_approvals_count():
         if 'user_id' not in session:
             return 0
 
-        user = manager.get_user(session['user_id'])
+        user = get_current_user()
         if not user or user.role != 'crew':
             return 0
 
@@ -88,11 +128,20 @@ def inject_pending_approvals_count():
         if not crew_member or crew_member.crew_type != 'Pilot':
             return 0
 
-        pending = manager.get_pending_approvals(crew_member.crew_id)
-        return len(pending)
+        return manager.get_pending_approvals_count(crew_member.crew_id)
 
     return dict(pending_approvals_count=get_pending_approvals_count)
 
+@app.context_processor
+def inject_page_url():
+    """Links to other pages of the current list view that keep its filters and sort"""
+    def page_url(page):
+        args = request.args.to_dict(flat=False)
+        args['page'] = page
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    return dict(page_url=page_url)
+
 # ====================
 # AUTH HELPERS
 # ====================
@@ -132,7 +181,7 @@ def role_required(*roles):
                 flash('Please log in to access this page', 'error')
                 return redirect(url_for('login'))
 
-            user = manager.get_user(session['user_id'])
+            user = get_current_user()
             if not user or user.role not in roles:
                 flash('You do not have permission to access this page', 'error')
                 return redirect(url_for('index'))
@@ -141,10 +190,13 @@ def role_required(*roles):
     return decorator
 
 def get_current_user():
-    """Get currently logged in user"""
-    if 'user_id' in session:
-        return manager.get_user(session['user_id'])
-    return None
+    """Get currently logged in user (looked up once per request)"""
+    if 'user_id' not in session:
+        return None
+    if g.get('current_user_id') != session['user_id']:
+        g.current_user = manager.get_user(session['user_id'])
+        g.current_user_id = session['user_id']
+    return g.current_user
 
 def filter_by_customer(items, customer_field='customer_id'):
     """Filter items by customer for customer role users - supports shared jets"""
@@ -172,16 +224,77 @@ def filter_by_customer(items, customer_field='customer_id'):
         return list(items)
     return []
 
+# Records per list page (overridable with ?per_page=, up to MAX_PER_PAGE)
+LIST_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+# Fixed choices offered by the list page filters (other filter fields take free text or record IDs)
+LIST_FILTER_CHOICES = {
+    ('flights', 'status'): ['Scheduled', 'In Progress', 'Completed', 'Cancelled'],
+    ('flights', 'approval_status'): ['Pending', 'Approved', 'Rejected'],
+    ('jets', 'status'): ['Available', 'In Flight', 'Maintenance'],
+    ('crew', 'crew_type'): ['Pilot', 'Cabin Crew'],
+    ('maintenance', 'status'): ['Scheduled', 'In Progress', 'Completed'],
+}
+
+def list_page(collection, scope=None):
+    """
+    One page of a list view, from the request's page, per_page, sort, order,
+    filter field and date_from/date_to arguments
+
+    scope maps filter fields to the only values this user may see; requested
+    values for those fields are narrowed to them.
+    """
+    args = request.args
+    filters = {field: args.getlist(field) for field in FILTER_FIELDS[collection] if args.get(field)}
+    for field, allowed in (scope or {}).items():
+        filters[field] = [v for v in filters[field] if v in allowed] if field in filters else list(allowed)
+
+    return list_query.page(
+        collection, filters,
+        date_from=parse_datetime(args.get('date_from', '')),
+        date_to=parse_datetime(args.get('date_to', '')),
+        sort=args.get('sort'),
+        descending=args.get('order') == 'desc',
+        page=args.get('page', 1, type=int),
+        per_page=min(max(args.get('per_page', LIST_PER_PAGE, type=int), 1), MAX_PER_PAGE),
+    )
+
+def list_controls(collection, options=None, exclude=()):
+    """Filter and sort controls for templates/list_filters.html (options: field -> [(value, label)])"""
+    filters = []
+    for field in FILTER_FIELDS[collection]:
+        if field in exclude:
+            continue
+        choices = (options or {}).get(field, LIST_FILTER_CHOICES.get((collection, field)))
+        filters.append((field, [(c, c) if isinstance(c, str) else c for c in choices] if choices else None))
+    return {'filters': filters, 'sorts': list(SORT_FIELDS[collection]), 'dates': collection in DATE_FIELDS}
+
+def jet_choices(jets):
+    return [(jet.jet_id, f"{jet.jet_id} ({jet.tail_number})") for jet in jets]
+
+def customer_choices():
+    return [(customer.customer_id, customer.name) for customer in manager.customers.values()]
+
+# ====================
+# MULTI-WORKER DATA SYNC
+# ====================
+
+@app.before_request
+def sync_with_other_workers():
+    """Reload data saved by other gunicorn workers (a cheap stat check when nothing changed)"""
+    if request.endpoint and request.endpoint != 'static':
+        manager.refresh_if_changed()
+
 # ====================
 # AUTOMATIC STATUS UPDATES
 # ====================
 
 @app.before_request
-def auto_update_statuses():
-    """Run automatic status updates before each request if interval has passed"""
-    # Skip for static files and login/logout to avoid unnecessary processing
-    if request.endpoint and request.endpoint not in ['static', 'login', 'logout']:
-        status_updater.run_if_needed()
+def start_status_scheduler():
+    """Start this worker's status scheduler thread on its first request (updates never run inline)"""
+    if os.environ.get('STATUS_SCHEDULER', 'on').lower() != 'off':
+        status_scheduler.start()
 
 # ====================
 # AUTH ROUTES
@@ -200,6 +313,7 @@ def login():
             # Upgrade legacy SHA-256 hash to bcrypt on successful login
             if len(user.password_hash) == 64:
                 user.password_hash = hash_password(password)
+                manager.mark_changed('users', user.user_id)
                 manager.save_data()
             session['user_id'] = user.user_id
             session['username'] = user.username
@@ -349,6 +463,53 @@ def register():
 # Note: CSRF is exempt for API routes that use session-based auth
 # In production, consider implementing token-based auth (JWT) for mobile
 
+# Records per API page when ?cursor= is given without ?limit=, and the most one page may hold
+API_PAGE_LIMIT = 100
+API_MAX_LIMIT = 500
+
+def api_list(collection, sort, filters=None):
+    """
+    JSON listing of a collection for the mobile API
+
+    Without limit or cursor arguments this is the whole (filtered) collection
+    as an array, as older clients expect. With them it is one page:
+    {"items": [...], "next_cursor": ..., "as_of": ...}, where next_cursor
+    (null on the last page) is passed back as ?cursor= for the next page.
+    Pages follow sort (then record ID) and stay consistent while records
+    change in between.
+
+    fields=a,b limits each record to those fields (plus its ID), and
+    updated_since=<ISO datetime> to records changed since then - pass the
+    as_of of an earlier response. Deleted records are not reported.
+    """
+    args = request.args
+    paginated = 'limit' in args or 'cursor' in args
+    as_of = datetime.now()
+    try:
+        after = decode_cursor(collection, sort, args['cursor']) if args.get('cursor') else None
+        limit = min(max(int(args.get('limit', API_PAGE_LIMIT)), 1), API_MAX_LIMIT) if paginated else None
+        since = datetime.fromisoformat(args['updated_since']) if args.get('updated_since') else None
+        if since is not None and since.tzinfo is not None:
+            # Records are stamped in naive local time (ISO8601DateFormatter sends UTC with a Z)
+            since = since.astimezone().replace(tzinfo=None)
+        ids = manager.modified_since(collection, since) if since else None
+        # A cursor of the right shape may still hold values of the wrong type for its sort
+        records, last = list_query.keyset(collection, sort, after=after, limit=limit, filters=filters, ids=ids)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    items = [record.to_dict() for record in records]
+    if args.get('fields'):
+        fields = {ID_FIELDS[collection], *args['fields'].split(',')}
+        items = [{key: value for key, value in item.items() if key in fields} for item in items]
+    if not paginated:
+        return jsonify(items)
+    return jsonify({
+        'items': items,
+        'next_cursor': encode_cursor(collection, sort, last) if last else None,
+        'as_of': as_of.isoformat(),
+    })
+
 @app.route('/api/current-user')
 @login_required
 @limiter.limit("60 per minute")
@@ -370,16 +531,15 @@ def api_current_user():
 @login_required
 @limiter.limit("60 per minute")
 def api_flights():
-    """Get all flights for current user (mobile)"""
+    """Get flights for current user by departure time (mobile; see api_list for paging)"""
     user = get_current_user()
 
     if user.role == 'customer':
-        customer_jets = [j.jet_id for j in manager.jets.values() if user.related_id in j.customer_ids]
-        flights = [f for f in manager.flights.values() if f.jet_id in customer_jets]
+        filters = {'jet_id': [jet.jet_id for jet in manager.get_shared_jets(user.related_id)]}
     else:
-        flights = list(manager.flights.values())
+        filters = None
 
-    return jsonify([f.to_dict() for f in flights])
+    return api_list('flights', 'departure_time', filters)
 
 @app.route('/api/flights/schedule', methods=['POST'])
 @login_required
@@ -431,36 +591,149 @@ def api_pending_approvals():
 @app.route('/api/jets')
 @login_required
 def api_jets():
-    """Get all jets (mobile)"""
+    """Get all jets (mobile; see api_list for paging)"""
+    # Customers can see all jets for booking
+    return api_list('jets', 'jet_id')
+
+@app.route('/api/passengers')
+@login_required
+def api_passengers():
+    """Get all passengers (mobile; see api_list for paging)"""
     user = get_current_user()
 
     if user.role == 'customer':
-        # Customers can see all jets for booking
-        jets = list(manager.jets.values())
+        filters = {'customer_id': [user.related_id]}
     else:
-        jets = list(manager.jets.values())
+        filters = None
 
-    return jsonify([j.to_dict() for j in jets])
+    return api_list('passengers', 'passenger_id', filters)
 
-@app.route('/api/passengers')
+@app.route('/api/crew')
 @login_required
-def api_passengers():
-    """Get all passengers (mobile)"""
+def api_crew():
+    """Get all crew members (mobile; see api_list for paging)"""
+    return api_list('crew', 'crew_id')
+
+# Collections the mobile app keeps in sync through /api/sync
+SYNC_COLLECTIONS = ('flights', 'jets', 'passengers', 'crew')
+
+@app.route('/api/sync')
+@login_required
+@limiter.limit("60 per minute")
+def api_sync():
+    """
+    Records changed since an earlier sync (mobile)
+
+    ?since=<seq> takes the seq of the previous response and returns
+    {"seq": ..., "reset": false, "changes": [...]}: one entry per record
+    created or updated ({"collection", "id", "seq", "record"}) or deleted or
+    no longer visible to the user ({"collection", "id", "seq", "deleted": true}).
+    Without since, or when the server no longer has every change since then,
+    "reset" is true and the client refetches the collections, then syncs
+    from the returned seq.
+    """
     user = get_current_user()
+    if 'since' not in request.args:
+        return jsonify({'seq': manager.change_sequence(), 'reset': True, 'changes': []})
+    try:
+        since = int(request.args['since'])
+    except ValueError:
+        return jsonify({'error': 'since must be a change sequence number'}), 400
+
+    feed = manager.changes_since(since)
+    if feed is None:
+        return jsonify({'seq': manager.change_sequence(), 'reset': True, 'changes': []})
+    seq, changes = feed
 
     if user.role == 'customer':
-        passengers = [p for p in manager.passengers.values() if p.customer_id == user.related_id]
+        shared_jets = {jet.jet_id for jet in manager.get_shared_jets(user.related_id)}
+        visible = {
+            'flights': lambda flight: flight.jet_id in shared_jets,
+            'passengers': lambda passenger: passenger.customer_id == user.related_id,
+        }
+        # A jet changing owners shows or hides all of its flights
+        changed_jets = [(change_seq, record_id) for change_seq, collection, record_id in changes if collection == 'jets']
+        listed = {(collection, record_id) for _, collection, record_id in changes}
+        for change_seq, jet_id in changed_jets:
+            changes.extend((change_seq, 'flights', flight.flight_id) for flight in manager.get_jet_flights(jet_id)
+                           if ('flights', flight.flight_id) not in listed)
     else:
-        passengers = list(manager.passengers.values())
+        visible = {}
 
-    return jsonify([p.to_dict() for p in passengers])
+    entries = []
+    for change_seq, collection, record_id in changes:
+        if collection not in SYNC_COLLECTIONS:
+            continue
+        record = getattr(manager, collection).get(record_id)
+        entry = {'collection': collection, 'id': record_id, 'seq': change_seq}
+        is_visible = visible.get(collection)
+        if record is None or (is_visible and not is_visible(record)):
+            entry['deleted'] = True
+        else:
+            entry['record'] = record.to_dict()
+        entries.append(entry)
+    return jsonify({'seq': seq, 'reset': False, 'changes': entries})
 
-@app.route('/api/crew')
+# Seconds between keep-alive comments on an event stream, and before it ends to free the worker thread
+EVENT_KEEPALIVE_SECONDS = 15
+EVENT_STREAM_SECONDS = 300
+
+def event_filter(user):
+    """Which change events a user's stream gets (customers: all jets, their jets' flights and maintenance)"""
+    if user.role != 'customer':
+        return None
+    customer_id = user.related_id
+    return lambda event: event['collection'] == 'jets' or customer_id in event.get('customer_ids', ())
+
+def format_event(event):
+    return f"id: {event['seq']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+
+@app.route('/api/events')
 @login_required
-def api_crew():
-    """Get all crew members (mobile)"""
-    crew_list = list(manager.crew.values())
-    return jsonify([c.to_dict() for c in crew_list])
+def api_events():
+    """
+    Server-Sent Events stream of flight, jet and maintenance changes
+
+    Each "change" event carries an events.build_event dict, with the change
+    sequence number as its id. A reconnecting client sends Last-Event-ID
+    (EventSource does so itself) and first gets the changes it missed - or
+    a "reset" event when those are no longer known, after which it refetches.
+    Streams end after EVENT_STREAM_SECONDS, or when the client falls too far
+    behind, and EventSource reconnects on its own. With LIVE_EVENTS off this
+    answers 204 No Content, which tells EventSource not to reconnect.
+    """
+    if not LIVE_EVENTS:
+        return Response(status=204)
+    user = get_current_user()
+    accept = event_filter(user)
+    subscription = event_hub.subscribe(accept)  # Before the catch-up, so nothing falls in between
+
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    missed, reset = [], None
+    if last_id:
+        feed = manager.changes_since(int(last_id)) if last_id.isdigit() else None
+        if feed is None:
+            reset = manager.change_sequence()
+        else:
+            events = [change_publisher.build(*change) for change in feed[1]]
+            missed = [event for event in events if event is not None and (accept is None or accept(event))]
+
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            if reset is not None:
+                yield f"id: {reset}\nevent: reset\ndata: {{}}\n\n"
+            for event in missed:
+                yield format_event(event)
+            deadline = time.monotonic() + EVENT_STREAM_SECONDS
+            while time.monotonic() < deadline and not subscription.overflowed:
+                event = subscription.get(EVENT_KEEPALIVE_SECONDS)
+                yield format_event(event) if event else ': keep-alive\n\n'
+        finally:
+            subscription.close()
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 # ====================
 # DASHBOARD & HOME
@@ -472,113 +745,10 @@ def index():
     """Main dashboard with activity feed"""
     user = get_current_user()
 
-    # Filter data based on user role
-    if user.role == 'customer':
-        passengers = filter_by_customer(manager.passengers.values())
-        jets = filter_by_customer(manager.jets.values())
-        flights = [f for f in manager.flights.values() if f.jet_id in [j.jet_id for j in jets]]
-        maintenance = [m for m in manager.maintenance.values() if m.jet_id in [j.jet_id for j in jets]]
-        crew = manager.crew.values()  # Crew visible to all
-    else:
-        passengers = list(manager.passengers.values())
-        jets = list(manager.jets.values())
-        flights = list(manager.flights.values())
-        maintenance = list(manager.maintenance.values())
-        crew = list(manager.crew.values())
-
-    # Calculate date ranges (use date components for comparison to avoid time issues)
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-
-    # Helper function to parse date strings
-    def parse_date(date_str):
-        try:
-            # Handle both 'YYYY-MM-DD HH:MM' and 'YYYY-MM-DDThh:mm' formats
-            date_part = date_str.replace('T', ' ').split()[0]
-            return datetime.strptime(date_part, '%Y-%m-%d')
-        except:
-            return None
-
-    # Active flights (In Progress)
-    active_flights = [f for f in flights if f.status == 'In Progress']
-
-    # Flights this week
-    flights_this_week = []
-    for f in flights:
-        dep_date = parse_date(f.departure_time)
-        if dep_date and week_start <= dep_date <= week_end:
-            flights_this_week.append(f)
-
-    # Upcoming flights (scheduled, next 7 days)
-    upcoming_flights = []
-    next_week = today + timedelta(days=7)
-    for f in flights:
-        if f.status == 'Scheduled':
-            dep_date = parse_date(f.departure_time)
-            if dep_date and today <= dep_date <= next_week:
-                upcoming_flights.append(f)
-
-    # Sort by departure time
-    upcoming_flights.sort(key=lambda f: f.departure_time)
-    flights_this_week.sort(key=lambda f: f.departure_time)
-
-    # Active maintenance
-    active_maintenance = [m for m in maintenance if m.status == 'In Progress']
-
-    # Scheduled maintenance this week
-    maintenance_this_week = []
-    for m in maintenance:
-        if m.status in ['Scheduled', 'In Progress']:
-            maint_date = parse_date(m.scheduled_date)
-            if maint_date and week_start <= maint_date <= week_end:
-                maintenance_this_week.append(m)
-
-    # Sort by scheduled date
-    maintenance_this_week.sort(key=lambda m: m.scheduled_date)
-
-    # Jets by status
-    available_jets = [j for j in jets if j.status == 'Available']
-    in_flight_jets = [j for j in jets if j.status == 'In Flight']
-    maintenance_jets = [j for j in jets if j.status == 'Maintenance']
-
-    # Recent activity (completed flights and maintenance in last 7 days)
-    last_week = today - timedelta(days=7)
-    recent_completed_flights = []
-    for f in flights:
-        if f.status == 'Completed':
-            arr_date = parse_date(f.arrival_time)
-            if arr_date and last_week <= arr_date <= today:
-                recent_completed_flights.append(f)
-
-    recent_completed_flights.sort(key=lambda f: f.arrival_time, reverse=True)
-    recent_completed_flights = recent_completed_flights[:5]  # Last 5
-
-    # Stats summary
-    stats = {
-        'total_passengers': len(passengers),
-        'total_crew': len(crew),
-        'total_jets': len(jets),
-        'total_flights': len(flights),
-        'total_maintenance': len(maintenance),
-        'active_flights': len(active_flights),
-        'available_jets': len(available_jets),
-        'in_flight_jets': len(in_flight_jets),
-        'maintenance_jets': len(maintenance_jets),
-        'user': user
-    }
-
-    # Activity data
-    activity = {
-        'active_flights': active_flights[:10],  # Limit to 10
-        'flights_this_week': flights_this_week[:10],
-        'upcoming_flights': upcoming_flights[:10],
-        'active_maintenance': active_maintenance[:10],
-        'maintenance_this_week': maintenance_this_week[:10],
-        'recent_completed': recent_completed_flights,
-        'week_start': week_start.strftime('%Y-%m-%d'),
-        'week_end': week_end.strftime('%Y-%m-%d'),
-    }
+    # Counts and activity lists are kept up to date by dashboard_summary as records change;
+    # customer users see their own jets (with those jets' flights and maintenance) and passengers
+    stats, activity = dashboard_summary.snapshot(user.related_id if user.role == 'customer' else None)
+    stats['user'] = user
 
     return render_template('dashboard.html', stats=stats, activity=activity, user=user, manager=manager)
 
@@ -589,10 +759,16 @@ def index():
 @app.route('/passengers')
 @login_required
 def passengers():
-    """List all passengers"""
+    """List passengers, a page at a time"""
     user = get_current_user()
-    passenger_list = filter_by_customer(manager.passengers.values())
-    return render_template('passengers.html', passengers=passenger_list, user=user)
+    if user.role == 'customer':
+        pagination = list_page('passengers', {'customer_id': [user.related_id]})
+        controls = list_controls('passengers', exclude=['customer_id'])
+    else:
+        pagination = list_page('passengers')
+        controls = list_controls('passengers', {'customer_id': customer_choices()})
+    return render_template('passengers.html', passengers=pagination.items_on_page, pagination=pagination,
+                           controls=controls, user=user)
 
 @app.route('/passengers/add', methods=['GET', 'POST'])
 @role_required('customer', 'admin')
@@ -679,8 +855,10 @@ def delete_passenger(passenger_id):
 @app.route('/crew')
 @login_required
 def crew():
-    """List all crew members"""
-    return render_template('crew.html', crew=manager.crew.values())
+    """List crew members, a page at a time"""
+    pagination = list_page('crew')
+    return render_template('crew.html', crew=pagination.items_on_page, pagination=pagination,
+                           controls=list_controls('crew'))
 
 @app.route('/crew/add', methods=['GET', 'POST'])
 @login_required
@@ -765,8 +943,10 @@ def delete_crew(crew_id):
 @app.route('/jets')
 @login_required
 def jets():
-    """List all jets"""
-    return render_template('jets.html', jets=manager.jets.values())
+    """List jets, a page at a time"""
+    pagination = list_page('jets')
+    return render_template('jets.html', jets=pagination.items_on_page, pagination=pagination,
+                           controls=list_controls('jets', {'customer_ids': customer_choices()}), manager=manager)
 
 @app.route('/jets/add', methods=['GET', 'POST'])
 @login_required
@@ -795,8 +975,8 @@ def view_jet(jet_id):
     """View jet schedule and details"""
     jet = manager.get_jet(jet_id)
     if jet:
-        flights = [f for f in manager.flights.values() if f.jet_id == jet_id]
-        maintenance = [m for m in manager.maintenance.values() if m.jet_id == jet_id]
+        flights = manager.get_jet_flights(jet_id)
+        maintenance = manager.get_jet_maintenance(jet_id)
         return render_template('jet_detail.html', jet=jet, flights=flights, maintenance=maintenance)
     flash('Jet not found', 'error')
     return redirect(url_for('jets'))
@@ -814,8 +994,8 @@ def download_aircraft_report(jet_id):
     customer = None
     if jet.customer_ids:
         customer = manager.get_customer(jet.customer_ids[0])  # Primary customer
-    flights = [f for f in manager.flights.values() if f.jet_id == jet_id]
-    maintenance = [m for m in manager.maintenance.values() if m.jet_id == jet_id]
+    flights = manager.get_jet_flights(jet_id)
+    maintenance = manager.get_jet_maintenance(jet_id)
 
     # Generate PDF
     pdf_buffer = pdf_generator.generate_aircraft_report(jet, customer, flights, maintenance)
@@ -872,8 +1052,10 @@ def delete_jet(jet_id):
 @app.route('/flights')
 @login_required
 def flights():
-    """List all flights"""
-    return render_template('flights.html', flights=manager.flights.values())
+    """List flights, a page at a time"""
+    pagination = list_page('flights')
+    return render_template('flights.html', flights=pagination.items_on_page, pagination=pagination,
+                           controls=list_controls('flights', {'jet_id': jet_choices(manager.jets.values())}))
 
 @app.route('/flights/add', methods=['GET', 'POST'])
 @login_required
@@ -889,8 +1071,8 @@ def add_flight():
         override_maintenance = request.form.get('override_maintenance') == 'true'
 
         # Check for maintenance conflicts
-        active_maintenance = [m for m in manager.maintenance.values()
-                            if m.jet_id == jet_id and m.status in ['Scheduled', 'In Progress']]
+        active_maintenance = [m for m in manager.get_jet_maintenance(jet_id)
+                            if m.status in ['Scheduled', 'In Progress']]
 
         if active_maintenance and not override_maintenance:
             # Show warning and ask for confirmation
@@ -1057,34 +1239,23 @@ def aircraft_sheet(jet_id):
 
     # Filter flights for this month
     flights_this_month = []
-    for flight in manager.flights.values():
-        if flight.jet_id == jet_id:
-            try:
-                # Parse departure date
-                dep_date_str = flight.departure_time.replace('T', ' ').split()[0]
-                dep_date = datetime.strptime(dep_date_str, '%Y-%m-%d')
-                if dep_date.year == current_year and dep_date.month == current_month:
-                    flights_this_month.append(flight)
-            except:
-                pass
+    for flight in manager.get_jet_flights(jet_id):
+        dep_date = flight.departure_at
+        if dep_date and dep_date.year == current_year and dep_date.month == current_month:
+            flights_this_month.append(flight)
 
     # Sort flights by departure time
-    flights_this_month.sort(key=lambda f: f.departure_time)
+    flights_this_month.sort(key=lambda f: f.departure_at)
 
     # Filter maintenance for this month
     maintenance_this_month = []
-    for maint in manager.maintenance.values():
-        if maint.jet_id == jet_id:
-            try:
-                # Parse scheduled date
-                maint_date = datetime.strptime(maint.scheduled_date, '%Y-%m-%d')
-                if maint_date.year == current_year and maint_date.month == current_month:
-                    maintenance_this_month.append(maint)
-            except:
-                pass
+    for maint in manager.get_jet_maintenance(jet_id):
+        maint_date = maint.scheduled_at
+        if maint_date and maint_date.year == current_year and maint_date.month == current_month:
+            maintenance_this_month.append(maint)
 
     # Sort maintenance by scheduled date
-    maintenance_this_month.sort(key=lambda m: m.scheduled_date)
+    maintenance_this_month.sort(key=lambda m: m.scheduled_at)
 
     # Estimate flight hours (rough calculation: 1 hour per 500 miles, assume average 1000 miles per flight)
     flight_hours = len(flights_this_month) * 2  # Simplified estimate
@@ -1252,19 +1423,21 @@ def reject_flight(flight_id):
 @app.route('/maintenance')
 @login_required
 def maintenance():
-    """List all maintenance records"""
+    """List maintenance records, a page at a time"""
     user = get_current_user()
 
     # Filter maintenance by user role (updated for shared jets)
     if user.role == 'customer':
         # Customers see maintenance for their aircraft (including shared jets)
-        customer_jets = [j.jet_id for j in manager.jets.values() if user.related_id in j.customer_ids]
-        maintenance_list = [m for m in manager.maintenance.values() if m.jet_id in customer_jets]
+        jets = manager.get_shared_jets(user.related_id)
+        pagination = list_page('maintenance', {'jet_id': [jet.jet_id for jet in jets]})
     else:
         # Admin, crew, mechanics see all maintenance
-        maintenance_list = list(manager.maintenance.values())
+        jets = manager.jets.values()
+        pagination = list_page('maintenance')
 
-    return render_template('maintenance.html', maintenance=maintenance_list, user=user)
+    return render_template('maintenance.html', maintenance=pagination.items_on_page, pagination=pagination,
+                           controls=list_controls('maintenance', {'jet_id': jet_choices(jets)}), user=user)
 
 @app.route('/maintenance/add', methods=['GET', 'POST'])
 @role_required('admin', 'crew', 'mechanic')
@@ -1365,21 +1538,23 @@ def update_maintenance_status(maintenance_id):
 @app.route('/customers')
 @role_required('admin')
 def customers():
-    """List all customers (admin only)"""
+    """List customers, a page at a time (admin only)"""
     user = get_current_user()
-    customer_list = list(manager.customers.values())
+    pagination = list_page('customers')
+    customer_list = pagination.items_on_page
 
     # Get counts for each customer (updated for shared jets)
     customer_stats = {}
     for customer in customer_list:
-        jets_count = len([j for j in manager.jets.values() if customer.customer_id in j.customer_ids])
-        passengers_count = len([p for p in manager.passengers.values() if p.customer_id == customer.customer_id])
+        jets_count = len(manager.get_shared_jets(customer.customer_id))
+        passengers_count = len(manager.get_customer_passengers(customer.customer_id))
         customer_stats[customer.customer_id] = {
             'jets': jets_count,
             'passengers': passengers_count
         }
 
-    return render_template('customers.html', customers=customer_list, stats=customer_stats, user=user)
+    return render_template('customers.html', customers=customer_list, stats=customer_stats, user=user,
+                           pagination=pagination, controls=list_controls('customers'))
 
 @app.route('/customers/add', methods=['GET', 'POST'])
 @role_required('admin')
@@ -1420,8 +1595,8 @@ def view_customer(customer_id):
 
     # Get all jets and passengers for this customer
     # Updated to support shared jet ownership
-    customer_jets = [j for j in manager.jets.values() if customer_id in j.customer_ids]
-    customer_passengers = [p for p in manager.passengers.values() if p.customer_id == customer_id]
+    customer_jets = manager.get_shared_jets(customer_id)
+    customer_passengers = manager.get_customer_passengers(customer_id)
 
     # Get all available jets and passengers (not assigned to any customer)
     unassigned_jets = [j for j in manager.jets.values() if len(j.customer_ids) == 0]
@@ -1500,6 +1675,7 @@ def assign_jet_to_customer(customer_id):
     # Add customer to jet's customer list (shared ownership)
     if customer_id not in jet.customer_ids:
         jet.customer_ids.append(customer_id)
+        manager.mark_changed('jets', jet_id)
         manager.save_data()
         flash(f'Jet {jet_id} ({jet.model}) assigned to {customer.name}. This jet is now shared with {len(jet.customer_ids)} customer(s).', 'success')
     else:
@@ -1520,6 +1696,7 @@ def unassign_jet_from_customer(customer_id, jet_id):
     # Remove this customer from jet's customer list
     if customer_id in jet.customer_ids:
         jet.customer_ids.remove(customer_id)
+        manager.mark_changed('jets', jet_id)
         manager.save_data()
         remaining = len(jet.customer_ids)
         if remaining > 0:
@@ -1545,6 +1722,7 @@ def assign_passenger_to_customer(customer_id):
 
     # Update passenger's customer_id
     passenger.customer_id = customer_id
+    manager.mark_changed('passengers', passenger_id)
     manager.save_data()
     flash(f'Passenger {passenger.name} assigned to {customer.name}', 'success')
     return redirect(url_for('view_customer', customer_id=customer_id))
@@ -1561,6 +1739,7 @@ def unassign_passenger_from_customer(customer_id, passenger_id):
 
     # Remove customer association
     passenger.customer_id = ''
+    manager.mark_changed('passengers', passenger_id)
     manager.save_data()
     flash(f'Passenger {passenger.name} unassigned from customer', 'success')
     return redirect(url_for('view_customer', customer_id=customer_id))
@@ -1613,17 +1792,42 @@ def api_jet_status(jet_id):
     return jsonify({'error': 'Jet not found'}), 404
 
 @app.route('/api/stats')
+@login_required
+@limiter.limit("60 per minute")
 def api_stats():
-    """Get dashboard statistics"""
-    return jsonify({
-        'total_passengers': len(manager.passengers),
-        'total_crew': len(manager.crew),
-        'total_jets': len(manager.jets),
-        'total_flights': len(manager.flights),
-        'total_maintenance': len(manager.maintenance),
-        'active_flights': len([f for f in manager.flights.values() if f.status == 'In Progress']),
-        'available_jets': len([j for j in manager.jets.values() if j.status == 'Available']),
-    })
+    """Get dashboard statistics (revalidate with If-None-Match; unchanged stats answer 304)"""
+    user = get_current_user()
+    if user.role == 'customer':
+        body, etag = dashboard_summary.stats_json(user.related_id)
+    else:
+        body, etag = dashboard_summary.stats_json(breakdown=user.role == 'admin')
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/db/pool')
+@role_required('admin')
+def api_db_pool():
+    """Database connection pool occupancy and checkout/wait metrics for this worker"""
+    return jsonify(pool_status())
+
+@app.route('/api/status-scheduler')
+@role_required('admin')
+def api_status_scheduler():
+    """Run count and duration metrics of the background status updates"""
+    return jsonify(status_scheduler.status())
+
+def _calendar_bound(name):
+    """FullCalendar start/end query parameter as a naive datetime (None if missing or invalid)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        # An unencoded '+' in a UTC offset arrives as a space
+        return datetime.fromisoformat(value.replace(' ', '+')).replace(tzinfo=None)
+    except ValueError:
+        return None
 
 @app.route('/api/calendar/flights')
 @login_required
@@ -1633,14 +1837,22 @@ def api_calendar_flights():
 
     # Filter flights based on user role
     if user.role == 'customer':
-        customer_jets = [j.jet_id for j in manager.jets.values() if user.related_id in j.customer_ids]
-        flights = [f for f in manager.flights.values() if f.jet_id in customer_jets]
+        flights = [f for jet in manager.get_shared_jets(user.related_id)
+                   for f in manager.get_jet_flights(jet.jet_id)]
     else:
         flights = list(manager.flights.values())
 
+    # FullCalendar asks for the visible range only (flights with unparseable times are always sent)
+    range_start = _calendar_bound('start')
+    range_end = _calendar_bound('end')
+
     # Convert to FullCalendar format
     events = []
     for flight in flights:
+        if range_end and flight.departure_at and flight.departure_at >= range_end:
+            continue
+        if range_start and flight.arrival_at and flight.arrival_at < range_start:
+            continue
         jet = manager.get_jet(flight.jet_id)
 
         # Parse departure and arrival times
@@ -1671,6 +1883,20 @@ def api_calendar_flights():
 
     return jsonify(events)
 
+def format_airport(airport):
+    """Airport as the frontend shows it"""
+    formatted = {
+        'code': airport['code'],
+        'name': airport['name'],
+        'city': airport['city'],
+        'state': airport['state'],
+        'country': airport['country'],
+        'display': f"{airport['code']} - {airport['name']} ({airport['city']}, {airport['state']})"
+    }
+    if 'distance_miles' in airport:
+        formatted['distance_miles'] = round(airport['distance_miles'], 1)
+    return formatted
+
 @app.route('/api/airports/search')
 def api_search_airports():
     """Search airports by location (city, state, name, or code)"""
@@ -1682,19 +1908,44 @@ def api_search_airports():
 
     results = airport_db.search_airports(query, limit)
 
-    # Format results for frontend
-    formatted_results = []
-    for airport in results:
-        formatted_results.append({
-            'code': airport['code'],
-            'name': airport['name'],
-            'city': airport['city'],
-            'state': airport['state'],
-            'country': airport['country'],
-            'display': f"{airport['code']} - {airport['name']} ({airport['city']}, {airport['state']})"
-        })
+    return jsonify({'results': [format_airport(airport) for airport in results]})
+
+# Most airports one nearby query returns
+NEARBY_MAX_LIMIT = 100
+
+@app.route('/api/airports/nearby')
+def api_nearby_airports():
+    """
+    Airports near a coordinate or another airport, closest first
+
+    ?lat=&lon= returns the limit closest airports to that point;
+    ?code=&radius= the other airports within radius miles of that airport
+    (at most limit of them), e.g. alternates for a diversion. Each result
+    carries its distance_miles.
+    """
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', 10)), 1), NEARBY_MAX_LIMIT)
+        if args.get('code'):
+            radius = float(args['radius']) if args.get('radius') else None
+        else:
+            lat, lon = float(args['lat']), float(args['lon'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Pass lat and lon, or code and radius (miles), as numbers'}), 400
+
+    if args.get('code'):
+        if radius is None or radius < 0:
+            return jsonify({'error': 'radius (miles) required with code'}), 400
+        results = airport_db.within_radius(args['code'], radius)
+        if results is None:
+            return jsonify({'error': 'Airport not found'}), 404
+        results = results[:limit]
+    else:
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({'error': 'lat must be within -90..90 and lon within -180..180'}), 400
+        results = airport_db.nearest(lat, lon, limit)
 
-    return jsonify({'results': formatted_results})
+    return jsonify({'results': [format_airport(airport) for airport in results]})
 
 @app.route('/api/airports/distance')
 def api_airport_distance():
@@ -1718,14 +1969,16 @@ def api_airport_distance():
 
 @app.route('/api/flights/estimate-duration')
 def api_estimate_flight_duration():
-    """Estimate flight duration between two airports"""
+    """Estimate flight duration between two airports, for the aircraft of ?jet_id= when given"""
     departure = request.args.get('departure', '').upper()
     destination = request.args.get('destination', '').upper()
 
     if not departure or not destination:
         return jsonify({'error': 'Both departure and destination required'}), 400
 
-    duration = airport_db.estimate_flight_duration(departure, destination)
+    jet = manager.get_jet(request.args['jet_id']) if request.args.get('jet_id') else None
+    duration = airport_db.estimate_flight_duration(departure, destination,
+                                                   aircraft_model=jet.model if jet else None)
 
     if duration is None:
         return jsonify({'error': 'One or both airports not found'}), 404
@@ -1750,7 +2003,7 @@ def api_estimate_flight_duration():
 def calendar():
     """Flight calendar view"""
     user = get_current_user()
-    return render_template('calendar.html', user=user)
+    return render_template('calendar.html', user=user, live_events=LIVE_EVENTS)
 
 # ====================
 # ADMIN STATUS UPDATE ROUTE
@@ -1760,7 +2013,7 @@ def calendar():
 @role_required('admin')
 def manual_status_update():
     """Manually trigger status update (admin only)"""
-    result = status_updater.updater.update_all_statuses()
+    result = status_updater.update_all_statuses(full_scan=True)
     flash(f"✅ Updated {result['flights_updated']} flights and {result['maintenance_updated']} maintenance records", 'success')
     return redirect(url_for('index'))
 
@@ -1770,7 +2023,7 @@ def upcoming_events():
     """View upcoming events in the next 24 hours (admin only)"""
     user = get_current_user()
     hours = int(request.args.get('hours', 24))
-    upcoming = status_updater.updater.get_upcoming_events(hours)
+    upcoming = status_updater.get_upcoming_events(hours)
 
     return render_template('upcoming_events.html',
                          upcoming=upcoming,